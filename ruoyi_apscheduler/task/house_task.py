@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+# @Author  : YY
+
+from ruoyi_apscheduler import reg
+from ruoyi_apscheduler.config import EXECUTORS
+from ruoyi_house.mapper import HouseStatisticsAggregateMapper, HouseTagMapper
+from ruoyi_house.service.house_statistics_service import HouseStatisticsService
+from ruoyi_house.service.item_cooccurrence_service import ItemCooccurrenceService
+from ruoyi_house.service.recommend_service import RecommendService
+from ruoyi_house.service.similar_house_service import SimilarHouseService
+
+
+def batch_generate_recommendations(active_days='1', chunk_size='64'):
+    """
+    为最近活跃用户批量生成推荐
+
+    调用目标示例：ruoyi_apscheduler.task.house_task.batch_generate_recommendations('1', '64')
+    评分分块在进程池中并行计算，进程数取自 EXECUTORS['processpool']
+
+    Args:
+        active_days (str): 统计活跃用户的天数
+        chunk_size (str): 每次矩阵乘法的用户数
+    """
+    max_workers = EXECUTORS["processpool"]["max_workers"]
+    with reg.app.app_context():
+        count = RecommendService.batch_generate_recommendations(
+            active_days=int(active_days),
+            chunk_size=int(chunk_size),
+            max_workers=max_workers,
+        )
+    print("批量生成推荐完成： 用户数: {}".format(count))
+
+
+def build_item_cooccurrence():
+    """
+    全量构建房源共现模型
+
+    调用目标示例：ruoyi_apscheduler.task.house_task.build_item_cooccurrence
+    """
+    with reg.app.app_context():
+        model = ItemCooccurrenceService.build()
+    print("全量构建房源共现模型完成： 房源数: {}".format(model.size if model else 0))
+
+
+def refresh_item_cooccurrence():
+    """
+    根据新增的浏览和点赞记录增量更新房源共现模型
+
+    调用目标示例：ruoyi_apscheduler.task.house_task.refresh_item_cooccurrence
+    """
+    with reg.app.app_context():
+        model = ItemCooccurrenceService.refresh()
+    print("增量更新房源共现模型完成： 房源数: {}".format(model.size if model else 0))
+
+
+def build_similar_houses():
+    """
+    全量计算所有房源的相似房源
+
+    调用目标示例：ruoyi_apscheduler.task.house_task.build_similar_houses
+    """
+    with reg.app.app_context():
+        count = SimilarHouseService.build(RecommendService.WEIGHTS, RecommendService.TAG_COMBINATION_BONUS)
+    print("全量计算相似房源完成： 房源数: {}".format(count))
+
+
+def refresh_similar_houses():
+    """
+    只重新计算上次计算后新增、修改、删除过的房源及受其影响的房源
+
+    调用目标示例：ruoyi_apscheduler.task.house_task.refresh_similar_houses
+    """
+    with reg.app.app_context():
+        count = SimilarHouseService.refresh(RecommendService.WEIGHTS, RecommendService.TAG_COMBINATION_BONUS)
+    print("增量更新相似房源完成： 重算房源数: {}".format(count))
+
+
+def rebuild_house_statistics_aggregate():
+    """
+    全量重建房源统计预聚合，修复增量更新产生的偏差（统计数据来源为预聚合时才执行）
+
+    调用目标示例：ruoyi_apscheduler.task.house_task.rebuild_house_statistics_aggregate
+    """
+    with reg.app.app_context():
+        count = HouseStatisticsAggregateMapper.rebuild()
+    print("重建房源统计预聚合完成： 分组数: {}".format(count))
+
+
+def rebuild_house_tags():
+    """
+    根据房源表全量重建房源标签表（首次上线或数据修复时执行）
+
+    调用目标示例：ruoyi_apscheduler.task.house_task.rebuild_house_tags
+    """
+    with reg.app.app_context():
+        count = HouseTagMapper.rebuild()
+    print("重建房源标签表完成： 标签记录数: {}".format(count))
+
+
+def forecast_all_segments(segment_fields='town,house_type'):
+    """
+    预测每个镇、每种房型的价格并保存模型，之后的分段价格预测请求直接返回保存的结果
+
+    调用目标示例：ruoyi_apscheduler.task.house_task.forecast_all_segments('town,house_type')
+    分段在进程池中并行预测，进程数取自 EXECUTORS['processpool']
+
+    Args:
+        segment_fields (str): 逗号分隔的分段字段
+    """
+    max_workers = EXECUTORS["processpool"]["max_workers"]
+    fields = [field.strip() for field in segment_fields.split(',') if field.strip()]
+    with reg.app.app_context():
+        result = HouseStatisticsService.forecast_all_segments(fields, max_workers=max_workers)
+    print("分段价格预测完成： {}".format(result))
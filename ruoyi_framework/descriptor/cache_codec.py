@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+"""
+`custom_cacheable` 的缓存值编解码。
+默认 pickle（与历史缓存兼容）；json / msgpack 编码 pydantic 对象的 model_dump 结果，
+读取时按函数返回值类型注解重建对象，不再从共享缓存反序列化任意 pickle。
+超过阈值的编码结果可选 zlib / lz4 压缩，并按缓存前缀记录编解码耗时与体积。
+"""
+
+from __future__ import annotations
+
+import json
+import pickle
+import threading
+import time
+import zlib
+from typing import Any, Dict
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - 可选依赖
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - 可选依赖
+    msgpack = None
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:  # pragma: no cover - 可选依赖
+    lz4_frame = None
+
+__all__ = ["CacheCodec", "codec_stats"]
+
+# 非 pickle 编码的头部：魔数 + 编码 + 压缩方式（pickle 协议2以上以 0x80 开头，不会冲突）
+MAGIC = b"\xccC"
+FORMATS = {"json": 1, "msgpack": 2}
+COMPRESSIONS = {"none": 0, "zlib": 1, "lz4": 2}
+
+_stats: Dict[str, Dict[str, float]] = {}
+_stats_lock = threading.Lock()
+
+
+class CacheCodec:
+    """
+    单个装饰器的编解码器。
+
+    Args:
+        name:               pickle / json / msgpack，msgpack 未安装时回退为 json
+        value_type:         返回值类型注解，用于 json / msgpack 解码后重建 pydantic 对象
+        compress_threshold: 编码结果超过该字节数时压缩，0 表示不压缩
+        compression:        zlib / lz4，lz4 未安装时回退为 zlib
+        stats_key:          统计数据的归属（缓存前缀）
+    """
+
+    def __init__(
+        self,
+        name: str = "pickle",
+        value_type: Any = None,
+        compress_threshold: int = 0,
+        compression: str = "zlib",
+        stats_key: str = "",
+    ):
+        if name not in ("pickle", *FORMATS):
+            raise ValueError(f"不支持的缓存编码: {name}")
+        if compression not in COMPRESSIONS:
+            raise ValueError(f"不支持的缓存压缩方式: {compression}")
+        if name == "msgpack" and msgpack is None:
+            name = "json"
+        if compression == "lz4" and lz4_frame is None:
+            compression = "zlib"
+        self.name = name
+        self.value_type = value_type
+        self.compress_threshold = compress_threshold
+        self.compression = compression
+        self.stats_key = stats_key
+        self._adapter = None
+
+    def encode(self, value: Any) -> bytes:
+        start = time.perf_counter()
+        if self.name == "pickle":
+            payload = pickle.dumps(value)
+            raw_size = len(payload)
+        else:
+            data = self._to_builtins(value)
+            body = _dumps_json(data) if self.name == "json" else msgpack.packb(data, use_bin_type=True)
+            raw_size = len(body)
+            compression = "none"
+            if 0 < self.compress_threshold < raw_size:
+                compression = self.compression
+                body = _compress(body, compression)
+            payload = MAGIC + bytes((FORMATS[self.name], COMPRESSIONS[compression])) + body
+        _record(self.stats_key, "encode", time.perf_counter() - start, raw_size, len(payload))
+        return payload
+
+    def decode(self, payload: bytes) -> Any:
+        """
+        解码缓存值；json / msgpack 编码时不接受没有头部的旧 pickle 数据（抛出 ValueError，按未命中处理）。
+        """
+
+        start = time.perf_counter()
+        if not payload.startswith(MAGIC):
+            if self.name != "pickle":
+                raise ValueError("缓存值不是当前编码格式")
+            value = pickle.loads(payload)
+            _record(self.stats_key, "decode", time.perf_counter() - start, len(payload), len(payload))
+            return value
+        fmt, compression = payload[len(MAGIC)], payload[len(MAGIC) + 1]
+        body = _decompress(payload[len(MAGIC) + 2:], compression)
+        if fmt == FORMATS["json"]:
+            data = orjson.loads(body) if orjson is not None else json.loads(body)
+        elif fmt == FORMATS["msgpack"] and msgpack is not None:
+            data = msgpack.unpackb(body, raw=False)
+        else:
+            raise ValueError(f"无法解码的缓存格式: {fmt}")
+        value = self._from_builtins(data)
+        _record(self.stats_key, "decode", time.perf_counter() - start, len(body), len(payload))
+        return value
+
+    def _get_adapter(self):
+        if self._adapter is None:
+            from pydantic import TypeAdapter
+
+            self._adapter = TypeAdapter(self.value_type)
+        return self._adapter
+
+    def _to_builtins(self, value: Any) -> Any:
+        if self.value_type is None:
+            return _dump_models(value)
+        return self._get_adapter().dump_python(value, mode="json", by_alias=True)
+
+    def _from_builtins(self, data: Any) -> Any:
+        if self.value_type is None:
+            return data
+        return self._get_adapter().validate_python(data)
+
+
+def codec_stats() -> Dict[str, Dict[str, float]]:
+    """
+    各缓存前缀的编解码统计：次数、累计耗时（毫秒）、编码前后累计字节数。
+    """
+
+    with _stats_lock:
+        return {key: dict(value) for key, value in _stats.items()}
+
+
+def _record(stats_key: str, operation: str, seconds: float, raw_size: int, stored_size: int) -> None:
+    with _stats_lock:
+        stats = _stats.setdefault(stats_key, {
+            "encode_count": 0, "encode_ms": 0.0, "decode_count": 0, "decode_ms": 0.0,
+            "raw_bytes": 0, "stored_bytes": 0,
+        })
+        stats[f"{operation}_count"] += 1
+        stats[f"{operation}_ms"] += seconds * 1000
+        if operation == "encode":
+            stats["raw_bytes"] += raw_size
+            stats["stored_bytes"] += stored_size
+
+
+def _dumps_json(data: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(data, default=str)
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+
+
+def _dump_models(value: Any) -> Any:
+    """
+    没有类型注解时，把 pydantic 对象转为字典（解码后得到的也是字典）。
+    """
+
+    if hasattr(value, "model_dump"):
+        return value.model_dump(mode="json", by_alias=True)
+    if isinstance(value, dict):
+        return {key: _dump_models(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_dump_models(item) for item in value]
+    return value
+
+
+def _compress(body: bytes, compression: str) -> bytes:
+    if compression == "lz4":
+        return lz4_frame.compress(body)
+    return zlib.compress(body)
+
+
+def _decompress(body: bytes, compression: int) -> bytes:
+    if compression == COMPRESSIONS["none"]:
+        return body
+    if compression == COMPRESSIONS["zlib"]:
+        return zlib.decompress(body)
+    if compression == COMPRESSIONS["lz4"] and lz4_frame is not None:
+        return lz4_frame.decompress(body)
+    raise ValueError(f"无法解压的缓存数据: {compression}")
@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+"""
+缓存指标：按缓存前缀统计命中、未命中、回源加载耗时与写入的序列化字节数。
+记录时只修改当前线程自己的计数器，不加锁；线程结束后其计数并入进程级合计，计数器随之释放。
+每个进程的后台线程定期把增量累加到 Redis 哈希，缓存监控读取 Redis 中所有 worker 的累计结果。
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+METRICS_KEY_PREFIX = "cache_metrics:"
+PREFIXES_KEY = "cache_metrics:prefixes"
+FLUSH_INTERVAL_SECONDS = 10
+# 计数器字段：命中（含 L1）、L1 命中、未命中、回源次数、回源耗时（毫秒）、写入字节数
+FIELDS = ("hits", "l1_hits", "misses", "loads", "load_ms", "bytes")
+_FLOAT_FIELDS = frozenset(("load_ms",))
+
+__all__ = ["record_hit", "record_miss", "record_load", "flush", "collect"]
+
+_local = threading.local()
+# 本进程存活线程的计数器：(线程, 前缀 -> 与 FIELDS 对应的累计值)
+_thread_counters: List[Tuple[threading.Thread, Dict[str, List[float]]]] = []
+# 已结束线程的计数合计
+_retired: Dict[str, List[float]] = {}
+_flushed: Dict[str, List[float]] = {}
+_registry_pid: Optional[int] = None
+_registry_lock = threading.Lock()
+_flush_lock = threading.Lock()
+_flusher_lock = threading.Lock()
+_flusher_pid: Optional[int] = None
+
+
+def record_hit(client: Any, prefix: str, l1: bool = False) -> None:
+    row = _row(client, prefix)
+    row[0] += 1
+    if l1:
+        row[1] += 1
+
+
+def record_miss(client: Any, prefix: str) -> None:
+    _row(client, prefix)[2] += 1
+
+
+def record_load(client: Any, prefix: str, seconds: float, size: int = 0) -> None:
+    """
+    记录一次回源加载：耗时（秒）与写入缓存的序列化字节数（未写入时为0）。
+    """
+
+    row = _row(client, prefix)
+    row[3] += 1
+    row[4] += seconds * 1000
+    row[5] += size
+
+
+def flush(client: Any) -> None:
+    """
+    把本进程自上次合并以来的增量累加到 Redis，失败时保留增量下次重试。
+    """
+
+    with _flush_lock:
+        totals = _snapshot()
+        deltas = {}
+        for prefix, row in totals.items():
+            base = _flushed.get(prefix)
+            delta = [value - base[i] for i, value in enumerate(row)] if base else row
+            if any(delta):
+                deltas[prefix] = delta
+        if not deltas:
+            return
+        try:
+            pipeline = client.pipeline(transaction=False)
+            for prefix, delta in deltas.items():
+                key = f"{METRICS_KEY_PREFIX}{prefix}"
+                for field, value in zip(FIELDS, delta):
+                    if not value:
+                        continue
+                    if field in _FLOAT_FIELDS:
+                        pipeline.hincrbyfloat(key, field, round(value, 3))
+                    else:
+                        pipeline.hincrby(key, field, int(value))
+                pipeline.sadd(PREFIXES_KEY, prefix)
+            pipeline.execute()
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("合并缓存指标失败: %s", exc)
+            return
+        _flushed.update(totals)
+
+
+def collect(client: Any) -> List[Dict[str, Any]]:
+    """
+    读取所有进程累计的缓存指标（先合并本进程的增量），按访问次数倒序。
+    """
+
+    flush(client)
+    prefixes = sorted(
+        prefix.decode("utf-8") if isinstance(prefix, bytes) else str(prefix)
+        for prefix in client.smembers(PREFIXES_KEY)
+    )
+    pipeline = client.pipeline(transaction=False)
+    for prefix in prefixes:
+        pipeline.hgetall(f"{METRICS_KEY_PREFIX}{prefix}")
+    metrics = []
+    for prefix, values in zip(prefixes, pipeline.execute()):
+        values = {
+            (field.decode("utf-8") if isinstance(field, bytes) else field): float(value)
+            for field, value in (values or {}).items()
+        }
+        item = {field: values.get(field, 0.0) for field in FIELDS}
+        for field in FIELDS:
+            if field not in _FLOAT_FIELDS:
+                item[field] = int(item[field])
+        requests = item["hits"] + item["misses"]
+        item["prefix"] = prefix
+        item["requests"] = requests
+        item["hit_rate"] = round(item["hits"] * 100 / requests, 2) if requests else 0.0
+        item["avg_load_ms"] = round(item["load_ms"] / item["loads"], 2) if item["loads"] else 0.0
+        item["avg_bytes"] = round(item["bytes"] / item["loads"]) if item["loads"] else 0
+        item["load_ms"] = round(item["load_ms"], 2)
+        metrics.append(item)
+    metrics.sort(key=lambda item: item["requests"], reverse=True)
+    return metrics
+
+
+def _row(client: Any, prefix: str) -> List[float]:
+    counters = getattr(_local, "counters", None)
+    if counters is None or _local.pid != os.getpid():
+        counters = _register_thread()
+    row = counters.get(prefix)
+    if row is None:
+        row = counters[prefix] = [0] * len(FIELDS)
+    if _flusher_pid != os.getpid():
+        _ensure_flusher(client)
+    return row
+
+
+def _register_thread() -> Dict[str, List[float]]:
+    """
+    为当前线程创建计数器（每个线程一次），同时回收已结束线程的计数器；
+    fork 出的子进程丢弃从父进程继承的计数，避免重复累加。
+    """
+
+    global _thread_counters, _retired, _flushed, _registry_pid
+    pid = os.getpid()
+    with _registry_lock:
+        if _registry_pid != pid:
+            _thread_counters = []
+            _retired = {}
+            _flushed = {}
+            _registry_pid = pid
+        _retire_dead_threads()
+        counters: Dict[str, List[float]] = {}
+        _thread_counters.append((threading.current_thread(), counters))
+    _local.counters = counters
+    _local.pid = pid
+    return counters
+
+
+def _retire_dead_threads() -> None:
+    """
+    把已结束线程的计数并入进程级合计并移除其计数器（调用方持有 _registry_lock）。
+    线程结束后不会再写入，无需与记录方同步。
+    """
+
+    global _thread_counters
+    alive = []
+    for thread, counters in _thread_counters:
+        if thread.is_alive():
+            alive.append((thread, counters))
+        else:
+            _add_counters(_retired, counters)
+    _thread_counters = alive
+
+
+def _snapshot() -> Dict[str, List[float]]:
+    with _registry_lock:
+        _retire_dead_threads()
+        totals = {prefix: list(row) for prefix, row in _retired.items()}
+        for _, counters in _thread_counters:
+            _add_counters(totals, counters)
+    return totals
+
+
+def _add_counters(totals: Dict[str, List[float]], counters: Dict[str, List[float]]) -> None:
+    for prefix, row in list(counters.items()):
+        total = totals.setdefault(prefix, [0] * len(FIELDS))
+        for i, value in enumerate(list(row)):
+            total[i] += value
+
+
+def _ensure_flusher(client: Any) -> None:
+    """
+    每个进程启动一次合并线程；client 为依赖应用上下文的 LocalProxy 时取出真实连接。
+    """
+
+    global _flusher_pid
+    if client is None:
+        return
+    pid = os.getpid()
+    with _flusher_lock:
+        if _flusher_pid == pid:
+            return
+        try:
+            client = client._get_current_object() if hasattr(client, "_get_current_object") else client
+        except Exception as exc:  # noqa: BLE001
+            logger.debug("获取 redis 连接失败，暂不合并缓存指标: %s", exc)
+            return
+        thread = threading.Thread(target=_flush_loop, args=(client,), name="cache-metrics-flush", daemon=True)
+        thread.start()
+        _flusher_pid = pid
+
+
+def _flush_loop(client: Any) -> None:
+    while True:
+        time.sleep(FLUSH_INTERVAL_SECONDS)
+        flush(client)
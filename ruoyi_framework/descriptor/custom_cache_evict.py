@@ -1,7 +1,9 @@
 # -*- coding: utf-8 -*-
 """
 自定义缓存清理装饰器，对应 Java 版本的 `@CustomCacheEvict`。
-执行目标函数后，根据前缀/字段路径/参数组合构造通配符 Key，并批量删除 Redis 缓存。
+执行目标函数后，根据前缀/字段路径/参数组合构造通配符 Key，并批量删除 Redis 缓存，
+同时广播清理模式，使各进程的 L1 缓存一并失效。
+按依赖标签（tags）清理时只删除标签集合中记录的 Key，不扫描整个 keyspace。
 """
 
 from __future__ import annotations
@@ -19,17 +21,22 @@ from .custom_cacheable import (
     _get_value_by_field_path,
     _hash_arguments,
     _resolve_redis_client,
+    tag_key,
 )
+from .local_cache import broadcast_evict, broadcast_evict_tag
 
 logger = logging.getLogger(__name__)
 
-__all__ = ["custom_cache_evict"]
+TAG_EVICT_BATCH_SIZE = 500
+
+__all__ = ["custom_cache_evict", "evict_cache_tags"]
 
 
 def custom_cache_evict(
-    key_prefixes: Sequence[str],
+    key_prefixes: Sequence[str] = (),
     key_fields: Sequence[str] | None = None,
     use_query_params_as_key: bool = False,
+    tags: Sequence[str] = (),
 ) -> Callable:
     """
     Redis 缓存清理装饰器。
@@ -38,10 +45,11 @@ def custom_cache_evict(
         key_prefixes: 缓存前缀数组，必填，对应待清理的一组 Key。
         key_fields:   与前缀一一对应的字段路径，允许缺省；缺省时直接按前缀通配符清理。
         use_query_params_as_key: 是否将函数参数序列化为 Key 的一部分（需与存储端保持一致）。
+        tags:         依赖标签，删除 `custom_cacheable(tags=...)` 记录在这些标签下的全部 Key。
     """
 
-    if not key_prefixes:
-        raise ValueError("key_prefixes 不能为空")
+    if not key_prefixes and not tags:
+        raise ValueError("key_prefixes 和 tags 不能同时为空")
 
     def decorator(func: Callable) -> Callable:
         signature = inspect.signature(func)
@@ -53,6 +61,11 @@ def custom_cache_evict(
             if client is None:
                 return result
 
+            if tags:
+                _evict_tags(client, tags)
+            if not key_prefixes:
+                return result
+
             params = _bind_arguments(signature, *args, **kwargs)
             args_hash = _hash_arguments(params) if use_query_params_as_key else None
 
@@ -71,6 +84,7 @@ def custom_cache_evict(
 
                 pattern = f"{pattern}*"
                 _delete_keys_by_pattern(client, pattern)
+                broadcast_evict(client, pattern)
 
             return result
 
@@ -79,6 +93,36 @@ def custom_cache_evict(
     return decorator
 
 
+def evict_cache_tags(*tags: str) -> None:
+    """
+    删除依赖这些标签的全部缓存，供业务代码在数据变更后直接调用。
+    """
+
+    client = _resolve_redis_client()
+    if client is None or not tags:
+        return
+    _evict_tags(client, tags)
+
+
+def _evict_tags(client: LocalProxy, tags: Sequence[str]) -> None:
+    """
+    SPOP 分批取出标签集合的成员并删除：取出与移除是原子的，
+    清理过程中新写入的 Key 留在集合中，由下次清理处理。
+    """
+
+    for tag in tags:
+        try:
+            pipeline = client.pipeline(transaction=False)
+            while True:
+                keys = client.spop(tag_key(tag), TAG_EVICT_BATCH_SIZE)
+                if not keys:
+                    break
+                _execute_delete_batch(pipeline, keys)
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("按标签删除缓存失败 %s: %s", tag, exc)
+        broadcast_evict_tag(client, tag)
+
+
 def _bind_arguments(signature: inspect.Signature, *args: Any, **kwargs: Any) -> MutableMapping[str, Any]:
     """
     对函数参数做一次绑定，得到“参数名 -> 值”的映射，便于后续取字段。
@@ -2,6 +2,11 @@
 """
 自定义缓存装饰器，复刻 Java 版 `@CustomCacheable` 的核心能力：
 按照前缀、字段路径以及完整参数组合构造缓存 Key，并可选支持分页缓存。
+可选开启进程内一级缓存（l1_size / l1_ttl），命中时不访问 Redis；
+可选开启单飞重算（single_flight）与软过期后台刷新（soft_ttl），避免缓存同时过期时的击穿；
+缓存值的编码（codec）与压缩（compress_threshold / compression）可按装饰器配置；
+可为缓存声明依赖标签（tags），由 `custom_cache_evict` / `evict_cache_tags` 按标签精确清理。
+每次调用按缓存前缀记录命中、未命中与回源耗时（见 `cache_metrics`），在缓存监控中展示。
 """
 
 from __future__ import annotations
@@ -11,19 +16,46 @@ import hashlib
 import inspect
 import json
 import logging
-import pickle
-from typing import Any, Callable, Mapping, MutableMapping
-
+import os
+import threading
+import time
+import typing
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Mapping, MutableMapping, Sequence
+
+from flask import current_app
 from werkzeug.local import LocalProxy
 
 from ruoyi_admin.ext import redis_cache
 
+from . import cache_metrics
+from .cache_codec import CacheCodec
+from .local_cache import LocalCache, ensure_listener
+
 logger = logging.getLogger(__name__)
 
 DEFAULT_PAGE_SIZE = 30
 DEFAULT_PAGE_NUM = 1
 COMMON_SEPARATOR = ":"
 ARGS_HASH_PREFIX = "args"
+TAG_KEY_PREFIX = "custom_cache:tag:"
+# 标签集合的最短保存时间，不短于其中任何 Key 的过期时间，避免集合先于成员过期而漏删
+TAG_EXPIRE_SECONDS = 24 * 60 * 60
+LOCK_KEY_PREFIX = "custom_cache:lock:"
+LOCK_POLL_INTERVAL = 0.05
+REFRESH_WORKERS = 4
+# 只删除自己持有的锁
+RELEASE_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+_refresh_executor: ThreadPoolExecutor | None = None
+_refresh_executor_pid: int | None = None
+_refresh_executor_lock = threading.Lock()
 
 __all__ = ["custom_cacheable"]
 
@@ -36,10 +68,35 @@ def custom_cacheable(
     paginate: bool = False,
     page_number_field: str = "page_num",
     page_size_field: str = "page_size",
+    l1_size: int = 0,
+    l1_ttl: int = 30,
+    single_flight: bool = False,
+    lock_timeout: int = 60,
+    wait_timeout: float = 3.0,
+    soft_ttl: int = 0,
+    codec: str = "pickle",
+    compress_threshold: int = 0,
+    compression: str = "zlib",
+    tags: Sequence[str] = (),
+    version_getter: Callable[[], Any] | None = None,
 ) -> Callable:
     """
     Redis 缓存装饰器，参数含义与用户给出的 Java 版注解保持一致，便于迁移。
 
+    l1_size 大于 0 时在 Redis 前增加进程内 LRU 缓存，最多保存 l1_size 个 Key，
+    每个 Key 在进程内最多保存 l1_ttl 秒（不超过 expire_time）；
+    `custom_cache_evict` 清理时通过 Redis pub/sub 通知所有进程清理各自的 L1。
+
+    single_flight 为 True 时，缓存未命中的 Key 通过 Redis 锁（最长 lock_timeout 秒）只由一个进程重算，
+    其他请求最多等待 wait_timeout 秒读取其结果，超时后自行计算。
+    soft_ttl 大于 0 时，写入超过 soft_ttl 秒的缓存视为软过期：仍返回旧值，
+    同时由抢到锁的一个进程在后台线程中重算并覆盖，热点 Key 在真正过期前就已刷新。
+    codec 为 json / msgpack 时缓存 pydantic 对象的 model_dump 结果，读取时按函数返回值类型注解重建；
+    编码结果超过 compress_threshold 字节时按 compression（zlib / lz4）压缩。
+    tags 为依赖标签：写入缓存时把 Key 记入每个标签的 Redis 集合，按标签清理时只删除集合中的 Key。
+    version_getter 为数据版本读取函数：计算前后各读取一次，版本变化（计算期间数据被修改，
+    清理可能已先于写入执行）时结果只返回不写入缓存。
+
     示例：
         @custom_cacheable(
             key_prefix="recruit:list",
@@ -54,12 +111,23 @@ def custom_cacheable(
 
     def decorator(func: Callable) -> Callable:
         signature = inspect.signature(func)
+        local_cache = LocalCache(l1_size, l1_ttl, tags) if l1_size > 0 and l1_ttl > 0 else None
+        metrics_prefix = key_prefix or func.__qualname__
+        cache_codec = CacheCodec(codec, None, compress_threshold, compression, metrics_prefix)
+        type_resolved = codec == "pickle"
 
         @functools.wraps(func)
         def wrapper(*args: Any, **kwargs: Any) -> Any:
+            nonlocal type_resolved
             client = _resolve_redis_client()
             if client is None or expire_time <= 0:
                 return func(*args, **kwargs)
+            if not type_resolved:
+                # 返回值类型注解在首次调用时解析（此时前向引用都已可用）
+                cache_codec.value_type = _resolve_return_type(func)
+                type_resolved = True
+            if local_cache is not None:
+                ensure_listener(client)
 
             bound_args = signature.bind_partial(*args, **kwargs)
             bound_args.apply_defaults()
@@ -91,31 +159,191 @@ def custom_cacheable(
             else:
                 page_number = page_size = None
 
+            if local_cache is not None:
+                cached = local_cache.get(cache_key)
+                if cached is not None:
+                    cache_metrics.record_hit(client, metrics_prefix, l1=True)
+                    return cache_codec.decode(cached)
+
+            def compute_and_store() -> Any:
+                start = time.perf_counter()
+                version = version_getter() if version_getter is not None else None
+                result = func(*args, **kwargs)
+                load_seconds = time.perf_counter() - start
+
+                if version_getter is not None and version_getter() != version:
+                    logger.debug("计算期间数据版本变化，不写入缓存 %s", cache_key)
+                    cache_metrics.record_load(client, metrics_prefix, load_seconds)
+                    return result
+
+                # 开启分页时仅缓存列表或元组，避免单个对象导致缓存结构不一致。
+                if paginate and not isinstance(result, (list, tuple)):
+                    cache_metrics.record_load(client, metrics_prefix, load_seconds)
+                    return result
+
+                try:
+                    payload = cache_codec.encode(result)
+                except Exception as exc:  # noqa: BLE001
+                    logger.warning("序列化缓存数据失败 %s: %s", cache_key, exc)
+                    cache_metrics.record_load(client, metrics_prefix, load_seconds)
+                    return result
+                cache_metrics.record_load(client, metrics_prefix, load_seconds, len(payload))
+
+                if tags:
+                    _safe_redis_setex_tagged(client, cache_key, int(expire_time), payload, tags)
+                else:
+                    _safe_redis_setex(client, cache_key, int(expire_time), payload)
+                if local_cache is not None:
+                    local_cache.set(cache_key, payload, expire_time)
+                return result
+
             cached = _safe_redis_get(client, cache_key)
             if cached is not None:
                 try:
-                    return pickle.loads(cached)
+                    result = cache_codec.decode(cached)
                 except Exception as exc:  # noqa: BLE001
                     logger.debug("反序列化缓存数据失败 %s: %s", cache_key, exc)
+                else:
+                    ttl = None
+                    if local_cache is not None or soft_ttl > 0:
+                        ttl = _safe_redis_ttl(client, cache_key)
+                    if soft_ttl > 0 and ttl is not None and expire_time - ttl > soft_ttl:
+                        _refresh_in_background(client, cache_key, compute_and_store, lock_timeout)
+                    if local_cache is not None:
+                        local_cache.set(cache_key, cached, ttl)
+                    cache_metrics.record_hit(client, metrics_prefix)
+                    return result
+
+            cache_metrics.record_miss(client, metrics_prefix)
+            if single_flight:
+                return _single_flight(client, cache_key, compute_and_store, cache_codec.decode,
+                                      lock_timeout, wait_timeout)
+            return compute_and_store()
 
-            result = func(*args, **kwargs)
+        return wrapper
 
-            # 开启分页时仅缓存列表或元组，避免单个对象导致缓存结构不一致。
-            if paginate and not isinstance(result, (list, tuple)):
-                return result
+    return decorator
 
-            try:
-                payload = pickle.dumps(result)
-            except Exception as exc:  # noqa: BLE001
-                logger.warning("序列化缓存数据失败 %s: %s", cache_key, exc)
-                return result
 
-            _safe_redis_setex(client, cache_key, int(expire_time), payload)
-            return result
+def _single_flight(
+    client: LocalProxy,
+    cache_key: str,
+    compute: Callable[[], Any],
+    decode: Callable[[bytes], Any],
+    lock_timeout: int,
+    wait_timeout: float,
+) -> Any:
+    """
+    抢到锁的请求重算，其余请求轮询等待结果，等待超时或锁不可用时自行计算。
+    """
 
-        return wrapper
+    lock_key = f"{LOCK_KEY_PREFIX}{cache_key}"
+    token = _acquire_lock(client, lock_key, lock_timeout)
+    if token == "":
+        return compute()
+    if token is not None:
+        try:
+            return compute()
+        finally:
+            _release_lock(client, lock_key, token)
+
+    deadline = time.monotonic() + wait_timeout
+    while time.monotonic() < deadline:
+        time.sleep(LOCK_POLL_INTERVAL)
+        cached = _safe_redis_get(client, cache_key)
+        if cached is None:
+            continue
+        try:
+            return decode(cached)
+        except Exception as exc:  # noqa: BLE001
+            logger.debug("反序列化缓存数据失败 %s: %s", cache_key, exc)
+            break
+    logger.debug("等待缓存重算超时，自行计算 %s", cache_key)
+    return compute()
+
+
+def _refresh_in_background(
+    client: LocalProxy, cache_key: str, compute: Callable[[], Any], lock_timeout: int
+) -> None:
+    """
+    软过期后由抢到锁的请求提交后台重算，当前请求直接返回旧值。
+    """
 
-    return decorator
+    try:
+        app = current_app._get_current_object()
+    except RuntimeError:
+        return
+    lock_key = f"{LOCK_KEY_PREFIX}{cache_key}"
+    token = _acquire_lock(client, lock_key, lock_timeout)
+    if not token:
+        return
+    real_client = client._get_current_object() if hasattr(client, "_get_current_object") else client
+
+    def refresh() -> None:
+        try:
+            with app.app_context():
+                compute()
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("后台刷新缓存失败 %s: %s", cache_key, exc)
+        finally:
+            _release_lock(real_client, lock_key, token)
+
+    try:
+        _get_refresh_executor().submit(refresh)
+    except Exception as exc:  # noqa: BLE001
+        logger.warning("提交后台刷新失败 %s: %s", cache_key, exc)
+        _release_lock(real_client, lock_key, token)
+
+
+def _get_refresh_executor() -> ThreadPoolExecutor:
+    """
+    每个进程一个后台刷新线程池（fork 出的子进程重新创建）。
+    """
+
+    global _refresh_executor, _refresh_executor_pid
+    pid = os.getpid()
+    if _refresh_executor_pid != pid:
+        with _refresh_executor_lock:
+            if _refresh_executor_pid != pid:
+                _refresh_executor = ThreadPoolExecutor(
+                    max_workers=REFRESH_WORKERS, thread_name_prefix="custom-cache-refresh"
+                )
+                _refresh_executor_pid = pid
+    return _refresh_executor
+
+
+def _acquire_lock(client: Any, lock_key: str, lock_timeout: int) -> str | None:
+    """
+    SET NX EX 加锁，返回锁标识；已被占用时返回 None，Redis 异常时返回空字符串（不加锁直接计算）。
+    """
+
+    token = uuid.uuid4().hex
+    try:
+        if client.set(lock_key, token, nx=True, ex=max(int(lock_timeout), 1)):
+            return token
+    except Exception as exc:  # noqa: BLE001
+        logger.warning("获取缓存锁失败 %s: %s", lock_key, exc)
+        return ""
+    return None
+
+
+def _release_lock(client: Any, lock_key: str, token: str) -> None:
+    try:
+        client.eval(RELEASE_LOCK_SCRIPT, 1, lock_key, token)
+    except Exception as exc:  # noqa: BLE001
+        logger.warning("释放缓存锁失败 %s: %s", lock_key, exc)
+
+
+def _resolve_return_type(func: Callable) -> Any:
+    """
+    函数返回值类型注解，无法解析时返回 None（解码结果为普通字典/列表）。
+    """
+
+    try:
+        return typing.get_type_hints(func).get("return")
+    except Exception as exc:  # noqa: BLE001
+        logger.warning("解析返回值类型失败 %s: %s", func.__qualname__, exc)
+        return None
 
 
 def _resolve_redis_client() -> LocalProxy | None:
@@ -156,6 +384,44 @@ def _safe_redis_setex(client: LocalProxy, cache_key: str, expire: int, payload:
         logger.warning("写入缓存失败 %s: %s", cache_key, exc)
 
 
+def tag_key(tag: str) -> str:
+    return f"{TAG_KEY_PREFIX}{tag}"
+
+
+def _safe_redis_setex_tagged(
+    client: LocalProxy, cache_key: str, expire: int, payload: bytes, tags: Sequence[str]
+) -> None:
+    """
+    写入缓存并把 Key 记入各标签集合（同一个 pipeline）。
+    标签集合的过期时间随每次写入延长，集合中已过期的 Key 在按标签清理时一并删除（删除不存在的 Key 无副作用）。
+    """
+
+    tag_expire = max(expire, TAG_EXPIRE_SECONDS)
+
+    try:
+        pipeline = client.pipeline(transaction=False)
+        pipeline.setex(cache_key, expire, payload)
+        for tag in tags:
+            pipeline.sadd(tag_key(tag), cache_key)
+            pipeline.expire(tag_key(tag), tag_expire)
+        pipeline.execute()
+    except Exception as exc:  # noqa: BLE001
+        logger.warning("写入缓存失败 %s: %s", cache_key, exc)
+
+
+def _safe_redis_ttl(client: LocalProxy, cache_key: str) -> int | None:
+    """
+    读取 Key 的剩余过期时间，L1 不应比 Redis 中的数据保存得更久。
+    """
+
+    try:
+        ttl = client.ttl(cache_key)
+    except Exception as exc:  # noqa: BLE001
+        logger.debug("读取缓存过期时间失败 %s: %s", cache_key, exc)
+        return None
+    return ttl if ttl is not None and ttl >= 0 else None
+
+
 def _hash_arguments(params: Mapping[str, Any]) -> str:
     """
     将参数转为稳定 JSON，并计算 SHA1，避免直接存储长 JSON。
@@ -177,6 +443,9 @@ def _normalize_for_hash(value: Any) -> Any:
         return {str(k): _normalize_for_hash(v) for k, v in value.items()}
     if isinstance(value, (list, tuple, set)):
         return [_normalize_for_hash(v) for v in value]
+    if inspect.isclass(value) or inspect.isroutine(value):
+        # classmethod 绑定的 cls、函数按限定名参与哈希：其属性的 repr 含内存地址，各进程不同
+        return f"{value.__module__}.{value.__qualname__}"
     if hasattr(value, "__dict__"):
         data = {
             k: _normalize_for_hash(v)
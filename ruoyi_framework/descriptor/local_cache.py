@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+"""
+`custom_cacheable` 的进程内一级缓存（L1），位于 Redis 二级缓存之前。
+每个启用 L1 的装饰器持有一个有容量上限的 LRU/TTL 缓存；`custom_cache_evict` 清理 Redis 后
+通过 Redis pub/sub 广播清理模式（或按依赖标签清理时广播标签），
+各 gunicorn worker 的订阅线程据此清理本进程的 L1，保持一致。
+"""
+
+from __future__ import annotations
+
+import fnmatch
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+EVICT_CHANNEL = "custom_cache:evict"
+EVICT_TAG_CHANNEL = "custom_cache:evict_tag"
+LISTENER_RETRY_SECONDS = 5
+
+__all__ = ["LocalCache", "broadcast_evict", "broadcast_evict_tag", "evict_local", "evict_local_tag"]
+
+_caches: List["LocalCache"] = []
+_listener_lock = threading.Lock()
+_listener_pid: Optional[int] = None
+
+
+class LocalCache:
+    """
+    线程安全的 LRU + TTL 缓存，保存序列化后的结果，命中时每次反序列化出独立的对象，
+    与直接读取 Redis 的语义一致。
+    """
+
+    def __init__(self, max_size: int, ttl: float, tags: Sequence[str] = ()):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.tags = frozenset(tags)
+        self._data: "OrderedDict[str, tuple[float, bytes]]" = OrderedDict()
+        self._lock = threading.Lock()
+        _caches.append(self)
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            if item[0] <= time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return item[1]
+
+    def set(self, key: str, payload: bytes, ttl: Optional[float] = None) -> None:
+        expire_at = time.monotonic() + min(self.ttl, ttl if ttl is not None else self.ttl)
+        with self._lock:
+            self._data[key] = (expire_at, payload)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def evict(self, pattern: str) -> int:
+        """
+        按 Redis 通配符模式清理，返回清理的数量。
+        """
+
+        with self._lock:
+            keys = [key for key in self._data if fnmatch.fnmatchcase(key, pattern)]
+            for key in keys:
+                del self._data[key]
+        return len(keys)
+
+    def clear(self) -> int:
+        with self._lock:
+            count = len(self._data)
+            self._data.clear()
+        return count
+
+
+def evict_local(pattern: str) -> int:
+    """
+    清理本进程全部 L1 缓存中匹配模式的 Key。
+    """
+
+    return sum(cache.evict(pattern) for cache in list(_caches))
+
+
+def evict_local_tag(tag: str) -> int:
+    """
+    清空本进程带有该依赖标签的 L1 缓存（L1 不记录单个 Key 的标签，按装饰器整体清空）。
+    """
+
+    return sum(cache.clear() for cache in list(_caches) if tag in cache.tags)
+
+
+def broadcast_evict_tag(client: Any, tag: str) -> None:
+    """
+    清理本进程带有该标签的 L1，并通知其他进程清理。
+    """
+
+    evict_local_tag(tag)
+    try:
+        client.publish(EVICT_TAG_CHANNEL, tag)
+    except Exception as exc:  # noqa: BLE001
+        logger.warning("广播缓存标签清理失败 %s: %s", tag, exc)
+
+
+def broadcast_evict(client: Any, pattern: str) -> None:
+    """
+    清理本进程的 L1，并通知其他进程清理。
+    """
+
+    evict_local(pattern)
+    try:
+        client.publish(EVICT_CHANNEL, pattern)
+    except Exception as exc:  # noqa: BLE001
+        logger.warning("广播缓存清理失败 %s: %s", pattern, exc)
+
+
+def ensure_listener(client: Any) -> None:
+    """
+    每个进程启动一次订阅线程（fork 出的子进程会重新启动）。
+    client 需为真实的 Redis 连接对象，而不是依赖应用上下文的 LocalProxy。
+    """
+
+    global _listener_pid
+    pid = os.getpid()
+    if _listener_pid == pid:
+        return
+    with _listener_lock:
+        if _listener_pid == pid:
+            return
+        try:
+            client = client._get_current_object() if hasattr(client, "_get_current_object") else client
+        except Exception as exc:  # noqa: BLE001
+            logger.debug("获取 redis 连接失败，暂不订阅缓存清理: %s", exc)
+            return
+        thread = threading.Thread(target=_listen, args=(client,), name="custom-cache-evict", daemon=True)
+        thread.start()
+        _listener_pid = pid
+
+
+def _listen(client: Any) -> None:
+    """
+    订阅清理广播，连接断开后重试；断开期间的广播会丢失，L1 依赖 TTL 兜底。
+    """
+
+    while True:
+        try:
+            pubsub = client.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(EVICT_CHANNEL, EVICT_TAG_CHANNEL)
+            for message in pubsub.listen():
+                channel, data = message.get("channel"), message.get("data")
+                if isinstance(channel, bytes):
+                    channel = channel.decode("utf-8")
+                if isinstance(data, bytes):
+                    data = data.decode("utf-8")
+                if not data:
+                    continue
+                if channel == EVICT_TAG_CHANNEL:
+                    evict_local_tag(str(data))
+                else:
+                    evict_local(str(data))
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("订阅缓存清理广播失败: %s", exc)
+        time.sleep(LISTENER_RETRY_SECONDS)
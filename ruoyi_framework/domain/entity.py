@@ -15,6 +15,7 @@ from pydantic import BaseModel, Field
 
 from ruoyi_common.base.model import strict_base_config
 from ruoyi_common.utils import IpUtil
+from ruoyi_framework.descriptor.cache_metrics import collect as collect_cache_metrics
 
 
 
@@ -369,6 +370,44 @@ class RedisCommandStatsOption(BaseModel):
     value: Annotated[str, Field(coerce_numbers_to_str=True)]
     
 
+class RedisCacheMetricsOption(BaseModel):
+    
+    model_config = strict_base_config
+    
+    # 缓存前缀
+    prefix: str
+    
+    # 访问次数（命中 + 未命中）
+    requests: int
+    
+    # 命中次数（含进程内缓存命中）
+    hits: int
+    
+    # 进程内缓存命中次数
+    l1_hits: int
+    
+    # 未命中次数
+    misses: int
+    
+    # 命中率（%）
+    hit_rate: float
+    
+    # 回源加载次数
+    loads: int
+    
+    # 回源累计耗时（毫秒）
+    load_ms: float
+    
+    # 平均回源耗时（毫秒）
+    avg_load_ms: float
+    
+    # 写入缓存的序列化字节数
+    bytes: int
+    
+    # 平均每次写入字节数
+    avg_bytes: int
+    
+
 class RedisCache(BaseModel):
     
     model_config = strict_base_config
@@ -379,10 +418,12 @@ class RedisCache(BaseModel):
     
     command_stats: List[RedisCommandStatsOption]
     
+    cache_metrics: List[RedisCacheMetricsOption] = []
+    
     @classmethod
     def from_connection(cls, connection) -> "RedisCache":
         """
-        获取Redis缓存信息
+        获取Redis缓存信息，以及各 worker 累计的按缓存前缀统计的命中率指标
 
         Args:
             connection (redis.Redis): Redis连接
@@ -398,5 +439,6 @@ class RedisCache(BaseModel):
             key = key.replace('cmdstat_', '')
             value = value["calls"]
             command_stats.append(RedisCommandStatsOption(name=key, value=value))
-        return cls(info=info, db_size=db_size, command_stats=command_stats)
+        cache_metrics = [RedisCacheMetricsOption(**item) for item in collect_cache_metrics(connection)]
+        return cls(info=info, db_size=db_size, command_stats=command_stats, cache_metrics=cache_metrics)
 
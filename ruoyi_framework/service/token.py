@@ -10,6 +10,7 @@ from ruoyi_common.utils.base import UserAgentUtil
 from ruoyi_common.constant import Constants
 from ruoyi_common.domain.entity import LoginUser
 from ruoyi_framework.config import TokenConfig
+from ruoyi_framework.descriptor import cache_metrics
 try:
     from ruoyi_admin.ext import redis_cache
 except Exception:
@@ -148,6 +149,10 @@ class TokenService:
             usertoken_key = cls.get_token_key(token_uuid)
             if redis_cache:
                 jsoned_user = redis_cache.get(usertoken_key)
+                if jsoned_user:
+                    cache_metrics.record_hit(redis_cache, Constants.LOGIN_TOKEN_KEY)
+                else:
+                    cache_metrics.record_miss(redis_cache, Constants.LOGIN_TOKEN_KEY)
             else:
                 jsoned_user = None
             if not jsoned_user:
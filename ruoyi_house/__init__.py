@@ -2,6 +2,29 @@
 # @Module: house
 # @Author: YY
 
+import sys
+from types import ModuleType
+
+from ruoyi_common.descriptor.listener import ModuleSignalListener
+from ruoyi_common.base.signal import module_initailize
+from ruoyi_common.ruoyi.registry import RuoYiModuleRegistry
+
+reg: RuoYiModuleRegistry
+
+
+@ModuleSignalListener(sys.modules[__name__], module_initailize)
+def import_hook(module: ModuleType, registry: RuoYiModuleRegistry):
+    """
+    注册模块
+
+    Args:
+        module: 模块对象
+        registry: 模块注册器
+    """
+    global reg
+    reg = registry
+
+
 def init_app(app):
     """
     初始化模块，注册蓝图
@@ -122,6 +122,20 @@ def decoration_type_statistics(dto: HouseStatisticsRequest):
     return AjaxResponse.from_success(data=service.decoration_type_statistics(statistics_entity))
 
 
+"""仪表盘（一次扫描计算全部维度）"""
+@gen.route('/dashboard', methods=["GET"])
+@QueryValidator(is_page=True)
+@PreAuthorize(HasPerm('house:house:statistics'))
+@JsonSerializer()
+def dashboard_statistics(dto: HouseStatisticsRequest):
+    statistics_entity = HouseStatisticsRequest()
+    # 转换dto到Entity对象
+    for attr in dto.model_fields.keys():
+        if hasattr(statistics_entity, attr):
+            setattr(statistics_entity, attr, getattr(dto, attr))
+    return AjaxResponse.from_success(data=service.dashboard_statistics(statistics_entity))
+
+
 """价格预测"""
 @gen.route('/price_predict', methods=["GET"])
 @QueryValidator(is_page=True)
@@ -135,3 +149,11 @@ def price_predict(dto: HouseStatisticsRequest):
             setattr(statistics_entity, attr, getattr(dto, attr))
     # 使用详细数据分析进行预测
     return AjaxResponse.from_success(data=service.price_predict_detailed(statistics_entity))
+
+
+"""价格预测模型"""
+@gen.route('/price_predict/models', methods=["GET"])
+@PreAuthorize(HasPerm('house:house:statistics'))
+@JsonSerializer()
+def price_predict_models():
+    return AjaxResponse.from_success(data=service.select_price_predict_models())
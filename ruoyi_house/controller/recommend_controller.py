@@ -195,3 +195,12 @@ def get_my_recommendations():
     except Exception as e:
         LogUtil.logger.error(f"[推荐接口] 获取用户{user_id}推荐失败: {str(e)}", exc_info=True)
         return AjaxResponse.from_error(msg=f'获取推荐失败: {str(e)}')
+
+
+@gen.route('/queue/stats', methods=['GET'])
+@PreAuthorize(HasPerm('house:recommend:list'))
+@JsonSerializer()
+def get_generation_queue_stats():
+    """获取推荐生成队列统计信息"""
+    stats = recommend_service.get_generation_queue_stats()
+    return AjaxResponse.from_success(data=stats)
@@ -3,7 +3,7 @@
 # @FileName: house.py
 # @Time    : 2026-01-10 17:29:50
 
-from typing import Optional, Annotated
+from typing import List, Optional, Annotated
 from pydantic import Field, BeforeValidator
 from ruoyi_common.base.model import BaseEntity
 from ruoyi_common.base.transformer import str_to_int, str_to_float
@@ -198,6 +198,10 @@ class House(BaseEntity):
         Optional[bool],
         Field(default=None, description="是否点赞")
     ]
+    similar_house_ids: Annotated[
+        Optional[List[str]],
+        Field(default=None, description="相似房源ID列表")
+    ]
 
     # 页码
     page_num: Optional[int] = Field(default=1, description="页码")
@@ -5,3 +5,5 @@ from .house_po import HousePo
 from .like_po import LikePo
 from .recommend_po import RecommendPo
 from .view_po import ViewPo
+from .house_statistics_aggregate_po import HouseStatisticsAggregatePo
+from .house_tag_po import HouseTagPo
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+# @Author  : YY
+# @FileName: house_statistics_aggregate_po.py
+# @Time    : 2026-01-10 17:29:50
+
+from typing import Optional
+
+from sqlalchemy import BigInteger, Index, Integer, Numeric, String, Text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from ruoyi_admin.ext import db
+
+class HouseStatisticsAggregatePo(db.Model):
+    """
+    房源统计预聚合PO对象
+    """
+    __tablename__ = 'tb_house_statistics_aggregate'
+    __table_args__ = (
+        Index('idx_house_statistics_aggregate_group', 'filter_dimension', 'filter_value', 'dimension'),
+        {'comment': '房源统计预聚合'}
+    )
+    id: Mapped[int] = mapped_column(
+        'id',
+        BigInteger,
+        primary_key=True,
+        autoincrement=True,
+        nullable=False,
+        comment='编号'
+    )
+    filter_dimension: Mapped[str] = mapped_column(
+        'filter_dimension',
+        String(32),
+        nullable=False,
+        default='',
+        comment='过滤维度（空为不过滤）'
+    )
+    filter_value: Mapped[str] = mapped_column(
+        'filter_value',
+        String(255),
+        nullable=False,
+        default='',
+        comment='过滤值'
+    )
+    dimension: Mapped[str] = mapped_column(
+        'dimension',
+        String(32),
+        nullable=False,
+        comment='统计维度'
+    )
+    name: Mapped[Optional[str]] = mapped_column(
+        'name',
+        String(1024),
+        nullable=True,
+        comment='分组值'
+    )
+    house_count: Mapped[int] = mapped_column(
+        'house_count',
+        Integer,
+        nullable=False,
+        default=0,
+        comment='房源数'
+    )
+    value_count: Mapped[int] = mapped_column(
+        'value_count',
+        Integer,
+        nullable=False,
+        default=0,
+        comment='统计值非空的房源数'
+    )
+    value_sum: Mapped[Optional[int]] = mapped_column(
+        'value_sum',
+        Numeric(20, 0),
+        nullable=False,
+        default=0,
+        comment='统计值合计'
+    )
+    value_min: Mapped[Optional[int]] = mapped_column(
+        'value_min',
+        Numeric(10, 0),
+        nullable=True,
+        comment='统计值最小值'
+    )
+    value_max: Mapped[Optional[int]] = mapped_column(
+        'value_max',
+        Numeric(10, 0),
+        nullable=True,
+        comment='统计值最大值'
+    )
+    value_sketch: Mapped[Optional[str]] = mapped_column(
+        'value_sketch',
+        Text,
+        nullable=True,
+        comment='统计值分位数草图（JSON）'
+    )
@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+# @Author  : YY
+# @FileName: house_tag_po.py
+# @Time    : 2026-01-10 17:29:50
+
+from sqlalchemy import Index, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from ruoyi_admin.ext import db
+
+class HouseTagPo(db.Model):
+    """
+    房源标签PO对象（tb_house.tags 按分号拆分后的关联表）
+    """
+    __tablename__ = 'tb_house_tag'
+    __table_args__ = (
+        Index('idx_house_tag_tag', 'tag', 'house_id'),
+        {'comment': '房源标签'}
+    )
+    house_id: Mapped[str] = mapped_column(
+        'house_id',
+        String(255),
+        primary_key=True,
+        autoincrement=False,
+        nullable=False,
+        comment='房源编号'
+    )
+    tag: Mapped[str] = mapped_column(
+        'tag',
+        String(255),
+        primary_key=True,
+        autoincrement=False,
+        nullable=False,
+        comment='标签'
+    )
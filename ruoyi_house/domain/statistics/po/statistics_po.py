@@ -12,4 +12,7 @@ class StatisticsPo(BaseModel):
     avg: Optional[Union[float, int, str]] = None
     max: Optional[Union[float, int, str]] = None
     min: Optional[Union[float, int, str]] = None
-
+    median: Optional[Union[float, int, str]] = None
+    p25: Optional[Union[float, int, str]] = None
+    p75: Optional[Union[float, int, str]] = None
+    p90: Optional[Union[float, int, str]] = None
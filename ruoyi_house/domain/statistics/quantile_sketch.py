@@ -0,0 +1,134 @@
+import json
+import math
+from typing import Dict, Iterable, Optional
+
+
+class QuantileSketch:
+    """
+    对数分桶分位数草图
+
+    正数值 v 记入桶 ceil(log(v) / log(gamma))，gamma = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)，
+    桶的代表值与桶内任一值的相对误差不超过 RELATIVE_ACCURACY，非正数记入零值桶。
+    桶计数可加可减：房源删除、修改时能精确移除旧值，多个草图按桶计数相加即可合并
+    """
+
+    RELATIVE_ACCURACY = 0.01
+    # 统计结果中的分位数字段：(字段名, 分位点)
+    QUANTILES = (('p25', 0.25), ('median', 0.5), ('p75', 0.75), ('p90', 0.9))
+    ZERO_KEY = 'z'
+
+    _GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+    _LOG_GAMMA = math.log(_GAMMA)
+
+    def __init__(self, buckets: Dict[int, int] = None, zero_count: int = 0):
+        # 桶序号 -> 值个数
+        self.buckets = dict(buckets or {})
+        self.zero_count = zero_count
+
+    @property
+    def count(self) -> int:
+        return self.zero_count + sum(self.buckets.values())
+
+    @classmethod
+    def from_values(cls, values: Iterable) -> 'QuantileSketch':
+        sketch = cls()
+        for value in values:
+            sketch.add(value)
+        return sketch
+
+    @classmethod
+    def bucket_of(cls, value: float) -> int:
+        return math.ceil(math.log(value) / cls._LOG_GAMMA)
+
+    @classmethod
+    def bucket_value(cls, bucket: int) -> float:
+        """
+        桶的代表值（与桶上下界的相对误差相同）
+        """
+        return 2 * cls._GAMMA ** bucket / (cls._GAMMA + 1)
+
+    def add(self, value, weight: int = 1) -> 'QuantileSketch':
+        """
+        记入一个值，weight 为负数时移除
+        """
+        value = float(value)
+        if value <= 0:
+            self.zero_count += weight
+            return self
+        bucket = self.bucket_of(value)
+        count = self.buckets.get(bucket, 0) + weight
+        if count:
+            self.buckets[bucket] = count
+        else:
+            self.buckets.pop(bucket, None)
+        return self
+
+    def remove(self, value) -> 'QuantileSketch':
+        return self.add(value, -1)
+
+    def merge(self, other: 'QuantileSketch') -> 'QuantileSketch':
+        for bucket, count in other.buckets.items():
+            merged = self.buckets.get(bucket, 0) + count
+            if merged:
+                self.buckets[bucket] = merged
+            else:
+                self.buckets.pop(bucket, None)
+        self.zero_count += other.zero_count
+        return self
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        第 int(q * (n - 1)) 小（从0开始）的值的近似值
+
+        Args:
+            q (float): 分位点，0 到 1
+
+        Returns:
+            Optional[float]: 近似值，草图为空时返回None
+        """
+        total = self.count
+        if total <= 0:
+            return None
+        rank = int(q * (total - 1))
+        if rank < self.zero_count:
+            return 0.0
+        cumulative = self.zero_count
+        for bucket in sorted(self.buckets):
+            cumulative += self.buckets[bucket]
+            if cumulative > rank:
+                return self.bucket_value(bucket)
+        return self.bucket_value(max(self.buckets))
+
+    def quantiles(self, value_min=None, value_max=None) -> Dict[str, Optional[float]]:
+        """
+        QUANTILES 中全部分位数，已知分组最小、最大值时把近似值限制在该范围内
+
+        Returns:
+            Dict[str, Optional[float]]: 字段名 -> 近似值
+        """
+        result = {}
+        for name, q in self.QUANTILES:
+            value = self.quantile(q)
+            if value is not None and value_min is not None:
+                value = max(value, float(value_min))
+            if value is not None and value_max is not None:
+                value = min(value, float(value_max))
+            result[name] = round(value, 2) if value is not None else None
+        return result
+
+    def dumps(self) -> Optional[str]:
+        """
+        序列化为 JSON（桶序号 -> 个数，零值桶为 ZERO_KEY），草图为空时返回None
+        """
+        data = {str(bucket): count for bucket, count in sorted(self.buckets.items())}
+        if self.zero_count:
+            data[self.ZERO_KEY] = self.zero_count
+        return json.dumps(data, separators=(',', ':')) if data else None
+
+    @classmethod
+    def loads(cls, text: Optional[str]) -> 'QuantileSketch':
+        if not text:
+            return cls()
+        data = json.loads(text)
+        zero_count = data.pop(cls.ZERO_KEY, 0)
+        return cls({int(bucket): count for bucket, count in data.items()}, zero_count)
@@ -1 +1,2 @@
+from .price_forecast_model_vo import PriceForecastModelVo
 from .statistics_vo import StatisticsVo
@@ -0,0 +1,32 @@
+from typing import Dict, Optional
+
+from pydantic import BaseModel, ConfigDict
+from pydantic.alias_generators import to_camel
+
+
+class PriceForecastModelVo(BaseModel):
+    """
+    价格预测模型对象
+    """
+    model_config = ConfigDict(alias_generator=to_camel, populate_by_name=True)
+
+    # 模型编号（过滤条件的哈希）
+    segment_key: Optional[str] = None
+    # 过滤条件
+    segment: Dict[str, str] = {}
+    # 开始年份
+    start_year: Optional[int] = None
+    # 预测年数
+    predict_year: Optional[int] = None
+    # 构建时的房源数据版本
+    data_version: Optional[int] = None
+    # 是否为当前数据版本
+    current: bool = False
+    # 构建时间
+    build_time: Optional[str] = None
+    # 构建耗时（毫秒）
+    build_cost: Optional[float] = None
+    # 历史年份数
+    history_years: Optional[int] = None
+    # 模型系数
+    coefficients: Dict[str, float] = {}
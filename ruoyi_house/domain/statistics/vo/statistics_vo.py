@@ -12,3 +12,7 @@ class StatisticsVo(BaseModel):
     avg: Optional[float] = None
     max: Optional[float] = None
     min: Optional[float] = None
+    median: Optional[float] = None
+    p25: Optional[float] = None
+    p75: Optional[float] = None
+    p90: Optional[float] = None
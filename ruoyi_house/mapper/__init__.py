@@ -1,7 +1,10 @@
 # -*- coding: utf-8 -*-
 # @Module: ruoyi_house/mapper
 
+from .house_candidate_index import HouseCandidateIndex
 from .house_mapper import HouseMapper
+from .house_statistics_aggregate_mapper import HouseStatisticsAggregateMapper
+from .house_tag_mapper import HouseTagMapper
 from .like_mapper import LikeMapper
 from .recommend_mapper import RecommendMapper
 from .view_mapper import ViewMapper
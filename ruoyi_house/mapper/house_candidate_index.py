@@ -0,0 +1,299 @@
+# -*- coding: utf-8 -*-
+# @Author  : YY
+# @FileName: house_candidate_index.py
+# @Time    : 2026-01-10 17:29:50
+
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import select
+
+from ruoyi_admin.ext import db
+from ruoyi_house.domain.po import HousePo
+
+
+class HouseCandidateIndex:
+    """
+    房源候选倒排索引（进程级）
+
+    按镇、户型、朝向、标签将属性值映射到有序的房源内部编号数组，
+    用于推荐候选采样，避免逐条件查询数据库（各进程的索引最多滞后一个重建间隔，
+    不用于房源列表等需要精确结果的查询）。
+    内部编号按房源ID升序分配，倒序遍历即为“最近房源”顺序。
+    查询在锁内一次完成编号查找和特征读取，重建替换索引不会使编号对应到其他房源；
+    同一时间只有一个线程重建，其他线程继续使用旧索引。
+    """
+
+    DIMENSIONS = ('town', 'house_type', 'orientation', 'tags')
+    REBUILD_INTERVAL = 600  # 定期全量重建（秒），同步其他进程的写入
+
+    _lock = threading.RLock()
+    _rebuild_lock = threading.Lock()
+    _built_time: Optional[float] = None
+    # 重建期间的增量变更，替换索引后重放：(房源ID, 特征)，特征为None表示删除
+    _pending_changes: Optional[List[Tuple[str, Optional[Tuple]]]] = None
+    # 房源ID -> 内部编号
+    _doc_ids: Dict[str, int] = {}
+    # 内部编号 -> (房源ID, 镇, 户型, 朝向, 标签)，已删除的为None
+    _features: List[Optional[Tuple]] = []
+    # 维度 -> 属性值 -> 有序内部编号数组
+    _postings: Dict[str, Dict[str, np.ndarray]] = {}
+
+    @classmethod
+    def is_ready(cls) -> bool:
+        """
+        索引是否可用
+        """
+        return cls._built_time is not None
+
+    @classmethod
+    def ensure_fresh(cls) -> bool:
+        """
+        索引未构建或超过重建间隔时重新构建
+        已有索引时只由抢到重建锁的线程重建，其他线程直接使用旧索引；首次构建时等待
+
+        Returns:
+            bool: 索引是否可用
+        """
+        if cls._is_stale() and cls._rebuild_lock.acquire(blocking=not cls.is_ready()):
+            try:
+                if cls._is_stale():
+                    cls._build()
+            finally:
+                cls._rebuild_lock.release()
+        return cls.is_ready()
+
+    @classmethod
+    def rebuild(cls) -> None:
+        """
+        从数据库全量构建索引
+        """
+        with cls._rebuild_lock:
+            cls._build()
+
+    @classmethod
+    def _is_stale(cls) -> bool:
+        return cls._built_time is None or time.time() - cls._built_time >= cls.REBUILD_INTERVAL
+
+    @classmethod
+    def _build(cls) -> None:
+        """
+        读取数据库构建新索引后整体替换（调用方持有重建锁），读取期间的增量变更在替换后重放
+        """
+        with cls._lock:
+            cls._pending_changes = []
+        try:
+            stmt = select(HousePo.house_id, HousePo.town, HousePo.house_type, HousePo.orientation, HousePo.tags) \
+                .order_by(HousePo.house_id)
+            rows = db.session.execute(stmt).all()
+        except Exception as e:
+            print(f"构建房源候选索引出错: {e}")
+            with cls._lock:
+                cls._pending_changes = None
+            return
+        doc_ids = {}
+        features = []
+        buckets = {dimension: {} for dimension in cls.DIMENSIONS}
+        for row in rows:
+            feature = cls._normalize(*row)
+            doc_id = len(features)
+            doc_ids[feature[0]] = doc_id
+            features.append(feature)
+            for dimension, value in cls._feature_values(feature):
+                buckets[dimension].setdefault(value, []).append(doc_id)
+        postings = {
+            dimension: {value: np.asarray(ids, dtype=np.int32) for value, ids in values.items()}
+            for dimension, values in buckets.items()
+        }
+        with cls._lock:
+            cls._doc_ids = doc_ids
+            cls._features = features
+            cls._postings = postings
+            cls._built_time = time.time()
+            pending_changes, cls._pending_changes = cls._pending_changes, None
+            for house_id, feature in pending_changes:
+                if feature is None:
+                    cls._remove_house(house_id)
+                else:
+                    cls._add_feature(feature)
+
+    @classmethod
+    def add_house(cls, house_id: str, town: Optional[str], house_type: Optional[str],
+                  orientation: Optional[str], tags: Optional[str]) -> None:
+        """
+        新增或更新索引中的房源
+
+        Args:
+            house_id (str): 房源ID
+            town (str): 镇
+            house_type (str): 户型
+            orientation (str): 朝向
+            tags (str): 标签，以;分隔
+        """
+        if not house_id:
+            return
+        feature = cls._normalize(house_id, town, house_type, orientation, tags)
+        with cls._lock:
+            if cls._pending_changes is not None:
+                cls._pending_changes.append((house_id, feature))
+            if cls.is_ready():
+                cls._add_feature(feature)
+
+    @classmethod
+    def remove_houses(cls, house_ids: Iterable[str]) -> None:
+        """
+        从索引中删除房源
+
+        Args:
+            house_ids (Iterable[str]): 房源ID列表
+        """
+        with cls._lock:
+            for house_id in house_ids:
+                if cls._pending_changes is not None:
+                    cls._pending_changes.append((house_id, None))
+                if cls.is_ready():
+                    cls._remove_house(house_id)
+
+    @classmethod
+    def select_features_by_value(cls, dimension: str, value: str, limit: int) -> List[Tuple]:
+        """
+        取属性值对应的房源特征（按房源ID倒序）
+
+        Args:
+            dimension (str): 维度
+            value (str): 属性值
+            limit (int): 限制数量
+
+        Returns:
+            List[Tuple]: (房源ID, 镇, 户型, 朝向, 标签) 列表
+        """
+        with cls._lock:
+            return cls._select_features(cls._select_doc_ids(dimension, value), limit)
+
+    @classmethod
+    def select_features_by_tag(cls, keyword: str, limit: int) -> List[Tuple]:
+        """
+        取标签包含关键词的房源特征（与 LIKE '%keyword%' 匹配单个标签等价，按房源ID倒序）
+
+        Args:
+            keyword (str): 标签关键词
+            limit (int): 限制数量
+
+        Returns:
+            List[Tuple]: (房源ID, 镇, 户型, 朝向, 标签) 列表
+        """
+        with cls._lock:
+            tags = [tag for tag in cls._postings.get('tags', {}) if keyword in tag]
+            postings = [cls._select_doc_ids('tags', tag) for tag in tags]
+            postings = [posting for posting in postings if len(posting)]
+            if not postings:
+                return []
+            doc_ids = postings[0] if len(postings) == 1 else np.unique(np.concatenate(postings))
+            return cls._select_features(doc_ids, limit)
+
+    @classmethod
+    def select_recent_features(cls, limit: int) -> List[Tuple]:
+        """
+        取最近房源的特征（按房源ID倒序）
+
+        Args:
+            limit (int): 限制数量
+
+        Returns:
+            List[Tuple]: 特征列表
+        """
+        result = []
+        with cls._lock:
+            for feature in reversed(cls._features):
+                if feature is not None:
+                    result.append(feature)
+                    if len(result) >= limit:
+                        break
+        return result
+
+    @classmethod
+    def _add_feature(cls, feature: Tuple) -> None:
+        """
+        写入房源特征（调用方持有锁）
+        """
+        house_id = feature[0]
+        doc_id = cls._doc_ids.get(house_id)
+        if doc_id is None:
+            doc_id = len(cls._features)
+            cls._doc_ids[house_id] = doc_id
+            cls._features.append(None)
+        else:
+            cls._remove_postings(doc_id)
+        cls._features[doc_id] = feature
+        for dimension, value in cls._feature_values(feature):
+            values = cls._postings[dimension]
+            posting = values.get(value)
+            if posting is None:
+                values[value] = np.asarray([doc_id], dtype=np.int32)
+            else:
+                position = np.searchsorted(posting, doc_id)
+                values[value] = np.insert(posting, position, doc_id)
+
+    @classmethod
+    def _remove_house(cls, house_id: str) -> None:
+        """
+        删除房源特征（调用方持有锁）
+        """
+        doc_id = cls._doc_ids.pop(house_id, None)
+        if doc_id is not None:
+            cls._remove_postings(doc_id)
+            cls._features[doc_id] = None
+
+    @classmethod
+    def _select_doc_ids(cls, dimension: str, value: str) -> np.ndarray:
+        return cls._postings.get(dimension, {}).get(value, np.empty(0, dtype=np.int32))
+
+    @classmethod
+    def _select_features(cls, doc_ids: np.ndarray, limit: int) -> List[Tuple]:
+        """
+        根据有序内部编号倒序取房源特征（调用方持有锁，编号与特征来自同一份索引）
+        """
+        features = cls._features
+        result = []
+        for doc_id in doc_ids[::-1][:limit]:
+            feature = features[doc_id]
+            if feature is not None:
+                result.append(feature)
+        return result
+
+    @classmethod
+    def _remove_postings(cls, doc_id: int) -> None:
+        feature = cls._features[doc_id]
+        if feature is None:
+            return
+        for dimension, value in cls._feature_values(feature):
+            values = cls._postings[dimension]
+            posting = values.get(value)
+            if posting is None:
+                continue
+            position = np.searchsorted(posting, doc_id)
+            if position < len(posting) and posting[position] == doc_id:
+                posting = np.delete(posting, position)
+            if len(posting):
+                values[value] = posting
+            else:
+                values.pop(value, None)
+
+    @staticmethod
+    def _normalize(house_id, town, house_type, orientation, tags) -> Tuple:
+        tag_set = tuple(sorted({tag.strip() for tag in tags.split(';') if tag.strip()})) if tags else ()
+        return house_id, town or None, house_type or None, orientation or None, tag_set
+
+    @staticmethod
+    def _feature_values(feature: Tuple):
+        _, town, house_type, orientation, tags = feature
+        if town:
+            yield 'town', town
+        if house_type:
+            yield 'house_type', house_type
+        if orientation:
+            yield 'orientation', orientation
+        for tag in tags:
+            yield 'tags', tag
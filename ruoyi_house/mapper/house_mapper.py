@@ -3,7 +3,7 @@
 # @FileName: house_mapper.py
 # @Time    : 2026-01-10 17:29:50
 
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from datetime import datetime
 
 from flask import g
@@ -12,10 +12,14 @@ from sqlalchemy import select, update, delete
 from ruoyi_admin.ext import db
 from ruoyi_house.domain.entity import House
 from ruoyi_house.domain.po import HousePo
+from ruoyi_house.mapper.house_candidate_index import HouseCandidateIndex
+from ruoyi_house.mapper.house_tag_mapper import HouseTagMapper
 
 class HouseMapper:
     """房源信息Mapper"""
 
+    SELECT_BY_IDS_BATCH_SIZE = 500  # 批量查询时每条IN语句的最大ID数量
+
     @classmethod
     def select_house_list(cls, house: House) -> List[House]:
         """
@@ -77,7 +81,7 @@ class HouseMapper:
                 stmt = stmt.where(HousePo.decoration_type.like("%" + str(house.decoration_type) + "%"))
 
             if house.tags:
-                stmt = stmt.where(HousePo.tags.like("%" + str(house.tags) + "%"))
+                stmt = stmt.where(HouseTagMapper.tags_condition(str(house.tags)))
 
             if house.property_right_type:
                 stmt = stmt.where(HousePo.property_right_type.like("%" + str(house.property_right_type) + "%"))
@@ -117,6 +121,35 @@ class HouseMapper:
             return None
 
 
+    @classmethod
+    def select_houses_by_ids(cls, house_ids: List[str]) -> Tuple[List[House], List[str]]:
+        """
+        根据ID列表批量查询房源信息（保持传入顺序）
+
+        Args:
+            house_ids (List[str]): 房源编号列表
+
+        Returns:
+            Tuple[List[House], List[str]]: (房源列表, 未查询到的房源编号列表)
+        """
+        if not house_ids:
+            return [], []
+        ids = [str(house_id) for house_id in house_ids]
+        try:
+            house_map = {}
+            unique_ids = list(dict.fromkeys(ids))
+            for start in range(0, len(unique_ids), cls.SELECT_BY_IDS_BATCH_SIZE):
+                batch = unique_ids[start:start + cls.SELECT_BY_IDS_BATCH_SIZE]
+                stmt = select(HousePo).where(HousePo.house_id.in_(batch))
+                for item in db.session.execute(stmt).scalars().all():
+                    house_map[item.house_id] = House.model_validate(item)
+            houses = [house_map[house_id] for house_id in ids if house_id in house_map]
+            missing_ids = [house_id for house_id in ids if house_id not in house_map]
+            return houses, missing_ids
+        except Exception as e:
+            print(f"根据ID列表批量查询房源信息出错: {e}")
+            return [], ids
+
     @classmethod
     def insert_house(cls, house: House) -> int:
         """
@@ -158,8 +191,11 @@ class HouseMapper:
             new_po.image_urls = house.image_urls
             new_po.property_type = house.property_type
             db.session.add(new_po)
+            HouseTagMapper.stage_house_tags(new_po.house_id, new_po.tags)
             db.session.commit()
             house.house_id = new_po.house_id
+            HouseCandidateIndex.add_house(new_po.house_id, new_po.town, new_po.house_type, new_po.orientation,
+                                          new_po.tags)
             return 1
         except Exception as e:
             db.session.rollback()
@@ -210,7 +246,10 @@ class HouseMapper:
             existing.house_intro = house.house_intro
             existing.image_urls = house.image_urls
             existing.property_type = house.property_type
+            HouseTagMapper.stage_house_tags(existing.house_id, existing.tags)
             db.session.commit()
+            HouseCandidateIndex.add_house(existing.house_id, existing.town, existing.house_type,
+                                          existing.orientation, existing.tags)
             return 1
 
         except Exception as e:
@@ -232,7 +271,9 @@ class HouseMapper:
         try:
             stmt = delete(HousePo).where(HousePo.house_id.in_(ids))
             result = db.session.execute(stmt)
+            HouseTagMapper.stage_delete_houses(ids)
             db.session.commit()
+            HouseCandidateIndex.remove_houses(ids)
             return result.rowcount
         except Exception as e:
             db.session.rollback()
@@ -371,7 +412,7 @@ class HouseMapper:
             List[House]: 房源列表
         """
         try:
-            stmt = select(HousePo).where(HousePo.tags.like(f"%{tag}%")).order_by(HousePo.house_id.desc()).limit(limit)
+            stmt = select(HousePo).where(HouseTagMapper.tags_condition(tag)).order_by(HousePo.house_id.desc()).limit(limit)
             result = db.session.execute(stmt)
             house_pos = result.scalars().all()
 
@@ -387,3 +428,19 @@ class HouseMapper:
         except Exception as e:
             print(f"根据标签'{tag}'模糊查询房源出错: {e}")
             return []
+
+    @classmethod
+    def select_house_feature_rows(cls) -> List[Tuple]:
+        """
+        查询全部房源的推荐特征列（房源ID、镇、户型、朝向、标签）
+
+        Returns:
+            List[Tuple]: 特征行列表
+        """
+        try:
+            stmt = select(HousePo.house_id, HousePo.town, HousePo.house_type, HousePo.orientation, HousePo.tags) \
+                .order_by(HousePo.house_id.desc())
+            return [tuple(row) for row in db.session.execute(stmt).all()]
+        except Exception as e:
+            print(f"查询房源特征列出错: {e}")
+            return []
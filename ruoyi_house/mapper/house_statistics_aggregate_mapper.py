@@ -0,0 +1,395 @@
+# -*- coding: utf-8 -*-
+# @Author  : YY
+# @FileName: house_statistics_aggregate_mapper.py
+# @Time    : 2026-01-10 17:29:50
+
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+from sqlalchemy import delete, func, insert, or_, select
+
+from ruoyi_admin.ext import db
+from ruoyi_house.domain.entity import House
+from ruoyi_house.domain.po import HousePo, HouseStatisticsAggregatePo, HouseTagPo
+from ruoyi_house.domain.statistics.po import StatisticsPo
+from ruoyi_house.domain.statistics.quantile_sketch import QuantileSketch
+from ruoyi_house.mapper.house_tag_mapper import HouseTagMapper
+
+
+class HouseStatisticsAggregateMapper:
+    """
+    房源统计预聚合数据访问类
+
+    按 (过滤维度, 过滤值, 统计维度, 分组值) 保存房源数和统计值的 count/sum/min/max 及分位数草图，
+    过滤维度为空的行即不带条件的统计，标签维度按单个标签分组。房源增删改时按差量更新，定时全量重建修复偏差
+
+    统计数据来源为 snapshot 时统计接口读取进程内列式快照，预聚合既不读取也不维护（房源写入不做差量更新，
+    定时重建直接跳过）；来源为 aggregate 时不使用快照，读取和维护预聚合
+    """
+
+    # 统计数据来源：snapshot（房源列式快照）或 aggregate（预聚合表）
+    STATISTICS_SOURCE = 'snapshot'
+
+    # 可以直接使用预聚合的等值过滤条件（与 HouseStatisticsMapper.builder_where 对应）
+    FILTER_DIMENSIONS = ('town', 'community', 'house_type', 'orientation', 'decoration_type')
+    NO_FILTER = ''
+    REBUILD_YIELD_PER = 2000
+    INSERT_BATCH_SIZE = 1000
+
+    _ready = False
+
+    @classmethod
+    def dimensions(cls):
+        """
+        统计维度：(维度名, 分组列, 统计列, 是否排除空值)
+        与各维度单独查询的分组、统计列和过滤条件保持一致，价格维度只统计数量
+        """
+        return (
+            ('orientation', HousePo.orientation, HousePo.unit_price, False),
+            ('town', HousePo.town, HousePo.unit_price, False),
+            ('price', HousePo.unit_price, None, False),
+            ('tags', HousePo.tags, HousePo.unit_price, True),
+            ('house_type', HousePo.house_type, HousePo.unit_price, True),
+            ('floor_type', HousePo.floor_type, HousePo.unit_price, True),
+            ('community', HousePo.community, HousePo.unit_price, True),
+            ('decoration_type', HousePo.decoration_type, HousePo.decoration_area, True),
+        )
+
+    @classmethod
+    def resolve_filter(cls, request) -> Optional[Tuple[str, str]]:
+        """
+        判断查询条件能否使用预聚合
+
+        Args:
+            request (HouseStatisticsRequest): 查询条件
+
+        Returns:
+            Optional[Tuple[str, str]]: (过滤维度, 过滤值)，条件多于一个或包含标签模糊查询时返回None
+        """
+        if getattr(request, 'tags', None):
+            return None
+        filters = [(dimension, getattr(request, dimension, None)) for dimension in cls.FILTER_DIMENSIONS]
+        filters = [(dimension, str(value)) for dimension, value in filters if value]
+        if len(filters) > 1:
+            return None
+        if not filters:
+            return cls.NO_FILTER, cls.NO_FILTER
+        return filters[0]
+
+    @classmethod
+    def is_enabled(cls) -> bool:
+        """
+        统计数据来源是否为预聚合
+        """
+        return cls.STATISTICS_SOURCE == 'aggregate'
+
+    @classmethod
+    def is_ready(cls) -> bool:
+        """
+        预聚合是否启用且已经构建
+        """
+        if not cls.is_enabled():
+            return False
+        if cls._ready:
+            return True
+        try:
+            stmt = select(HouseStatisticsAggregatePo.id).where(
+                HouseStatisticsAggregatePo.filter_dimension == cls.NO_FILTER).limit(1)
+            cls._ready = db.session.execute(stmt).first() is not None
+        except Exception as e:
+            print(f"查询房源统计预聚合状态失败:{e}")
+            return False
+        return cls._ready
+
+    @classmethod
+    def select_statistics(cls, filter_dimension: str, filter_value: str, dimension: str,
+                          limit: Optional[int] = None) -> List[StatisticsPo]:
+        """
+        读取单个维度的预聚合统计
+        select
+            sum(house_count) as value,
+            sum(value_sum) / sum(value_count) as avg,
+            max(value_max) as max,
+            min(value_min) as min,
+            name
+        from tb_house_statistics_aggregate
+        where filter_dimension = ? and filter_value = ? and dimension = ?
+        group by name
+        order by value desc;
+        分位数由返回分组的草图合并后计算
+        """
+        stmt = select(
+            func.sum(HouseStatisticsAggregatePo.house_count).label("value"),
+            (func.sum(HouseStatisticsAggregatePo.value_sum)
+             / func.nullif(func.sum(HouseStatisticsAggregatePo.value_count), 0)).label("avg"),
+            func.max(HouseStatisticsAggregatePo.value_max).label("max"),
+            func.min(HouseStatisticsAggregatePo.value_min).label("min"),
+            HouseStatisticsAggregatePo.name.label("name")
+        ).where(
+            HouseStatisticsAggregatePo.filter_dimension == filter_dimension,
+            HouseStatisticsAggregatePo.filter_value == filter_value,
+            HouseStatisticsAggregatePo.dimension == dimension
+        ).group_by(HouseStatisticsAggregatePo.name).order_by(db.desc("value"))
+        if limit is not None:
+            stmt = stmt.limit(limit)
+        result = db.session.execute(stmt).mappings().all()
+        sketches = {}
+        if dimension != 'price' and result:
+            sketches = cls._select_sketches(filter_dimension, filter_value, dimension,
+                                            [item["name"] for item in result])
+        pos = []
+        for item in result:
+            item = dict(item)
+            item["value"] = int(item["value"])
+            if dimension == 'price':
+                item.pop("avg")
+                item.pop("max")
+                item.pop("min")
+            elif item["name"] in sketches:
+                item.update(sketches[item["name"]].quantiles(item["min"], item["max"]))
+            pos.append(StatisticsPo(**item))
+        return pos
+
+    @classmethod
+    def _select_sketches(cls, filter_dimension: str, filter_value: str, dimension: str,
+                         names: List[Optional[str]]) -> Dict[Optional[str], QuantileSketch]:
+        """
+        读取并按分组值合并分位数草图
+        """
+        stmt = select(HouseStatisticsAggregatePo.name, HouseStatisticsAggregatePo.value_sketch).where(
+            HouseStatisticsAggregatePo.filter_dimension == filter_dimension,
+            HouseStatisticsAggregatePo.filter_value == filter_value,
+            HouseStatisticsAggregatePo.dimension == dimension,
+            or_(*[cls._name_condition(name) for name in set(names)])
+        )
+        sketches = {}
+        for name, value_sketch in db.session.execute(stmt).all():
+            sketch = QuantileSketch.loads(value_sketch)
+            if name in sketches:
+                sketches[name].merge(sketch)
+            else:
+                sketches[name] = sketch
+        return sketches
+
+    @classmethod
+    def apply_changes(cls, removed_houses: Iterable[House], added_houses: Iterable[House]) -> int:
+        """
+        按房源变更更新预聚合
+
+        修改房源时同时传入修改前和修改后的房源。被移除的值等于分组的最小或最大值时，
+        从房源表重新查询该分组的最小和最大值
+
+        Args:
+            removed_houses (Iterable[House]): 删除或修改前的房源
+            added_houses (Iterable[House]): 新增或修改后的房源
+
+        Returns:
+            int: 更新的分组数
+        """
+        if not cls.is_ready():
+            # 尚未全量构建时不写入，避免只有部分分组的预聚合被当作完整结果读取
+            return 0
+        # 分组 -> [房源数差量, 统计值数差量, 合计差量, 新增的值, 移除的值]
+        deltas = {}
+        for houses, sign in ((removed_houses, -1), (added_houses, 1)):
+            for house in houses:
+                if house is None:
+                    continue
+                for group, value in cls._group_values(cls._house_values(house)):
+                    delta = deltas.get(group)
+                    if delta is None:
+                        delta = deltas[group] = [0, 0, Decimal(0), [], []]
+                    delta[0] += sign
+                    if value is None:
+                        continue
+                    delta[1] += sign
+                    delta[2] += sign * value
+                    delta[3 if sign > 0 else 4].append(value)
+        deltas = {group: delta for group, delta in deltas.items() if delta[0] or delta[1] or delta[2]
+                  or sorted(delta[3]) != sorted(delta[4])}
+        if not deltas:
+            return 0
+        try:
+            for group, (count, value_count, value_sum, added_values, removed_values) in deltas.items():
+                filter_dimension, filter_value, dimension, name = group
+                stmt = select(HouseStatisticsAggregatePo).where(
+                    HouseStatisticsAggregatePo.filter_dimension == filter_dimension,
+                    HouseStatisticsAggregatePo.filter_value == filter_value,
+                    HouseStatisticsAggregatePo.dimension == dimension,
+                    cls._name_condition(name)
+                ).limit(1).with_for_update()
+                po = db.session.execute(stmt).scalars().first()
+                if po is None:
+                    if count <= 0:
+                        # 预聚合缺少该分组，由全量重建修复
+                        continue
+                    po = HouseStatisticsAggregatePo(
+                        filter_dimension=filter_dimension,
+                        filter_value=filter_value,
+                        dimension=dimension,
+                        name=name,
+                        house_count=count,
+                        value_count=value_count,
+                        value_sum=value_sum,
+                        value_min=min(added_values) if added_values else None,
+                        value_max=max(added_values) if added_values else None,
+                        value_sketch=QuantileSketch.from_values(added_values).dumps()
+                    )
+                    db.session.add(po)
+                    continue
+                po.house_count += count
+                if po.house_count <= 0:
+                    db.session.delete(po)
+                    continue
+                po.value_count += value_count
+                po.value_sum = (po.value_sum or 0) + value_sum
+                if added_values or removed_values:
+                    sketch = QuantileSketch.loads(po.value_sketch)
+                    for value in added_values:
+                        sketch.add(value)
+                    for value in removed_values:
+                        sketch.remove(value)
+                    po.value_sketch = sketch.dumps()
+                if removed_values and (po.value_min in removed_values or po.value_max in removed_values):
+                    po.value_min, po.value_max = cls._select_group_min_max(group)
+                    continue
+                if added_values:
+                    po.value_min = min(added_values) if po.value_min is None else min(po.value_min, *added_values)
+                    po.value_max = max(added_values) if po.value_max is None else max(po.value_max, *added_values)
+            db.session.commit()
+            return len(deltas)
+        except Exception as e:
+            db.session.rollback()
+            print(f"更新房源统计预聚合失败:{e}")
+            return 0
+
+    @classmethod
+    def rebuild(cls) -> int:
+        """
+        扫描一次房源表，全量重建预聚合（统计数据来源不是预聚合时跳过）
+
+        Returns:
+            int: 分组数
+        """
+        if not cls.is_enabled():
+            return 0
+        columns = {}
+        for _, column, value_column, _ in cls.dimensions():
+            columns[column.key] = column
+            if value_column is not None:
+                columns[value_column.key] = value_column
+        stmt = select(*columns.values()).select_from(HousePo).execution_options(yield_per=cls.REBUILD_YIELD_PER)
+        try:
+            # 分组 -> [房源数, 统计值数, 合计, 最小值, 最大值, 分位数草图]
+            groups = {}
+            for row in db.session.execute(stmt).mappings():
+                values = {key: cls._normalize(value) if isinstance(value, (Decimal, float, int)) else value
+                          for key, value in row.items()}
+                for group, value in cls._group_values(values):
+                    stats = groups.get(group)
+                    if stats is None:
+                        stats = groups[group] = [0, 0, Decimal(0), None, None, QuantileSketch()]
+                    stats[0] += 1
+                    if value is None:
+                        continue
+                    stats[1] += 1
+                    stats[2] += value
+                    stats[5].add(value)
+                    if stats[3] is None or value < stats[3]:
+                        stats[3] = value
+                    if stats[4] is None or value > stats[4]:
+                        stats[4] = value
+
+            rows = [{
+                'filter_dimension': filter_dimension,
+                'filter_value': filter_value,
+                'dimension': dimension,
+                'name': name,
+                'house_count': house_count,
+                'value_count': value_count,
+                'value_sum': value_sum,
+                'value_min': value_min,
+                'value_max': value_max,
+                'value_sketch': sketch.dumps(),
+            } for (filter_dimension, filter_value, dimension, name), (house_count, value_count, value_sum, value_min,
+                                                                      value_max, sketch) in groups.items()]
+            db.session.execute(delete(HouseStatisticsAggregatePo))
+            for start in range(0, len(rows), cls.INSERT_BATCH_SIZE):
+                db.session.execute(insert(HouseStatisticsAggregatePo), rows[start:start + cls.INSERT_BATCH_SIZE])
+            db.session.commit()
+            cls._ready = bool(rows)
+            return len(rows)
+        except Exception as e:
+            db.session.rollback()
+            print(f"重建房源统计预聚合失败:{e}")
+            return 0
+
+    @classmethod
+    def _group_values(cls, values: Mapping) -> List[Tuple[Tuple[str, str, str, Optional[str]], Optional[Decimal]]]:
+        """
+        房源所属的全部分组及其统计值
+        """
+        filters = [(cls.NO_FILTER, cls.NO_FILTER)]
+        for dimension in cls.FILTER_DIMENSIONS:
+            value = values.get(dimension)
+            if value:
+                filters.append((dimension, str(value)))
+        groups = []
+        for dimension, column, value_column, exclude_null in cls.dimensions():
+            name = values.get(column.key)
+            if dimension == 'tags':
+                # 标签按单个标签分组
+                names = HouseTagMapper.split_tags(name)
+            elif exclude_null and name is None:
+                continue
+            else:
+                names = [None if name is None else str(name)]
+            value = values.get(value_column.key) if value_column is not None else None
+            for name in names:
+                for filter_dimension, filter_value in filters:
+                    groups.append(((filter_dimension, filter_value, dimension, name), value))
+        return groups
+
+    @classmethod
+    def _house_values(cls, house: House) -> Dict:
+        """
+        房源实体转换为与数据库一致的列值（数值列按 Numeric(10, 0) 取整）
+        """
+        values = {}
+        for _, column, value_column, _ in cls.dimensions():
+            for item in (column, value_column):
+                if item is None:
+                    continue
+                value = getattr(house, item.key, None)
+                values[item.key] = cls._normalize(value) if isinstance(value, (Decimal, float, int)) else value
+        return values
+
+    @classmethod
+    def _select_group_min_max(cls, group: Tuple[str, str, str, Optional[str]]) -> Tuple[Optional[Decimal], Optional[Decimal]]:
+        """
+        从房源表查询分组统计值的最小和最大值
+        """
+        filter_dimension, filter_value, dimension, name = group
+        _, column, value_column, _ = next(item for item in cls.dimensions() if item[0] == dimension)
+        if value_column is None:
+            return None, None
+        stmt = select(func.min(value_column), func.max(value_column)).select_from(HousePo)
+        if dimension == 'tags':
+            stmt = stmt.where(HousePo.house_id.in_(
+                select(HouseTagPo.house_id).where(HouseTagPo.tag == name)))
+        else:
+            stmt = stmt.where(column.is_(None) if name is None else column == name)
+        if filter_dimension != cls.NO_FILTER:
+            stmt = stmt.where(getattr(HousePo, filter_dimension) == filter_value)
+        value_min, value_max = db.session.execute(stmt).one()
+        return value_min, value_max
+
+    @classmethod
+    def _name_condition(cls, name: Optional[str]):
+        if name is None:
+            return HouseStatisticsAggregatePo.name.is_(None)
+        return HouseStatisticsAggregatePo.name == name
+
+    @staticmethod
+    def _normalize(value) -> Decimal:
+        return Decimal(str(value)).quantize(Decimal(1), rounding=ROUND_HALF_UP)
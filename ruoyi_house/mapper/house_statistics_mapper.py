@@ -1,17 +1,299 @@
+from bisect import bisect_right
 from datetime import datetime
-from typing import List
+from typing import Dict, Iterator, List, Optional
 
-from sqlalchemy import select, func
+from sqlalchemy import Numeric, case, cast, select, func
 
 from ruoyi_admin.ext import db
-from ruoyi_house.domain.po import HousePo
+from ruoyi_house.domain.po import HousePo, HouseStatisticsAggregatePo, HouseTagPo
 from ruoyi_house.domain.statistics.dto import HouseStatisticsRequest
 from ruoyi_house.domain.statistics.po import StatisticsPo
+from ruoyi_house.mapper.house_statistics_aggregate_mapper import HouseStatisticsAggregateMapper
+from ruoyi_house.mapper.house_tag_mapper import HouseTagMapper
 
 
 class HouseStatisticsMapper:
     """房源信息数据访问类"""
 
+    # 支持 GROUPING SETS 的数据库方言（MySQL 只支持 WITH ROLLUP）
+    GROUPING_SETS_DIALECTS = ('postgresql', 'mssql', 'oracle')
+    # 单次扫描时每批读取的行数
+    DASHBOARD_YIELD_PER = 2000
+    # 分块读取房源明细时每块的行数
+    DETAILED_YIELD_PER = 5000
+
+    @classmethod
+    def dashboard_dimensions(cls):
+        """
+        仪表盘统计维度：(维度名, 分组列, 统计列, 是否排除空值)
+        """
+        return HouseStatisticsAggregateMapper.dimensions()
+
+    @classmethod
+    def select_aggregate(cls, request: HouseStatisticsRequest, dimension: str, limit=None) -> Optional[List[StatisticsPo]]:
+        """
+        不带条件或只有一个等值条件时从预聚合表读取统计
+
+        Returns:
+            Optional[List[StatisticsPo]]: 统计结果，无法使用预聚合时返回None
+        """
+        group_filter = HouseStatisticsAggregateMapper.resolve_filter(request)
+        if group_filter is None or not HouseStatisticsAggregateMapper.is_ready():
+            return None
+        try:
+            return HouseStatisticsAggregateMapper.select_statistics(*group_filter, dimension, limit)
+        except Exception as e:
+            print(f"读取房源统计预聚合失败:{e}")
+            return None
+
+    @staticmethod
+    def bucket_expression(column, boundaries: List[int]):
+        """
+        数值分段表达式，返回分段序号，空值返回NULL
+        case
+            when column is null then null
+            when column < b0 then 0
+            when column < b1 then 1
+            ...
+            else len(boundaries)
+        end
+
+        Args:
+            column: 数值列
+            boundaries (List[int]): 升序的分段边界
+
+        Returns:
+            分段序号表达式
+        """
+        whens = [(column.is_(None), None)]
+        whens.extend((column < boundary, index) for index, boundary in enumerate(boundaries))
+        return case(*whens, else_=len(boundaries))
+
+    @classmethod
+    def histogram_statistics(cls, request: HouseStatisticsRequest, column, boundaries: List[int]) -> List[StatisticsPo]:
+        """
+        数值分段统计，每个非空分段返回一行，name 为分段序号（小于 boundaries[0] 为 0，不小于最后一个边界为 len(boundaries)）
+        select
+            count(*) as value,
+            case when column < b0 then 0 when column < b1 then 1 ... else n end as name
+        from tb_house
+        where column is not null
+        group by name
+        order by name;
+
+        Args:
+            request (HouseStatisticsRequest): 查询条件
+            column: 数值列，如 unit_price、total_price、area_size
+            boundaries (List[int]): 升序的分段边界
+
+        Returns:
+            List[StatisticsPo]: 按分段序号升序的统计结果
+        """
+        if column is HousePo.unit_price:
+            pos = cls.select_aggregate_histogram(request, boundaries)
+            if pos is not None:
+                return pos
+        try:
+            bucket = cls.bucket_expression(column, boundaries)
+            stmt = select(
+                func.count("*").label("value"),
+                bucket.label("name")
+            ).select_from(HousePo).group_by("name").order_by("name")
+            stmt = stmt.where(column.isnot(None))
+            stmt = cls.builder_where(request, stmt)
+            result = db.session.execute(stmt).mappings().all()
+            if not result:
+                return []
+            return [StatisticsPo(**item) for item in result]
+        except Exception as e:
+            print(f"获取分段统计数据失败:{e}")
+            return []
+
+    @classmethod
+    def select_aggregate_histogram(cls, request: HouseStatisticsRequest, boundaries: List[int]) -> Optional[List[StatisticsPo]]:
+        """
+        从预聚合表的价格维度计算单价分段统计
+        select
+            sum(house_count) as value,
+            case when cast(name as decimal) < b0 then 0 ... else n end as name
+        from tb_house_statistics_aggregate
+        where filter_dimension = ? and filter_value = ? and dimension = 'price' and name is not null
+        group by name
+        order by name;
+
+        Returns:
+            Optional[List[StatisticsPo]]: 统计结果，无法使用预聚合时返回None
+        """
+        group_filter = HouseStatisticsAggregateMapper.resolve_filter(request)
+        if group_filter is None or not HouseStatisticsAggregateMapper.is_ready():
+            return None
+        try:
+            filter_dimension, filter_value = group_filter
+            bucket = cls.bucket_expression(cast(HouseStatisticsAggregatePo.name, Numeric(10, 0)), boundaries)
+            stmt = select(
+                func.sum(HouseStatisticsAggregatePo.house_count).label("value"),
+                bucket.label("bucket")
+            ).where(
+                HouseStatisticsAggregatePo.filter_dimension == filter_dimension,
+                HouseStatisticsAggregatePo.filter_value == filter_value,
+                HouseStatisticsAggregatePo.dimension == 'price',
+                HouseStatisticsAggregatePo.name.isnot(None)
+            ).group_by("bucket").order_by("bucket")
+            result = db.session.execute(stmt).mappings().all()
+            return [StatisticsPo(value=int(item["value"]), name=item["bucket"]) for item in result]
+        except Exception as e:
+            print(f"读取房源统计预聚合失败:{e}")
+            return None
+
+    @classmethod
+    def dashboard_statistics(cls, request: HouseStatisticsRequest, community_limit: int,
+                             price_range: List[int]) -> Dict[str, List[StatisticsPo]]:
+        """
+        一次扫描计算仪表盘全部维度的统计
+        数据库支持时使用 GROUPING SETS，否则只读取一次所需的列，在内存中按各维度聚合
+
+        Args:
+            request (HouseStatisticsRequest): 查询条件
+            community_limit (int): 小区维度返回的数量
+            price_range (List[int]): 升序的单价分段边界
+
+        Returns:
+            Dict[str, List[StatisticsPo]]: 维度名 -> 按数量降序的统计结果（价格维度按分段序号升序）
+        """
+        result = {}
+        for name, _, _, _ in cls.dashboard_dimensions():
+            if name == 'price':
+                pos = cls.select_aggregate_histogram(request, price_range)
+            else:
+                pos = cls.select_aggregate(request, name, community_limit if name == 'community' else None)
+            if pos is None:
+                break
+            result[name] = pos
+        else:
+            return result
+        try:
+            dialect = db.session.get_bind().dialect.name
+            if dialect in cls.GROUPING_SETS_DIALECTS:
+                result = cls._dashboard_statistics_by_grouping_sets(request, price_range)
+            else:
+                result = cls._dashboard_statistics_by_scan(request, price_range)
+            for name in result:
+                if name == 'price':
+                    result[name].sort(key=lambda po: po.name)
+                    continue
+                result[name].sort(key=lambda po: po.value, reverse=True)
+            result['community'] = result['community'][:community_limit]
+            return result
+        except Exception as e:
+            print(f"获取仪表盘统计数据失败:{e}")
+            return {name: [] for name, _, _, _ in cls.dashboard_dimensions()}
+
+    @classmethod
+    def _dashboard_statistics_by_grouping_sets(cls, request: HouseStatisticsRequest,
+                                               price_range: List[int]) -> Dict[str, List[StatisticsPo]]:
+        """
+        select count(*), avg(unit_price), ..., grouping(orientation), ..., orientation, town, case ... end, ...
+        from tb_house
+        group by grouping sets ((orientation), (town), (case ... end), ...)
+        """
+        dimensions = [
+            (name, cls.bucket_expression(column, price_range), value_column, True) if name == 'price'
+            else (name, column, value_column, exclude_null)
+            for name, column, value_column, exclude_null in cls.dashboard_dimensions()
+        ]
+        value_columns = {HousePo.unit_price.key: HousePo.unit_price, HousePo.decoration_area.key: HousePo.decoration_area}
+        columns = [func.count("*").label("value")]
+        for key, column in value_columns.items():
+            columns.append(func.avg(column).label(f"avg_{key}"))
+            columns.append(func.max(column).label(f"max_{key}"))
+            columns.append(func.min(column).label(f"min_{key}"))
+        for name, column, _, _ in dimensions:
+            columns.append(func.grouping(column).label(f"grouping_{name}"))
+            columns.append(column.label(f"name_{name}"))
+        stmt = select(*columns).select_from(HousePo).group_by(
+            func.grouping_sets(*[column for _, column, _, _ in dimensions]))
+        stmt = cls.builder_where(request, stmt)
+
+        result = {name: [] for name, _, _, _ in dimensions}
+        for row in db.session.execute(stmt).mappings():
+            for name, _, value_column, exclude_null in dimensions:
+                if row[f"grouping_{name}"] != 0:
+                    continue
+                group = row[f"name_{name}"]
+                if exclude_null and group is None:
+                    break
+                item = {"value": row["value"], "name": group}
+                if value_column is not None:
+                    item["avg"] = row[f"avg_{value_column.key}"]
+                    item["max"] = row[f"max_{value_column.key}"]
+                    item["min"] = row[f"min_{value_column.key}"]
+                result[name].append(StatisticsPo(**item))
+                break
+        result['tags'] = cls.merge_tag_combinations(result['tags'])
+        return result
+
+    @classmethod
+    def _dashboard_statistics_by_scan(cls, request: HouseStatisticsRequest,
+                                      price_range: List[int]) -> Dict[str, List[StatisticsPo]]:
+        """
+        select orientation, town, unit_price, tags, ..., decoration_area
+        from tb_house
+        然后在内存中按各维度分组计算 count/avg/max/min（avg/max/min 与 SQL 一样忽略空值），
+        单价按 price_range 分段计数，标签拆分为单个标签统计
+        """
+        dimensions = cls.dashboard_dimensions()
+        columns = {}
+        for _, column, value_column, _ in dimensions:
+            columns[column.key] = column
+            if value_column is not None:
+                columns[value_column.key] = value_column
+        stmt = select(*columns.values()).select_from(HousePo)
+        stmt = cls.builder_where(request, stmt).execution_options(yield_per=cls.DASHBOARD_YIELD_PER)
+
+        # 维度名 -> 分组值 -> [数量, 非空统计值数量, 合计, 最大值, 最小值]
+        groups = {name: {} for name, _, _, _ in dimensions}
+        for row in db.session.execute(stmt).mappings():
+            for name, column, value_column, exclude_null in dimensions:
+                group = row[column.key]
+                if name == 'price':
+                    if group is None:
+                        continue
+                    # 与 bucket_expression 一致：分段序号为不大于该值的边界个数
+                    group_names = [bisect_right(price_range, group)]
+                elif name == 'tags':
+                    group_names = HouseTagMapper.split_tags(group)
+                elif exclude_null and group is None:
+                    continue
+                else:
+                    group_names = [group]
+                value = row[value_column.key] if value_column is not None else None
+                for group_name in group_names:
+                    stats = groups[name].get(group_name)
+                    if stats is None:
+                        stats = groups[name][group_name] = [0, 0, 0, None, None]
+                    stats[0] += 1
+                    if value is None:
+                        continue
+                    stats[1] += 1
+                    stats[2] += value
+                    if stats[3] is None or value > stats[3]:
+                        stats[3] = value
+                    if stats[4] is None or value < stats[4]:
+                        stats[4] = value
+
+        result = {}
+        for name, _, value_column, _ in dimensions:
+            pos = []
+            for group, (count, value_count, total, max_value, min_value) in groups[name].items():
+                item = {"value": count, "name": group}
+                if value_column is not None:
+                    item["avg"] = float(total) / value_count if value_count else None
+                    item["max"] = max_value
+                    item["min"] = min_value
+                pos.append(StatisticsPo(**item))
+            result[name] = pos
+        return result
+
     @classmethod
     def orientation_statistics(cls, request: HouseStatisticsRequest) -> List[StatisticsPo]:
         """
@@ -26,6 +308,9 @@ class HouseStatisticsMapper:
         group by name
         order by value desc;
         """
+        pos = cls.select_aggregate(request, 'orientation')
+        if pos is not None:
+            return pos
         try:
             # 构建查询条件
             stmt = select(
@@ -58,7 +343,7 @@ class HouseStatisticsMapper:
         if request.decoration_type:
             stmt = stmt.where(HousePo.decoration_type == request.decoration_type)
         if request.tags:
-            stmt = stmt.where(HousePo.tags.like("%" + request.tags + "%"))
+            stmt = stmt.where(HouseTagMapper.tags_condition(request.tags))
         return stmt
 
     @classmethod
@@ -75,6 +360,9 @@ class HouseStatisticsMapper:
         group by name
         order by value desc;
         """
+        pos = cls.select_aggregate(statistics_entity, 'town')
+        if pos is not None:
+            return pos
         try:
             # 构建查询条件
             stmt = select(
@@ -94,35 +382,62 @@ class HouseStatisticsMapper:
             return []
 
     @classmethod
-    def price_statistics(cls, statistics_entity) -> List[StatisticsPo]:
+    def price_statistics(cls, statistics_entity, price_range: List[int]) -> List[StatisticsPo]:
         """
-        价格分析
+        价格分析（按单价分段）
         select
             count(*) as value,
-            price as name
+            case when unit_price < b0 then 0 when unit_price < b1 then 1 ... else n end as name
         from tb_house
+        where unit_price is not null
+        group by name
+        order by name;
+        """
+        return cls.histogram_statistics(statistics_entity, HousePo.unit_price, price_range)
+
+    @classmethod
+    def tags_statistics(cls, statistics_entity) -> List[StatisticsPo]:
+        """
+        标签分析（每个标签一行）
+        select
+            count(*) as value,
+            avg(h.unit_price) as avg,
+            max(h.unit_price) as max,
+            min(h.unit_price) as min,
+            t.tag as name
+        from tb_house_tag t
+        join tb_house h on h.house_id = t.house_id
         group by name
         order by value desc;
         """
+        pos = cls.select_aggregate(statistics_entity, 'tags')
+        if pos is not None:
+            return pos
+        if not HouseTagMapper.is_ready():
+            return cls._tag_combination_statistics(statistics_entity)
         try:
             # 构建查询条件
             stmt = select(
                 func.count("*").label("value"),
-                HousePo.unit_price.label("name")
-            ).select_from(HousePo).group_by("name").order_by(db.desc("value"))
+                func.avg(HousePo.unit_price).label("avg"),
+                func.max(HousePo.unit_price).label("max"),
+                func.min(HousePo.unit_price).label("min"),
+                HouseTagPo.tag.label("name")
+            ).select_from(HouseTagPo).join(HousePo, HousePo.house_id == HouseTagPo.house_id) \
+                .group_by(HouseTagPo.tag).order_by(db.desc("value"))
             stmt = cls.builder_where(statistics_entity, stmt)
             result = db.session.execute(stmt).mappings().all()
             if not result:
                 return []
             return [StatisticsPo(**item) for item in result]
         except Exception as e:
-            print(f"获取价格分析数据失败:{e}")
+            print(f"获取标签分析数据失败:{e}")
             return []
 
     @classmethod
-    def tags_statistics(cls, statistics_entity):
+    def _tag_combination_statistics(cls, statistics_entity) -> List[StatisticsPo]:
         """
-        标签分析
+        标签表尚未同步时按标签组合分组，再拆分合并为单个标签的统计
         select
             count(*) as value,
             avg(unit_price) as avg,
@@ -147,11 +462,48 @@ class HouseStatisticsMapper:
             result = db.session.execute(stmt).mappings().all()
             if not result:
                 return []
-            return [StatisticsPo(**item) for item in result]
+            return cls.merge_tag_combinations([StatisticsPo(**item) for item in result])
         except Exception as e:
             print(f"获取标签分析数据失败:{e}")
             return []
 
+    @classmethod
+    def merge_tag_combinations(cls, pos: List[StatisticsPo]) -> List[StatisticsPo]:
+        """
+        把标签组合的统计拆分合并为单个标签的统计（平均值按组合数量加权）
+
+        Args:
+            pos (List[StatisticsPo]): name 为分号分隔标签组合的统计结果
+
+        Returns:
+            List[StatisticsPo]: 按数量降序的单个标签统计结果
+        """
+        # 标签 -> [数量, 平均值加权合计, 平均值权重, 最大值, 最小值]
+        tag_stats = {}
+        for po in pos:
+            count = int(po.value) if po.value is not None else 1
+            for tag in HouseTagMapper.split_tags(po.name):
+                stats = tag_stats.get(tag)
+                if stats is None:
+                    stats = tag_stats[tag] = [0, 0.0, 0, None, None]
+                stats[0] += count
+                if po.avg is not None:
+                    stats[1] += float(po.avg) * count
+                    stats[2] += count
+                if po.max is not None and (stats[3] is None or float(po.max) > stats[3]):
+                    stats[3] = float(po.max)
+                if po.min is not None and (stats[4] is None or float(po.min) < stats[4]):
+                    stats[4] = float(po.min)
+        result = [StatisticsPo(
+            value=count,
+            name=tag,
+            avg=total / weight if weight else None,
+            max=max_value,
+            min=min_value
+        ) for tag, (count, total, weight, max_value, min_value) in tag_stats.items()]
+        result.sort(key=lambda po: po.value, reverse=True)
+        return result
+
     @classmethod
     def house_type_statistics(cls, statistics_entity) -> List[StatisticsPo]:
         """
@@ -166,6 +518,9 @@ class HouseStatisticsMapper:
         group by name
         order by value desc;
         """
+        pos = cls.select_aggregate(statistics_entity, 'house_type')
+        if pos is not None:
+            return pos
         try:
             # 构建查询条件
             stmt = select(
@@ -199,6 +554,9 @@ class HouseStatisticsMapper:
         group by name
         order by value desc;
         """
+        pos = cls.select_aggregate(statistics_entity, 'floor_type')
+        if pos is not None:
+            return pos
         try:
             # 构建查询条件
             stmt = select(
@@ -233,6 +591,9 @@ class HouseStatisticsMapper:
         order by value desc
         limit 100;
         """
+        pos = cls.select_aggregate(statistics_entity, 'community', limit)
+        if pos is not None:
+            return pos
         try:
             # 构建查询条件
             stmt = select(
@@ -267,6 +628,9 @@ class HouseStatisticsMapper:
         group by name
         order by value desc
         """
+        pos = cls.select_aggregate(statistics_entity, 'decoration_type')
+        if pos is not None:
+            return pos
         try:
             # 构建查询条件
             stmt = select(
@@ -321,6 +685,22 @@ class HouseStatisticsMapper:
             print(f"获取价格预测数据失败:{e}")
             return []
 
+    @classmethod
+    def select_snapshot_rows(cls, columns):
+        """
+        分批读取构建列式快照所需的列
+        select town, community, ..., unit_price, decoration_area, building_year
+        from tb_house
+
+        Args:
+            columns: 需要读取的列
+
+        Returns:
+            Result: 按列顺序的行迭代器
+        """
+        stmt = select(*columns).select_from(HousePo).execution_options(yield_per=cls.DASHBOARD_YIELD_PER)
+        return db.session.execute(stmt)
+
     @classmethod
     def get_detailed_house_data(cls, statistics_entity, start_year):
         """
@@ -347,14 +727,7 @@ class HouseStatisticsMapper:
                 HousePo.tags
             ).select_from(HousePo)
 
-            # 基本过滤条件
-            stmt = stmt.where(HousePo.building_year.isnot(None))
-            stmt = stmt.where(HousePo.unit_price.isnot(None))
-            stmt = stmt.where(HousePo.unit_price > 0)
-            stmt = stmt.where(HousePo.building_year >= start_year)
-
-            # 应用查询条件
-            stmt = cls.builder_where(statistics_entity, stmt)
+            stmt = cls._detailed_house_where(statistics_entity, start_year, stmt)
 
             # 按建筑年代排序
             stmt = stmt.order_by(HousePo.building_year)
@@ -363,4 +736,43 @@ class HouseStatisticsMapper:
             return result
         except Exception as e:
             print(f"获取详细房源数据失败:{e}")
-            return []
\ No newline at end of file
+            return []
+
+    @classmethod
+    def stream_detailed_house_data(cls, statistics_entity, start_year, columns: List[str],
+                                   chunk_size: int = None) -> Iterator[list]:
+        """
+        使用服务端游标分块读取房源明细，只读取指定的列，不在内存中保留整个结果集
+        select building_year, unit_price, ...
+        from tb_house
+        where building_year >= start_year and unit_price > 0 and ...
+
+        Args:
+            statistics_entity: 查询条件
+            start_year (int): 开始年份
+            columns (List[str]): 列名
+            chunk_size (int): 每块的行数
+
+        Returns:
+            Iterator[list]: 按列顺序的行元组块
+        """
+        try:
+            stmt = select(*[getattr(HousePo, column) for column in columns]).select_from(HousePo)
+            stmt = cls._detailed_house_where(statistics_entity, start_year, stmt)
+            stmt = stmt.execution_options(yield_per=chunk_size or cls.DETAILED_YIELD_PER)
+            for partition in db.session.execute(stmt).partitions():
+                yield partition
+        except Exception as e:
+            print(f"分块读取详细房源数据失败:{e}")
+            raise
+
+    @classmethod
+    def _detailed_house_where(cls, statistics_entity, start_year, stmt):
+        # 基本过滤条件
+        stmt = stmt.where(HousePo.building_year.isnot(None))
+        stmt = stmt.where(HousePo.unit_price.isnot(None))
+        stmt = stmt.where(HousePo.unit_price > 0)
+        stmt = stmt.where(HousePo.building_year >= start_year)
+
+        # 应用查询条件
+        return cls.builder_where(statistics_entity, stmt)
@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+# @Author  : YY
+# @FileName: house_tag_mapper.py
+# @Time    : 2026-01-10 17:29:50
+
+from typing import List, Optional
+
+from sqlalchemy import delete, insert, select
+
+from ruoyi_admin.ext import db
+from ruoyi_house.domain.po import HousePo, HouseTagPo
+
+
+class HouseTagMapper:
+    """
+    房源标签数据访问类
+
+    tb_house_tag 保存每个房源拆分后的单个标签，在 (tag, house_id) 上建索引，
+    标签统计和标签过滤通过该表走索引，不再对 tb_house.tags 做 LIKE 全表扫描
+
+    全量重建时在同一事务中写入一条同步标记（房源编号和标签均为空串，不对应任何房源），
+    有标记才认为标签表完整可用，无标记时查询回退为 LIKE；房源增删改始终在同一事务中维护标签表。
+    重建以 FOR UPDATE 读取房源，重建提交前并发的房源写入被阻塞，提交后再覆盖标签，
+    重建期间提交的写入不会被旧数据覆盖
+    """
+
+    TAG_SEPARATOR = ";"
+    REBUILD_BATCH_SIZE = 1000
+    READY_MARKER = ''
+
+    _ready = False
+
+    @classmethod
+    def split_tags(cls, tags: Optional[str]) -> List[str]:
+        """
+        拆分分号分隔的标签（去除空白和重复，保持原顺序）
+
+        Args:
+            tags (str): 标签字符串，如 "标签1;标签2"
+
+        Returns:
+            List[str]: 标签列表
+        """
+        if not tags or not isinstance(tags, str):
+            return []
+        return list(dict.fromkeys(tag.strip() for tag in tags.split(cls.TAG_SEPARATOR) if tag.strip()))
+
+    @classmethod
+    def is_ready(cls) -> bool:
+        """
+        标签表是否已经全量同步（存在同步标记）
+        """
+        if cls._ready:
+            return True
+        try:
+            stmt = select(HouseTagPo.house_id).where(
+                HouseTagPo.house_id == cls.READY_MARKER, HouseTagPo.tag == cls.READY_MARKER).limit(1)
+            cls._ready = db.session.execute(stmt).first() is not None
+        except Exception as e:
+            print(f"查询房源标签表状态失败:{e}")
+            return False
+        return cls._ready
+
+    @classmethod
+    def stage_house_tags(cls, house_id: str, tags: Optional[str]) -> None:
+        """
+        在当前事务中替换房源的标签（由调用方提交）
+
+        Args:
+            house_id (str): 房源编号
+            tags (str): 标签字符串
+        """
+        db.session.execute(delete(HouseTagPo).where(HouseTagPo.house_id == house_id))
+        rows = [{'house_id': house_id, 'tag': tag} for tag in cls.split_tags(tags)]
+        if rows:
+            db.session.execute(insert(HouseTagPo), rows)
+
+    @classmethod
+    def stage_delete_houses(cls, house_ids: List[str]) -> None:
+        """
+        在当前事务中删除房源的标签（由调用方提交）
+
+        Args:
+            house_ids (List[str]): 房源编号列表
+        """
+        db.session.execute(delete(HouseTagPo).where(HouseTagPo.house_id.in_(house_ids)))
+
+    @classmethod
+    def house_ids_matching(cls, keyword: str):
+        """
+        标签包含关键词的房源ID子查询
+        先在标签索引上取出包含关键词的不同标签，再按标签等值匹配房源
+        select house_id from tb_house_tag
+        where tag in (select distinct tag from tb_house_tag where tag like '%keyword%')
+
+        Args:
+            keyword (str): 标签关键词
+
+        Returns:
+            Select: 房源ID子查询
+        """
+        matched_tags = select(HouseTagPo.tag).where(HouseTagPo.tag.like(f"%{keyword}%")).distinct()
+        return select(HouseTagPo.house_id).where(HouseTagPo.tag.in_(matched_tags))
+
+    @classmethod
+    def tags_condition(cls, keyword: str):
+        """
+        房源标签过滤条件，标签表可用时走索引，否则（或关键词跨越分隔符时）回退为 LIKE
+
+        Args:
+            keyword (str): 标签关键词
+
+        Returns:
+            房源查询条件
+        """
+        if cls.TAG_SEPARATOR in keyword or not cls.is_ready():
+            return HousePo.tags.like("%" + keyword + "%")
+        return HousePo.house_id.in_(cls.house_ids_matching(keyword))
+
+    @classmethod
+    def rebuild(cls) -> int:
+        """
+        根据 tb_house 全量重建标签表，并写入同步标记
+        房源行在读取时加锁直到提交，避免并发写入的标签被重建覆盖
+
+        Returns:
+            int: 标签记录数（不含同步标记）
+        """
+        try:
+            stmt = select(HousePo.house_id, HousePo.tags).where(HousePo.tags.isnot(None)).with_for_update()
+            rows = []
+            for house_id, tags in db.session.execute(stmt):
+                rows.extend({'house_id': house_id, 'tag': tag} for tag in cls.split_tags(tags))
+            db.session.execute(delete(HouseTagPo))
+            for start in range(0, len(rows), cls.REBUILD_BATCH_SIZE):
+                db.session.execute(insert(HouseTagPo), rows[start:start + cls.REBUILD_BATCH_SIZE])
+            db.session.execute(insert(HouseTagPo), [{'house_id': cls.READY_MARKER, 'tag': cls.READY_MARKER}])
+            db.session.commit()
+            cls._ready = True
+            return len(rows)
+        except Exception as e:
+            db.session.rollback()
+            print(f"重建房源标签表失败:{e}")
+            return 0
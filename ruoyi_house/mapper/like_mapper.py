@@ -3,11 +3,12 @@
 # @FileName: like_mapper.py
 # @Time    : 2026-01-10 17:29:51
 
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from datetime import datetime
 
 from flask import g
 from sqlalchemy import select, update, delete
+from sqlalchemy.sql.functions import func
 
 from ruoyi_admin.ext import db
 from ruoyi_house.domain.entity import Like
@@ -214,6 +215,76 @@ class LikeMapper:
             print(f"根据 house_id 和 user_id 查询用户点赞出错: {e}")
             return None
 
+    @classmethod
+    def select_user_house_rows(cls, after_id: Optional[int] = None, until_id: Optional[int] = None,
+                               user_ids: Optional[List[int]] = None) -> List[Tuple[int, int, str, datetime]]:
+        """
+        查询点赞记录的（编号、用户、房源、创建时间）四列，按编号升序
+
+        Args:
+            after_id (int): 只查询编号大于该值的记录
+            until_id (int): 只查询编号不大于该值的记录
+            user_ids (List[int]): 只查询这些用户的记录
+
+        Returns:
+            List[Tuple[int, int, str, datetime]]: (记录编号, 用户ID, 房源ID, 创建时间) 列表
+        """
+        try:
+            stmt = select(LikePo.id, LikePo.user_id, LikePo.house_id, LikePo.create_time)
+            if after_id is not None:
+                stmt = stmt.where(LikePo.id > after_id)
+            if until_id is not None:
+                stmt = stmt.where(LikePo.id <= until_id)
+            if user_ids is not None:
+                stmt = stmt.where(LikePo.user_id.in_(user_ids))
+            stmt = stmt.order_by(LikePo.id)
+            return [(row[0], row[1], str(row[2]), row[3]) for row in db.session.execute(stmt).all()]
+        except Exception as e:
+            print(f"查询点赞记录的用户房源列表失败: {str(e)}")
+            return []
+
+    @classmethod
+    def select_active_users_after_time(cls, after_time: datetime) -> List[Tuple[int, str]]:
+        """
+        查询指定时间之后有点赞记录的用户
+
+        Args:
+            after_time (datetime): 时间点
+
+        Returns:
+            List[Tuple[int, str]]: (用户ID, 用户名) 列表
+        """
+        try:
+            stmt = select(LikePo.user_id, func.max(LikePo.user_name)) \
+                .where(LikePo.create_time > after_time) \
+                .group_by(LikePo.user_id)
+            return [(row[0], row[1]) for row in db.session.execute(stmt).all()]
+        except Exception as e:
+            print(f"查询{after_time}之后有点赞记录的用户失败: {str(e)}")
+            return []
+
+    @classmethod
+    def count_likes_after_time(cls, user_id: int, after_time: datetime) -> int:
+        """
+        统计指定时间之后用户的点赞记录数
+
+        Args:
+            user_id (int): 用户ID
+            after_time (datetime): 时间点
+
+        Returns:
+            int: 点赞记录数
+        """
+        try:
+            stmt = select(func.count()).select_from(LikePo).where(
+                LikePo.user_id == user_id,
+                LikePo.create_time > after_time
+            )
+            return db.session.execute(stmt).scalar() or 0
+        except Exception as e:
+            print(f"统计用户{user_id}在{after_time}之后的点赞记录数失败: {str(e)}")
+            return 0
+
     @classmethod
     def select_likes_after_time(cls, user_id: int, after_time: datetime) -> List[Like]:
         """
@@ -8,6 +8,7 @@ from datetime import datetime
 
 from flask import g
 from sqlalchemy import select, update, delete
+from sqlalchemy.sql.functions import func
 
 from ruoyi_admin.ext import db
 from ruoyi_house.domain.entity import Recommend
@@ -128,6 +129,109 @@ class RecommendMapper:
             return 0
 
 
+    @classmethod
+    def upsert_latest_recommend(cls, recommend: Recommend) -> int:
+        """
+        覆盖用户最新的推荐记录，不存在时新增
+
+        Args:
+            recommend (recommend): 用户推荐对象
+
+        Returns:
+            int: 影响的记录数
+        """
+        try:
+            stmt = select(RecommendPo).where(RecommendPo.user_id == recommend.user_id) \
+                .order_by(RecommendPo.create_time.desc()).limit(1)
+            existing = db.session.execute(stmt).scalar_one_or_none()
+            if not existing:
+                existing = RecommendPo()
+                existing.user_id = recommend.user_id
+                db.session.add(existing)
+            existing.user_name = recommend.user_name
+            existing.model_info = recommend.model_info
+            existing.content = recommend.content
+            existing.create_time = recommend.create_time or datetime.now()
+            db.session.commit()
+            recommend.id = existing.id
+            return 1
+        except Exception as e:
+            db.session.rollback()
+            print(f"覆盖用户最新推荐出错: {e}")
+            return 0
+
+    @classmethod
+    def upsert_latest_recommends(cls, recommends: List[Recommend]) -> int:
+        """
+        批量覆盖用户最新的推荐记录，不存在时新增（一次提交）
+
+        Args:
+            recommends (List[Recommend]): 用户推荐对象列表
+
+        Returns:
+            int: 影响的记录数
+        """
+        if not recommends:
+            return 0
+        try:
+            user_ids = list({recommend.user_id for recommend in recommends})
+            latest_ids = select(func.max(RecommendPo.id)).where(RecommendPo.user_id.in_(user_ids)) \
+                .group_by(RecommendPo.user_id)
+            existing_map = {
+                po.user_id: po
+                for po in db.session.execute(select(RecommendPo).where(RecommendPo.id.in_(latest_ids))).scalars()
+            }
+            now = datetime.now()
+            for recommend in recommends:
+                po = existing_map.get(recommend.user_id)
+                if po is None:
+                    po = RecommendPo()
+                    po.user_id = recommend.user_id
+                    db.session.add(po)
+                    existing_map[recommend.user_id] = po
+                po.user_name = recommend.user_name
+                po.model_info = recommend.model_info
+                po.content = recommend.content
+                po.create_time = recommend.create_time or now
+            db.session.commit()
+            return len(recommends)
+        except Exception as e:
+            db.session.rollback()
+            print(f"批量覆盖用户最新推荐出错: {e}")
+            return 0
+
+    @classmethod
+    def insert_recommends(cls, recommends: List[Recommend]) -> int:
+        """
+        批量新增用户推荐（一次提交）
+
+        Args:
+            recommends (List[Recommend]): 用户推荐对象列表
+
+        Returns:
+            int: 插入的记录数
+        """
+        if not recommends:
+            return 0
+        try:
+            now = datetime.now()
+            pos = []
+            for recommend in recommends:
+                new_po = RecommendPo()
+                new_po.user_id = recommend.user_id
+                new_po.user_name = recommend.user_name
+                new_po.model_info = recommend.model_info
+                new_po.content = recommend.content
+                new_po.create_time = recommend.create_time or now
+                pos.append(new_po)
+            db.session.add_all(pos)
+            db.session.commit()
+            return len(pos)
+        except Exception as e:
+            db.session.rollback()
+            print(f"批量新增用户推荐出错: {e}")
+            return 0
+
     @classmethod
     def update_recommend(cls, recommend: Recommend) -> int:
         """
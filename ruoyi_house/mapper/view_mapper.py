@@ -3,7 +3,7 @@
 # @FileName: view_mapper.py
 # @Time    : 2026-01-10 17:29:50
 
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from datetime import datetime
 
 from flask import g
@@ -206,6 +206,76 @@ class ViewMapper:
             print(f"根据房源ID、用户ID和时间查询用户浏览出错: {e}")
             return None
 
+    @classmethod
+    def select_user_house_rows(cls, after_id: Optional[int] = None, until_id: Optional[int] = None,
+                               user_ids: Optional[List[int]] = None) -> List[Tuple[int, int, str, datetime]]:
+        """
+        查询浏览记录的（编号、用户、房源、创建时间）四列，按编号升序
+
+        Args:
+            after_id (int): 只查询编号大于该值的记录
+            until_id (int): 只查询编号不大于该值的记录
+            user_ids (List[int]): 只查询这些用户的记录
+
+        Returns:
+            List[Tuple[int, int, str, datetime]]: (记录编号, 用户ID, 房源ID, 创建时间) 列表
+        """
+        try:
+            stmt = select(ViewPo.id, ViewPo.user_id, ViewPo.house_id, ViewPo.create_time)
+            if after_id is not None:
+                stmt = stmt.where(ViewPo.id > after_id)
+            if until_id is not None:
+                stmt = stmt.where(ViewPo.id <= until_id)
+            if user_ids is not None:
+                stmt = stmt.where(ViewPo.user_id.in_(user_ids))
+            stmt = stmt.order_by(ViewPo.id)
+            return [(row[0], row[1], str(row[2]), row[3]) for row in db.session.execute(stmt).all()]
+        except Exception as e:
+            print(f"查询浏览记录的用户房源列表失败: {str(e)}")
+            return []
+
+    @classmethod
+    def select_active_users_after_time(cls, after_time: datetime) -> List[Tuple[int, str]]:
+        """
+        查询指定时间之后有浏览记录的用户
+
+        Args:
+            after_time (datetime): 时间点
+
+        Returns:
+            List[Tuple[int, str]]: (用户ID, 用户名) 列表
+        """
+        try:
+            stmt = select(ViewPo.user_id, func.max(ViewPo.user_name)) \
+                .where(ViewPo.create_time > after_time) \
+                .group_by(ViewPo.user_id)
+            return [(row[0], row[1]) for row in db.session.execute(stmt).all()]
+        except Exception as e:
+            print(f"查询{after_time}之后有浏览记录的用户失败: {str(e)}")
+            return []
+
+    @classmethod
+    def count_views_after_time(cls, user_id: int, after_time: datetime) -> int:
+        """
+        统计指定时间之后用户的浏览记录数
+
+        Args:
+            user_id (int): 用户ID
+            after_time (datetime): 时间点
+
+        Returns:
+            int: 浏览记录数
+        """
+        try:
+            stmt = select(func.count()).select_from(ViewPo).where(
+                ViewPo.user_id == user_id,
+                ViewPo.create_time > after_time
+            )
+            return db.session.execute(stmt).scalar() or 0
+        except Exception as e:
+            print(f"统计用户{user_id}在{after_time}之后的浏览记录数失败: {str(e)}")
+            return 0
+
     @classmethod
     def select_views_after_time(cls, user_id: int, after_time: datetime) -> List[View]:
         """
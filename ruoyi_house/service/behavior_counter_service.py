@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+# @Author  : YY
+# @FileName: behavior_counter_service.py
+# @Time    : 2026-01-10 17:29:50
+
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from ruoyi_admin.ext import redis_cache
+from ruoyi_common.utils.base import LogUtil
+from ruoyi_house.mapper import LikeMapper, ViewMapper
+
+
+class BehaviorCounterService:
+    """
+    用户行为计数服务
+
+    以Redis哈希记录用户自上次生成推荐以来新增的浏览数和点赞数，
+    写入行为时递增，生成推荐后清零，判断是否需要重新生成时只需读取一次
+    """
+
+    CACHE_KEY_PREFIX = "house:recommend:counter:"
+    EXPIRE_SECONDS = 7 * 24 * 60 * 60  # 与推荐列表的过期时间保持一致
+    VIEW_FIELD = "views"
+    LIKE_FIELD = "likes"
+
+    @classmethod
+    def get_cache_key(cls, user_id: int) -> str:
+        """
+        获取缓存key
+
+        Args:
+            user_id (int): 用户ID
+
+        Returns:
+            str: 缓存key
+        """
+        return f"{cls.CACHE_KEY_PREFIX}{user_id}"
+
+    @classmethod
+    def increment_view(cls, user_id: int) -> None:
+        """
+        新增浏览计数
+
+        Args:
+            user_id (int): 用户ID
+        """
+        cls._increment(user_id, cls.VIEW_FIELD)
+
+    @classmethod
+    def increment_like(cls, user_id: int) -> None:
+        """
+        新增点赞计数
+
+        Args:
+            user_id (int): 用户ID
+        """
+        cls._increment(user_id, cls.LIKE_FIELD)
+
+    @classmethod
+    def reset(cls, user_id: int) -> None:
+        """
+        生成推荐后清零计数
+
+        Args:
+            user_id (int): 用户ID
+        """
+        cls.reset_many([user_id])
+
+    @classmethod
+    def reset_many(cls, user_ids: List[int]) -> None:
+        """
+        批量清零用户计数
+
+        Args:
+            user_ids (List[int]): 用户ID列表
+        """
+        if not user_ids:
+            return
+        try:
+            pipe = redis_cache.pipeline()
+            for user_id in user_ids:
+                key = cls.get_cache_key(user_id)
+                pipe.hset(key, mapping={cls.VIEW_FIELD: 0, cls.LIKE_FIELD: 0})
+                pipe.expire(key, cls.EXPIRE_SECONDS)
+            pipe.execute()
+        except Exception as e:
+            LogUtil.logger.error(f"[行为计数] 清零用户{user_ids}计数失败: {str(e)}")
+
+    @classmethod
+    def get_counts(cls, user_id: int, after_time: Optional[datetime] = None) -> Tuple[int, int]:
+        """
+        获取上次生成推荐后新增的浏览数和点赞数
+
+        计数不存在时（过期或Redis被清理）按推荐创建时间从数据库统计并写回
+
+        Args:
+            user_id (int): 用户ID
+            after_time (datetime): 最新推荐的创建时间，用于回退统计
+
+        Returns:
+            Tuple[int, int]: (浏览数, 点赞数)
+        """
+        key = cls.get_cache_key(user_id)
+        try:
+            views, likes = redis_cache.hmget(key, cls.VIEW_FIELD, cls.LIKE_FIELD)
+            if views is not None and likes is not None:
+                return int(views), int(likes)
+        except Exception as e:
+            LogUtil.logger.error(f"[行为计数] 读取用户{user_id}计数失败: {str(e)}")
+
+        if after_time is None:
+            return 0, 0
+        view_count = ViewMapper.count_views_after_time(user_id, after_time)
+        like_count = LikeMapper.count_likes_after_time(user_id, after_time)
+        try:
+            pipe = redis_cache.pipeline()
+            # 只在计数不存在时写入，避免覆盖并发的递增
+            pipe.hsetnx(key, cls.VIEW_FIELD, view_count)
+            pipe.hsetnx(key, cls.LIKE_FIELD, like_count)
+            pipe.expire(key, cls.EXPIRE_SECONDS)
+            pipe.execute()
+        except Exception as e:
+            LogUtil.logger.error(f"[行为计数] 写入用户{user_id}计数失败: {str(e)}")
+        return view_count, like_count
+
+    @classmethod
+    def _increment(cls, user_id: int, field: str) -> None:
+        key = cls.get_cache_key(user_id)
+        try:
+            # 计数不存在时不创建，由读取时从数据库统计，避免只记录到部分行为
+            if redis_cache.exists(key):
+                redis_cache.hincrby(key, field, 1)
+        except Exception as e:
+            LogUtil.logger.error(f"[行为计数] 更新用户{user_id}计数失败: {str(e)}")
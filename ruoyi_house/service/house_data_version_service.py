@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+# @Author  : YY
+# @FileName: house_data_version_service.py
+# @Time    : 2026-01-10 17:29:50
+
+from typing import Optional
+
+from ruoyi_admin.ext import redis_cache
+from ruoyi_common.utils.base import LogUtil
+
+
+class HouseDataVersionService:
+    """
+    房源数据版本
+
+    房源新增、修改、删除、导入时递增，依赖房源数据的预计算结果记录构建时的版本，
+    版本不变时直接复用，变化后才重新计算（各进程共享同一个版本号）
+    """
+
+    VERSION_KEY = "house:data:version"
+
+    @classmethod
+    def get_version(cls) -> Optional[int]:
+        """
+        获取当前房源数据版本
+
+        Returns:
+            Optional[int]: 数据版本，从未变更过时为0，读取失败时返回None
+        """
+        try:
+            value = redis_cache.get(cls.VERSION_KEY)
+        except Exception as e:
+            LogUtil.logger.error(f"[房源数据版本] 读取数据版本失败: {str(e)}")
+            return None
+        return int(value) if value else 0
+
+    @classmethod
+    def bump(cls) -> Optional[int]:
+        """
+        房源数据变更后递增数据版本
+
+        Returns:
+            Optional[int]: 新的数据版本，写入失败时返回None
+        """
+        try:
+            return int(redis_cache.incr(cls.VERSION_KEY))
+        except Exception as e:
+            LogUtil.logger.error(f"[房源数据版本] 递增数据版本失败: {str(e)}")
+            return None
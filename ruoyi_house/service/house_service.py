@@ -4,20 +4,40 @@
 # @Time    : 2026-01-10 17:29:50
 
 import re
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
+from flask import Flask
+
+from ruoyi_common.base.signal import app_completed
 from ruoyi_common.exception import ServiceException
 from ruoyi_common.utils import DateUtil
 from ruoyi_common.utils.base import LogUtil
 from ruoyi_common.utils.security_util import get_user_id, get_username
+from ruoyi_framework.descriptor import evict_cache_tags
 from ruoyi_house.domain.entity import House, View
-from ruoyi_house.mapper import LikeMapper, ViewMapper
+from ruoyi_house import reg
+from ruoyi_house.mapper import HouseCandidateIndex, HouseStatisticsAggregateMapper, LikeMapper, ViewMapper
 from ruoyi_house.mapper.house_mapper import HouseMapper
+from ruoyi_house.service.behavior_counter_service import BehaviorCounterService
+from ruoyi_house.service.house_data_version_service import HouseDataVersionService
+from ruoyi_house.service.house_statistics_service import HouseStatisticsService
+from ruoyi_house.service.house_statistics_snapshot import HouseStatisticsSnapshotEngine
+from ruoyi_house.service.recommend_engine import RecommendEngine
+from ruoyi_house.service.similar_house_service import SimilarHouseService
+from ruoyi_house.service.user_preference_service import UserPreferenceService
 
 
 class HouseService:
     """房源信息服务类"""
 
+    @classmethod
+    def init(cls) -> None:
+        """
+        初始化房源候选索引
+        """
+        HouseCandidateIndex.rebuild()
+        LogUtil.logger.info("房源候选索引初始化完成")
+
     @classmethod
     def select_house_list(cls, house: House) -> List[House]:
         """
@@ -44,6 +64,19 @@ class HouseService:
         """
         return HouseMapper.select_house_by_id(house_id)
 
+    @classmethod
+    def select_houses_by_ids(cls, house_ids: List[str]) -> Tuple[List[House], List[str]]:
+        """
+        根据ID列表批量查询房源信息（保持传入顺序）
+
+        Args:
+            house_ids (List[str]): 房源编号列表
+
+        Returns:
+            Tuple[List[House], List[str]]: (房源列表, 未查询到的房源编号列表)
+        """
+        return HouseMapper.select_houses_by_ids(house_ids)
+
     @classmethod
     def select_house_detail_by_id(cls, house_id: str) -> Optional[House]:
         """
@@ -66,6 +99,7 @@ class HouseService:
             house.is_liked = True
         else:
             house.is_liked = False
+        house.similar_house_ids = SimilarHouseService.select_similar_house_ids(house.house_id)
         # 查询用户今天是否浏览，如果没有需要添加浏览记录
         nowStr = DateUtil.get_date_now()
         view = ViewMapper.select_view_by_house_user_and_date(house_id, user_id, nowStr)
@@ -81,9 +115,33 @@ class HouseService:
             view.tags = house.tags
             view.orientation = house.orientation
             view.score = 1
-            ViewMapper.insert_view(view)
+            if ViewMapper.insert_view(view) > 0:
+                BehaviorCounterService.increment_view(user_id)
+                UserPreferenceService.record_behavior(user_id, view.town, view.house_type, view.orientation,
+                                                      view.tags, view.score, house_id=view.house_id)
         return house
 
+    @classmethod
+    def _on_houses_changed(cls, house_ids: List[str], removed_houses: List[House],
+                           added_houses: List[House]) -> None:
+        """
+        房源变更后更新预聚合，重建推荐特征矩阵和统计快照，并清理统计缓存
+
+        预聚合提交后才递增数据版本、清理缓存：清理之后的请求读到的一定是新数据，
+        清理之前开始的计算因数据版本变化不会把旧结果写回缓存
+
+        Args:
+            house_ids (List[str]): 变更的房源ID列表
+            removed_houses (List[House]): 删除或修改前的房源
+            added_houses (List[House]): 新增或修改后的房源
+        """
+        HouseStatisticsAggregateMapper.apply_changes(removed_houses, added_houses)
+        RecommendEngine.invalidate()
+        HouseStatisticsSnapshotEngine.invalidate()
+        HouseDataVersionService.bump()
+        evict_cache_tags(HouseStatisticsService.CACHE_TAG)
+        SimilarHouseService.mark_dirty(house_ids)
+
     @classmethod
     def insert_house(cls, house: House) -> int:
         """
@@ -99,7 +157,10 @@ class HouseService:
         existing = HouseMapper.select_house_by_id(house.house_id)
         if existing is not None:
             raise ServiceException(f"房源信息【{house.house_id}】已存在")
-        return HouseMapper.insert_house(house)
+        result = HouseMapper.insert_house(house)
+        if result > 0:
+            cls._on_houses_changed([house.house_id], [], [house])
+        return result
 
     @classmethod
     def update_house(cls, house: House) -> int:
@@ -112,7 +173,11 @@ class HouseService:
         Returns:
             int: 更新的记录数
         """
-        return HouseMapper.update_house(house)
+        existing = HouseMapper.select_house_by_id(house.house_id)
+        result = HouseMapper.update_house(house)
+        if result > 0:
+            cls._on_houses_changed([house.house_id], [existing], [house])
+        return result
 
     @classmethod
     def delete_house_by_ids(cls, ids: List[str]) -> int:
@@ -125,7 +190,11 @@ class HouseService:
         Returns:
             int: 删除的记录数
         """
-        return HouseMapper.delete_house_by_ids(ids)
+        existing_houses, _ = HouseMapper.select_houses_by_ids(ids)
+        result = HouseMapper.delete_house_by_ids(ids)
+        if result > 0:
+            cls._on_houses_changed(ids, existing_houses, [])
+        return result
 
     @classmethod
     def import_house(cls, house_list: List[House], update_support: bool = False) -> str:
@@ -147,6 +216,9 @@ class HouseService:
         success_msg = ""
         fail_msg = ""
         skip_count = 0
+        changed_ids = []
+        removed_houses = []
+        added_houses = []
 
         for index, house in enumerate(house_list, 1):
             try:
@@ -189,6 +261,10 @@ class HouseService:
 
                 if result > 0:
                     success_count += 1
+                    changed_ids.append(house.house_id)
+                    if existing:
+                        removed_houses.append(existing)
+                    added_houses.append(house)
                     success_msg += f"<br/> 第{success_count}条数据，{operation}成功：{display_value}"
                 else:
                     fail_count += 1
@@ -198,6 +274,9 @@ class HouseService:
                 fail_msg += f"<br/> 第{fail_count}条数据，导入失败，原因：{e.__class__.__name__}"
                 LogUtil.logger.error(f"导入房源信息失败，原因：{e}")
 
+        if success_count > 0:
+            cls._on_houses_changed(changed_ids, removed_houses, added_houses)
+
         # 构建结果消息
         total_processed = success_count + fail_count
         result_msg = f"共处理 {total_processed} 条数据"
@@ -332,3 +411,15 @@ class HouseService:
                 house.floor_height = floor_height
 
         return house
+
+
+@app_completed.connect_via(reg.app)
+def init(sender: Flask):
+    '''
+    初始化操作
+
+    Args:
+        sender (Flask): 消息发送者
+    '''
+    with sender.app_context():
+        HouseService.init()
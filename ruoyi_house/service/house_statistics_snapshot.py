@@ -0,0 +1,388 @@
+# -*- coding: utf-8 -*-
+# @Author  : YY
+# @FileName: house_statistics_snapshot.py
+# @Time    : 2026-01-10 17:29:50
+
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ruoyi_common.utils.base import LogUtil
+from ruoyi_house.domain.po import HousePo
+from ruoyi_house.domain.statistics.po import StatisticsPo
+from ruoyi_house.domain.statistics.quantile_sketch import QuantileSketch
+from ruoyi_house.mapper import HouseStatisticsAggregateMapper, HouseTagMapper
+from ruoyi_house.mapper.house_statistics_mapper import HouseStatisticsMapper
+from ruoyi_house.service.house_data_version_service import HouseDataVersionService
+
+
+class CategoryColumn:
+    """
+    字典编码的分类列：codes 为每行在 values 中的下标，空值为 -1
+    """
+
+    def __init__(self, codes: np.ndarray, values: List):
+        self.codes = codes
+        self.values = values
+        self.index = {value: code for code, value in enumerate(values)}
+        self._lower_values = [str(value).lower() for value in values]
+
+    @classmethod
+    def encode(cls, raw_values: List) -> 'CategoryColumn':
+        index = {}
+        codes = np.fromiter(
+            (-1 if value is None else index.setdefault(value, len(index)) for value in raw_values),
+            dtype=np.int32, count=len(raw_values))
+        return cls(codes, list(index))
+
+    def codes_containing(self, keyword: str) -> np.ndarray:
+        """
+        包含关键词的取值编码（与 MySQL LIKE 一样不区分大小写）
+        """
+        keyword = keyword.lower()
+        return np.array([code for code, value in enumerate(self._lower_values) if keyword in value],
+                        dtype=np.int32)
+
+
+class Grouping:
+    """
+    分组索引：rows 为每个分组条目对应的房源行（None 表示与房源行一一对应），
+    codes 为条目的分组编码；按统计列预先排好 (分组, 统计值) 顺序，查询时只需过滤不用排序
+    """
+
+    def __init__(self, rows: Optional[np.ndarray], codes: np.ndarray, values: List):
+        self.rows = rows
+        self.codes = codes
+        self.values = values
+        # 空值分组编码 -1 平移到 0，作为 bincount 的下标
+        self.keys = codes.astype(np.int64) + 1
+        self._orders = {}
+
+    def order_by(self, key: str, values: np.ndarray) -> np.ndarray:
+        """
+        统计值非空的条目下标，按 (分组, 统计值) 升序
+        """
+        order = self._orders.get(key)
+        if order is None:
+            entry_values = values if self.rows is None else values[self.rows]
+            candidates = np.flatnonzero(~np.isnan(entry_values))
+            order = candidates[np.lexsort((entry_values[candidates], self.codes[candidates]))]
+            self._orders[key] = order
+        return order
+
+
+class HouseColumnSnapshot:
+    """
+    房源表列式快照
+
+    分类列字典编码为整数数组，数值列为 float64 数组（空值为 NaN），标签拆分为 (房源行, 标签编码) 条目。
+    查询条件转为布尔掩码，分组统计用 bincount 计算，结果与 HouseStatisticsMapper 的 SQL 统计一致
+    """
+
+    CATEGORY_COLUMNS = ('town', 'community', 'house_type', 'orientation', 'decoration_type', 'floor_type', 'tags')
+    NUMERIC_COLUMNS = ('unit_price', 'decoration_area', 'building_year')
+
+    def __init__(self, size: int, categories: Dict[str, CategoryColumn], numerics: Dict[str, np.ndarray]):
+        self.size = size
+        self.categories = categories
+        self.numerics = numerics
+        self.build_time = time.time()
+        self.data_version: Optional[int] = None
+
+        # 标签组合按单个标签展开，保持 HouseTagMapper.split_tags 的拆分规则
+        tags = categories['tags']
+        tag_index = {}
+        combination_tags = [
+            [tag_index.setdefault(tag, len(tag_index)) for tag in HouseTagMapper.split_tags(value)]
+            for value in tags.values
+        ]
+        tag_counts = np.array([len(codes) for codes in combination_tags] + [0], dtype=np.int64)
+        row_tag_counts = np.where(tags.codes >= 0, tag_counts[tags.codes], 0)
+        tag_rows = np.repeat(np.arange(size), row_tag_counts)
+        tag_codes = np.fromiter(
+            (code for combination in tags.codes[tags.codes >= 0] for code in combination_tags[combination]),
+            dtype=np.int32, count=int(row_tag_counts.sum()))
+        self.tag_column = CategoryColumn(np.zeros(0, dtype=np.int32), list(tag_index))
+        self.tag_rows = tag_rows
+        self.tag_codes = tag_codes
+
+        self.groupings = {}
+        for name, column, _, _ in HouseStatisticsAggregateMapper.dimensions():
+            if name == 'tags':
+                self.groupings[name] = Grouping(tag_rows, tag_codes, self.tag_column.values)
+            elif name != 'price':
+                category = categories[column.key]
+                self.groupings[name] = Grouping(None, category.codes, category.values)
+
+    @classmethod
+    def from_rows(cls, rows) -> 'HouseColumnSnapshot':
+        """
+        根据房源行构建快照
+
+        Args:
+            rows: 按 CATEGORY_COLUMNS + NUMERIC_COLUMNS 顺序的列值元组序列
+
+        Returns:
+            HouseColumnSnapshot: 列式快照
+        """
+        rows = list(rows)
+        categories = {}
+        for position, name in enumerate(cls.CATEGORY_COLUMNS):
+            categories[name] = CategoryColumn.encode([row[position] for row in rows])
+        numerics = {}
+        offset = len(cls.CATEGORY_COLUMNS)
+        for position, name in enumerate(cls.NUMERIC_COLUMNS, offset):
+            numerics[name] = np.fromiter(
+                (np.nan if row[position] is None else float(row[position]) for row in rows),
+                dtype=np.float64, count=len(rows))
+        return cls(len(rows), categories, numerics)
+
+    @classmethod
+    def columns(cls):
+        return [getattr(HousePo, name) for name in cls.CATEGORY_COLUMNS + cls.NUMERIC_COLUMNS]
+
+    def filter_mask(self, request) -> np.ndarray:
+        """
+        查询条件对应的房源掩码（与 HouseStatisticsMapper.builder_where 一致）
+
+        Args:
+            request (HouseStatisticsRequest): 查询条件
+
+        Returns:
+            np.ndarray: 布尔掩码
+        """
+        mask = np.ones(self.size, dtype=bool)
+        for name in HouseStatisticsAggregateMapper.FILTER_DIMENSIONS:
+            value = getattr(request, name, None)
+            if not value:
+                continue
+            category = self.categories[name]
+            code = category.index.get(value)
+            if code is None:
+                return np.zeros(self.size, dtype=bool)
+            mask &= category.codes == code
+        keyword = getattr(request, 'tags', None)
+        if keyword:
+            mask &= self._tags_mask(keyword)
+        return mask
+
+    def _tags_mask(self, keyword: str) -> np.ndarray:
+        """
+        标签关键词掩码：关键词包含分隔符时匹配整个标签字符串，否则匹配任一单个标签
+        """
+        if HouseTagMapper.TAG_SEPARATOR in keyword:
+            tags = self.categories['tags']
+            return np.isin(tags.codes, tags.codes_containing(keyword))
+        matched = np.isin(self.tag_codes, self.tag_column.codes_containing(keyword))
+        return np.bincount(self.tag_rows[matched], minlength=self.size) > 0
+
+    def group_statistics(self, request, dimension: str, limit: int = None,
+                         mask: np.ndarray = None) -> List[StatisticsPo]:
+        """
+        按维度分组统计 count/avg/max/min 及分位数，按数量降序
+
+        每组的统计值已按缓存的排序升序排列，分位数直接按位置取值（与 QuantileSketch.quantile 的位置一致）
+
+        Args:
+            request (HouseStatisticsRequest): 查询条件
+            dimension (str): 维度名，见 HouseStatisticsAggregateMapper.dimensions
+            limit (int): 返回的数量
+            mask (np.ndarray): 已经计算好的查询条件掩码
+
+        Returns:
+            List[StatisticsPo]: 统计结果
+        """
+        if mask is None:
+            mask = self.filter_mask(request)
+        _, _, value_column, exclude_null = self._dimension(dimension)
+        grouping = self.groupings[dimension]
+        entry_mask = mask if grouping.rows is None else mask[grouping.rows]
+        keys = grouping.keys
+        width = len(grouping.values) + 1
+        counts = np.bincount(keys[entry_mask], minlength=width)
+
+        if value_column is not None:
+            values = self.numerics[value_column.key]
+            order = grouping.order_by(value_column.key, values)
+            selected = order[entry_mask[order]]
+            selected_keys = keys[selected]
+            selected_values = values[selected] if grouping.rows is None else values[grouping.rows[selected]]
+            value_counts = np.bincount(selected_keys, minlength=width)
+            sums = np.bincount(selected_keys, weights=selected_values, minlength=width)
+            # 每组按统计值升序，首个为最小值，最后一个为最大值
+            mins = np.full(width, np.nan)
+            maxs = np.full(width, np.nan)
+            quantiles = {name: np.full(width, np.nan) for name, _ in QuantileSketch.QUANTILES}
+            if len(selected_keys):
+                starts = np.flatnonzero(np.r_[True, selected_keys[1:] != selected_keys[:-1]])
+                ends = np.r_[starts[1:], len(selected_keys)] - 1
+                mins[selected_keys[starts]] = selected_values[starts]
+                maxs[selected_keys[starts]] = selected_values[ends]
+                for name, q in QuantileSketch.QUANTILES:
+                    positions = starts + (q * (ends - starts)).astype(np.int64)
+                    quantiles[name][selected_keys[starts]] = selected_values[positions]
+
+        groups = np.flatnonzero(counts)
+        if exclude_null:
+            groups = groups[groups > 0]
+        groups = groups[np.argsort(-counts[groups], kind='stable')]
+        if limit is not None:
+            groups = groups[:limit]
+
+        pos = []
+        for key in groups:
+            item = {"value": int(counts[key]), "name": grouping.values[key - 1] if key else None}
+            if value_column is not None:
+                item["avg"] = float(sums[key] / value_counts[key]) if value_counts[key] else None
+                item["max"] = self._to_number(maxs[key])
+                item["min"] = self._to_number(mins[key])
+                for name, values in quantiles.items():
+                    item[name] = self._to_number(values[key])
+            pos.append(StatisticsPo(**item))
+        return pos
+
+    def histogram_statistics(self, request, column: str, boundaries: List[int],
+                             mask: np.ndarray = None) -> List[StatisticsPo]:
+        """
+        数值分段统计，与 HouseStatisticsMapper.histogram_statistics 一致：name 为分段序号，按序号升序
+
+        Args:
+            request (HouseStatisticsRequest): 查询条件
+            column (str): 数值列名
+            boundaries (List[int]): 升序的分段边界
+            mask (np.ndarray): 已经计算好的查询条件掩码
+
+        Returns:
+            List[StatisticsPo]: 统计结果
+        """
+        if mask is None:
+            mask = self.filter_mask(request)
+        values = self.numerics[column][mask]
+        values = values[~np.isnan(values)]
+        buckets = np.searchsorted(np.asarray(boundaries, dtype=np.float64), values, side='right')
+        counts = np.bincount(buckets, minlength=len(boundaries) + 1)
+        return [StatisticsPo(value=int(counts[bucket]), name=int(bucket)) for bucket in np.flatnonzero(counts)]
+
+    def dashboard_statistics(self, request, community_limit: int,
+                             price_range: List[int]) -> Dict[str, List[StatisticsPo]]:
+        """
+        仪表盘全部维度统计，与 HouseStatisticsMapper.dashboard_statistics 返回结构一致
+        """
+        mask = self.filter_mask(request)
+        result = {}
+        for name, _, _, _ in HouseStatisticsAggregateMapper.dimensions():
+            if name == 'price':
+                result[name] = self.histogram_statistics(request, 'unit_price', price_range, mask)
+            else:
+                limit = community_limit if name == 'community' else None
+                result[name] = self.group_statistics(request, name, limit, mask)
+        return result
+
+    def year_prices(self, request, start_year: int,
+                    segment: str = None) -> Tuple[np.ndarray, np.ndarray, Optional[np.ndarray]]:
+        """
+        价格预测所需的 (建筑年份, 单价[, 分段值])，与 HouseStatisticsMapper.get_detailed_house_data 的过滤条件一致
+
+        Args:
+            request (HouseStatisticsRequest): 查询条件
+            start_year (int): 开始年份
+            segment (str): 分段列名，指定时排除分段值为空的房源
+
+        Returns:
+            Tuple: 建筑年份、单价、分段值（未指定分段时为None）
+        """
+        years = self.numerics['building_year']
+        prices = self.numerics['unit_price']
+        mask = self.filter_mask(request)
+        with np.errstate(invalid='ignore'):
+            mask &= (years >= start_year) & (prices > 0)
+        segments = None
+        if segment is not None:
+            category = self.categories[segment]
+            present = np.array([bool(value) for value in category.values] + [False], dtype=bool)
+            mask &= present[category.codes]
+            segments = np.asarray(category.values + [None], dtype=object)[category.codes[mask]]
+        return years[mask].astype(np.int64), prices[mask], segments
+
+    @staticmethod
+    def _dimension(name: str):
+        for dimension in HouseStatisticsAggregateMapper.dimensions():
+            if dimension[0] == name:
+                return dimension
+        raise KeyError(name)
+
+    @staticmethod
+    def _to_number(value: float):
+        if np.isnan(value):
+            return None
+        return int(value) if float(value).is_integer() else float(value)
+
+
+class HouseStatisticsSnapshotEngine:
+    """
+    房源列式快照缓存
+
+    快照按进程缓存，本进程房源变更时直接失效；其他进程的变更通过房源数据版本发现
+    （最多每 VERSION_CHECK_INTERVAL 秒检查一次），超过 SNAPSHOT_TTL 后重新构建
+    """
+
+    SNAPSHOT_TTL = 300  # 快照缓存时间（秒）
+    VERSION_CHECK_INTERVAL = 5  # 数据版本检查间隔（秒）
+
+    _snapshot: Optional[HouseColumnSnapshot] = None
+    _last_check_time = 0.0
+    _lock = threading.Lock()
+
+    @classmethod
+    def _is_valid(cls, snapshot: Optional[HouseColumnSnapshot], data_version: Optional[int]) -> bool:
+        if snapshot is None or time.time() - snapshot.build_time >= cls.SNAPSHOT_TTL:
+            return False
+        return data_version is None or snapshot.data_version is None or snapshot.data_version == data_version
+
+    @classmethod
+    def get_snapshot(cls, data_version: Optional[int] = None) -> Optional[HouseColumnSnapshot]:
+        """
+        获取房源列式快照（过期、失效或数据版本变化后重新构建）
+
+        Args:
+            data_version (Optional[int]): 调用方已读取的房源数据版本，为空时按检查间隔读取
+
+        Returns:
+            HouseColumnSnapshot: 列式快照，构建失败或没有房源时返回None
+        """
+        if data_version is None and time.time() - cls._last_check_time >= cls.VERSION_CHECK_INTERVAL:
+            cls._last_check_time = time.time()
+            data_version = HouseDataVersionService.get_version()
+        snapshot = cls._snapshot
+        if cls._is_valid(snapshot, data_version):
+            return snapshot
+        with cls._lock:
+            snapshot = cls._snapshot
+            if cls._is_valid(snapshot, data_version):
+                return snapshot
+            start = time.perf_counter()
+            # 先读取版本再读取数据，读取期间发生的变更会在下次检查时触发重建
+            build_version = HouseDataVersionService.get_version()
+            try:
+                rows = HouseStatisticsMapper.select_snapshot_rows(HouseColumnSnapshot.columns())
+                snapshot = HouseColumnSnapshot.from_rows(rows)
+            except Exception as e:
+                LogUtil.logger.error(f"[统计快照] 构建房源列式快照失败: {str(e)}")
+                return None
+            if snapshot.size == 0:
+                return None
+            snapshot.data_version = build_version
+            cls._snapshot = snapshot
+            LogUtil.logger.info(
+                f"[统计快照] 构建房源列式快照完成: 房源数{snapshot.size}, 数据版本{build_version}, "
+                f"耗时{(time.perf_counter() - start) * 1000:.1f}ms")
+            return snapshot
+
+    @classmethod
+    def invalidate(cls) -> None:
+        """
+        使房源列式快照失效，下次统计时重新构建
+        """
+        cls._snapshot = None
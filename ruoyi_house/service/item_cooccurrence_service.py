@@ -0,0 +1,349 @@
+# -*- coding: utf-8 -*-
+# @Author  : YY
+# @FileName: item_cooccurrence_service.py
+# @Time    : 2026-01-10 17:29:50
+
+import io
+import json
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from ruoyi_admin.ext import redis_cache
+from ruoyi_common.utils.base import LogUtil
+from ruoyi_house.mapper import LikeMapper, ViewMapper
+
+
+class ItemCooccurrenceModel:
+    """
+    房源共现模型
+
+    共现矩阵以CSR数组（indptr, indices, data）保存：第i行第j列为同时浏览或点赞过房源i和j的用户数；
+    邻居列表同样为CSR结构，保存每个房源按余弦相似度排序的Top N房源
+    """
+
+    def __init__(self, house_ids: np.ndarray, item_counts: np.ndarray, indptr: np.ndarray, indices: np.ndarray,
+                 data: np.ndarray, watermark: Dict[str, int]):
+        self.house_ids = house_ids
+        self.item_counts = item_counts
+        self.indptr = indptr
+        self.indices = indices
+        self.data = data
+        self.watermark = watermark
+        self.index = {house_id: i for i, house_id in enumerate(house_ids.tolist())}
+        self.neighbor_indptr = np.zeros(1, dtype=np.int64)
+        self.neighbor_indices = np.empty(0, dtype=np.int32)
+        self.neighbor_scores = np.empty(0, dtype=np.float32)
+
+    @property
+    def size(self) -> int:
+        return len(self.house_ids)
+
+    def build_neighbors(self, top_n: int) -> None:
+        """
+        根据共现矩阵计算每个房源的Top N相似房源（余弦相似度）
+
+        Args:
+            top_n (int): 每个房源保留的邻居数
+        """
+        rows = np.repeat(np.arange(self.size, dtype=np.int64), np.diff(self.indptr))
+        similarities = self.data / np.sqrt(self.item_counts[rows] * self.item_counts[self.indices])
+        # 行内按相似度降序，同分按房源顺序
+        order = np.lexsort((self.indices, -similarities, rows))
+        rows = rows[order]
+        rank = np.arange(len(order)) - self.indptr[rows]
+        keep = order[rank < top_n]
+        kept_rows = rows[rank < top_n]
+        self.neighbor_indptr = np.concatenate(([0], np.cumsum(np.bincount(kept_rows, minlength=self.size))))
+        self.neighbor_indices = self.indices[keep].astype(np.int32)
+        self.neighbor_scores = similarities[keep].astype(np.float32)
+
+    def neighbors(self, house_id: str) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        查询房源的相似房源
+
+        Args:
+            house_id (str): 房源ID
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: (房源下标数组, 相似度数组)
+        """
+        i = self.index.get(house_id)
+        if i is None:
+            return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.float32)
+        start, end = self.neighbor_indptr[i], self.neighbor_indptr[i + 1]
+        return self.neighbor_indices[start:end], self.neighbor_scores[start:end]
+
+    def to_bytes(self) -> bytes:
+        buffer = io.BytesIO()
+        np.savez_compressed(
+            buffer,
+            house_ids=self.house_ids.astype(str),
+            item_counts=self.item_counts,
+            indptr=self.indptr,
+            indices=self.indices,
+            data=self.data,
+            neighbor_indptr=self.neighbor_indptr,
+            neighbor_indices=self.neighbor_indices,
+            neighbor_scores=self.neighbor_scores,
+            watermark=np.frombuffer(json.dumps(self.watermark).encode('utf-8'), dtype=np.uint8),
+        )
+        return buffer.getvalue()
+
+    @classmethod
+    def from_bytes(cls, value: bytes) -> 'ItemCooccurrenceModel':
+        with np.load(io.BytesIO(value), allow_pickle=False) as arrays:
+            model = cls(arrays['house_ids'], arrays['item_counts'], arrays['indptr'], arrays['indices'],
+                        arrays['data'], json.loads(arrays['watermark'].tobytes().decode('utf-8')))
+            model.neighbor_indptr = arrays['neighbor_indptr']
+            model.neighbor_indices = arrays['neighbor_indices']
+            model.neighbor_scores = arrays['neighbor_scores']
+        return model
+
+
+class ItemCooccurrenceService:
+    """
+    房源共现（Item-to-Item协同过滤）服务
+
+    离线根据浏览和点赞记录构建房源共现矩阵和相似房源列表，保存到Redis；
+    之后按记录编号水位线增量合并新行为（受影响用户的购物篮按全量构建的规则重新截取，
+    先减去旧购物篮的共现再加上新购物篮的共现，共现计数与全量构建一致）。
+    推荐时只需查询用户最近房源的邻居列表
+    """
+
+    CACHE_KEY = "house:item_cooccurrence:model"
+    VERSION_KEY = "house:item_cooccurrence:version"
+    NEIGHBOR_COUNT = 50  # 每个房源保留的相似房源数
+    MAX_USER_ITEMS = 100  # 每个用户参与共现统计的最近房源数，避免超大购物篮
+    MODEL_CHECK_INTERVAL = 60  # 进程内模型检查Redis版本的间隔（秒）
+
+    _lock = threading.Lock()
+    _model: Optional[ItemCooccurrenceModel] = None
+    _model_version: Optional[bytes] = None
+    _checked_time: float = 0
+
+    @classmethod
+    def build(cls) -> Optional[ItemCooccurrenceModel]:
+        """
+        根据全部浏览和点赞记录全量构建共现模型
+
+        Returns:
+            ItemCooccurrenceModel: 共现模型
+        """
+        start = time.perf_counter()
+        view_rows = ViewMapper.select_user_house_rows()
+        like_rows = LikeMapper.select_user_house_rows()
+        watermark = {
+            'viewId': view_rows[-1][0] if view_rows else 0,
+            'likeId': like_rows[-1][0] if like_rows else 0,
+        }
+        baskets = cls._group_baskets(view_rows + like_rows)
+
+        house_ids = sorted({house_id for basket in baskets.values() for house_id in basket})
+        index = {house_id: i for i, house_id in enumerate(house_ids)}
+        encoded = [np.asarray([index[house_id] for house_id in basket], dtype=np.int64)
+                   for basket in baskets.values()]
+        size = len(house_ids)
+
+        item_counts = np.bincount(np.concatenate(encoded), minlength=size).astype(np.float32) \
+            if encoded else np.zeros(size, dtype=np.float32)
+        rows, cols = cls._basket_pairs(encoded)
+        indptr, indices, data = cls._to_csr(rows, cols, np.ones(len(rows), dtype=np.float32), size)
+        model = ItemCooccurrenceModel(np.asarray(house_ids, dtype=str), item_counts, indptr, indices, data,
+                                      watermark)
+        model.build_neighbors(cls.NEIGHBOR_COUNT)
+        cls._save(model)
+        LogUtil.logger.info(
+            f"[共现模型] 全量构建完成: 房源{size}个, 用户{len(baskets)}个, 共现{len(data)}对, "
+            f"耗时{(time.perf_counter() - start) * 1000:.1f}ms")
+        return model
+
+    @classmethod
+    def refresh(cls) -> Optional[ItemCooccurrenceModel]:
+        """
+        根据上次构建后新增的浏览和点赞记录增量更新共现模型，模型不存在时全量构建
+
+        Returns:
+            ItemCooccurrenceModel: 共现模型
+        """
+        model = cls._load()
+        if model is None:
+            return cls.build()
+        start = time.perf_counter()
+        view_id, like_id = model.watermark.get('viewId', 0), model.watermark.get('likeId', 0)
+        new_view_rows = ViewMapper.select_user_house_rows(after_id=view_id)
+        new_like_rows = LikeMapper.select_user_house_rows(after_id=like_id)
+        if not new_view_rows and not new_like_rows:
+            return model
+        new_rows = new_view_rows + new_like_rows
+        user_ids = list(dict.fromkeys(row[1] for row in new_rows))
+        old_rows = ViewMapper.select_user_house_rows(until_id=view_id, user_ids=user_ids) + \
+            LikeMapper.select_user_house_rows(until_id=like_id, user_ids=user_ids)
+        old_baskets = cls._group_baskets(old_rows)
+        merged_baskets = cls._group_baskets(old_rows + new_rows)
+
+        # 新出现的房源追加到词表末尾
+        house_ids = model.house_ids.tolist()
+        index = dict(model.index)
+        for basket in merged_baskets.values():
+            for house_id in basket:
+                if house_id not in index:
+                    index[house_id] = len(house_ids)
+                    house_ids.append(house_id)
+        size = len(house_ids)
+
+        # 受影响用户：减去旧购物篮的贡献，加上合并截取后购物篮的贡献（被挤出最近MAX_USER_ITEMS个的房源随之移除）
+        delta_rows, delta_cols, delta_data, item_encoded, item_weights = [], [], [], [], []
+        for user_id, merged in merged_baskets.items():
+            old = old_baskets.get(user_id, [])
+            if set(old) == set(merged):
+                continue
+            old_encoded = np.asarray([index[house_id] for house_id in old if house_id in model.index], dtype=np.int64)
+            merged_encoded = np.asarray([index[house_id] for house_id in merged], dtype=np.int64)
+            for encoded, weight in ((old_encoded, -1.0), (merged_encoded, 1.0)):
+                rows, cols = cls._basket_pairs([encoded])
+                delta_rows.append(rows)
+                delta_cols.append(cols)
+                delta_data.append(np.full(len(rows), weight, dtype=np.float32))
+                item_encoded.append(encoded)
+                item_weights.append(np.full(len(encoded), weight, dtype=np.float32))
+
+        item_counts = np.zeros(size, dtype=np.float32)
+        item_counts[:model.size] = model.item_counts
+        if item_encoded:
+            item_counts += np.bincount(np.concatenate(item_encoded), weights=np.concatenate(item_weights),
+                                       minlength=size).astype(np.float32)
+        model_rows = np.repeat(np.arange(model.size, dtype=np.int64), np.diff(model.indptr))
+        rows = np.concatenate([model_rows] + delta_rows) if delta_rows else model_rows
+        cols = np.concatenate([model.indices.astype(np.int64)] + delta_cols) if delta_cols else model.indices
+        data = np.concatenate([model.data] + delta_data)
+        indptr, indices, data = cls._to_csr(rows, cols, data, size)
+
+        watermark = {
+            'viewId': new_view_rows[-1][0] if new_view_rows else view_id,
+            'likeId': new_like_rows[-1][0] if new_like_rows else like_id,
+        }
+        model = ItemCooccurrenceModel(np.asarray(house_ids, dtype=str), item_counts, indptr, indices, data,
+                                      watermark)
+        model.build_neighbors(cls.NEIGHBOR_COUNT)
+        cls._save(model)
+        LogUtil.logger.info(
+            f"[共现模型] 增量更新完成: 新增记录{len(new_rows)}条, "
+            f"用户{len(user_ids)}个, 耗时{(time.perf_counter() - start) * 1000:.1f}ms")
+        return model
+
+    @classmethod
+    def recommend(cls, recent_houses: Dict[str, float], top_n: int) -> List[str]:
+        """
+        根据用户最近交互的房源查询相似房源
+
+        Args:
+            recent_houses (Dict[str, float]): 房源ID -> 行为权重
+            top_n (int): 返回数量
+
+        Returns:
+            List[str]: 按加权相似度降序的房源ID列表
+        """
+        model = cls.get_model()
+        if model is None or not recent_houses:
+            return []
+        neighbor_indices, neighbor_scores = [], []
+        for house_id, weight in recent_houses.items():
+            indices, scores = model.neighbors(house_id)
+            if len(indices):
+                neighbor_indices.append(indices)
+                neighbor_scores.append(scores * weight)
+        if not neighbor_indices:
+            return []
+        candidates, inverse = np.unique(np.concatenate(neighbor_indices), return_inverse=True)
+        scores = np.bincount(inverse, weights=np.concatenate(neighbor_scores))
+        order = np.lexsort((candidates, -scores))[:top_n]
+        return model.house_ids[candidates[order]].tolist()
+
+    @classmethod
+    def get_model(cls) -> Optional[ItemCooccurrenceModel]:
+        """
+        获取进程内的共现模型，Redis中版本变化时重新加载
+
+        Returns:
+            ItemCooccurrenceModel: 共现模型，未构建时返回None
+        """
+        if time.time() - cls._checked_time < cls.MODEL_CHECK_INTERVAL:
+            return cls._model
+        with cls._lock:
+            if time.time() - cls._checked_time < cls.MODEL_CHECK_INTERVAL:
+                return cls._model
+            try:
+                version = redis_cache.get(cls.VERSION_KEY)
+                if version != cls._model_version:
+                    cls._model = cls._load()
+                    cls._model_version = version
+            except Exception as e:
+                LogUtil.logger.error(f"[共现模型] 加载共现模型失败: {str(e)}")
+            cls._checked_time = time.time()
+            return cls._model
+
+    @classmethod
+    def _load(cls) -> Optional[ItemCooccurrenceModel]:
+        value = redis_cache.get(cls.CACHE_KEY)
+        return ItemCooccurrenceModel.from_bytes(value) if value else None
+
+    @classmethod
+    def _save(cls, model: ItemCooccurrenceModel) -> None:
+        pipe = redis_cache.pipeline()
+        pipe.set(cls.CACHE_KEY, model.to_bytes())
+        pipe.incr(cls.VERSION_KEY)
+        pipe.execute()
+
+    @classmethod
+    def _group_baskets(cls, rows: Iterable[Tuple[int, int, str, datetime]]) -> Dict[int, List[str]]:
+        """
+        按用户分组房源（去重，保留最近的MAX_USER_ITEMS个）
+        浏览和点赞记录来自不同的表，编号不可比较，按创建时间合并排序（时间相同时保持传入顺序）
+        """
+        baskets: Dict[int, Dict[str, bool]] = {}
+        for _, user_id, house_id, _ in sorted(rows, key=lambda row: row[3] or datetime.min):
+            basket = baskets.setdefault(user_id, {})
+            basket.pop(house_id, None)
+            basket[house_id] = True
+        return {
+            user_id: list(basket.keys())[-cls.MAX_USER_ITEMS:]
+            for user_id, basket in baskets.items()
+        }
+
+    @staticmethod
+    def _basket_pairs(baskets: List[np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        生成每个购物篮内所有有序房源对（不含自身）
+        """
+        rows, cols = [], []
+        for basket in baskets:
+            n = len(basket)
+            if n < 2:
+                continue
+            left = np.repeat(basket, n)
+            right = np.tile(basket, n)
+            mask = left != right
+            rows.append(left[mask])
+            cols.append(right[mask])
+        if not rows:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        return np.concatenate(rows), np.concatenate(cols)
+
+    @staticmethod
+    def _to_csr(rows: np.ndarray, cols: np.ndarray, data: np.ndarray,
+                size: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        合并重复坐标并转换为CSR数组（合并后为0的坐标移除）
+        """
+        keys = rows.astype(np.int64) * size + cols.astype(np.int64)
+        unique_keys, inverse = np.unique(keys, return_inverse=True)
+        sums = np.bincount(inverse, weights=data).astype(np.float32)
+        nonzero = sums != 0
+        unique_keys, sums = unique_keys[nonzero], sums[nonzero]
+        unique_rows = unique_keys // size
+        indptr = np.concatenate(([0], np.cumsum(np.bincount(unique_rows, minlength=size)))).astype(np.int64)
+        return indptr, (unique_keys % size).astype(np.int32), sums
@@ -12,6 +12,8 @@ from ruoyi_framework.descriptor.datascope import DataScope
 from ruoyi_house.domain.entity import Like
 from ruoyi_house.mapper import HouseMapper
 from ruoyi_house.mapper.like_mapper import LikeMapper
+from ruoyi_house.service.behavior_counter_service import BehaviorCounterService
+from ruoyi_house.service.user_preference_service import UserPreferenceService
 
 
 
@@ -77,7 +79,14 @@ class LikeService:
         user_id = get_user_id()
         like_entity = LikeMapper.select_like_by_user_id_and_house_id(user_id, like_entity.house_id)
         if like_entity is not None and like_entity.id is not None:
-            return LikeMapper.delete_like_by_ids([like_entity.id])
+            result = LikeMapper.delete_like_by_ids([like_entity.id])
+            if result > 0:
+                # 取消点赞时撤销该点赞对偏好向量的贡献
+                UserPreferenceService.record_behavior(user_id, like_entity.town, like_entity.house_type,
+                                                      like_entity.orientation, like_entity.tags,
+                                                      -float(like_entity.score or 0), like_entity.create_time,
+                                                      house_id=like_entity.house_id)
+            return result
         like = Like()
         like.house_id = house.house_id
         like.user_id = user_id
@@ -89,7 +98,12 @@ class LikeService:
         like.tags = house.tags
         like.orientation = house.orientation
         like.score = 15
-        return LikeMapper.insert_like(like)
+        result = LikeMapper.insert_like(like)
+        if result > 0:
+            BehaviorCounterService.increment_like(user_id)
+            UserPreferenceService.record_behavior(user_id, like.town, like.house_type, like.orientation, like.tags,
+                                                  like.score, house_id=like.house_id)
+        return result
 
     @classmethod
     def update_like(cls, like: Like) -> int:
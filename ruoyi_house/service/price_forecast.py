@@ -0,0 +1,551 @@
+# -*- coding: utf-8 -*-
+# @Author  : YY
+# @FileName: price_forecast.py
+# @Time    : 2026-01-10 17:29:50
+
+import datetime
+import multiprocessing
+from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import Dict, Hashable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+class YearlySeries:
+    """
+    按建筑年代聚合的房源年度序列
+
+    years 升序，counts / avgs / maxs / mins 与 years 一一对应
+    """
+
+    MIN_HOUSE_COUNT = 5  # 每个年份最少房源数，不足的年份排除
+    DEFAULT_COUNT = 1000  # 没有任何年份数据时推断的房源数
+    DEFAULT_PRICE = 15000  # 没有任何年份数据时推断的均价
+    MISSING_COUNT_RATIO = 0.8  # 缺失年份房源数相对平均房源数的比例
+
+    def __init__(self, years: np.ndarray, counts: np.ndarray, avgs: np.ndarray,
+                 maxs: np.ndarray, mins: np.ndarray):
+        self.years = np.asarray(years, dtype=np.int64)
+        self.counts = np.asarray(counts, dtype=np.int64)
+        self.avgs = np.asarray(avgs, dtype=np.float64)
+        self.maxs = np.asarray(maxs, dtype=np.float64)
+        self.mins = np.asarray(mins, dtype=np.float64)
+
+    def __len__(self) -> int:
+        return len(self.years)
+
+    @classmethod
+    def from_rows(cls, rows, current_year: int = None) -> 'YearlySeries':
+        """
+        根据房源明细行聚合年度序列
+
+        Args:
+            rows: 含 building_year、unit_price 的房源行
+            current_year (int): 当前年份，大于该年份的数据视为脏数据
+
+        Returns:
+            YearlySeries: 年度序列
+        """
+        building_years, unit_prices = cls.to_arrays(rows)
+        return cls.group(building_years, unit_prices, current_year=current_year)[None]
+
+    @staticmethod
+    def to_arrays(rows):
+        """
+        把房源行转为 (建筑年份, 单价) 数组，空值记为0
+        """
+        rows = list(rows)
+        building_years = np.fromiter((row['building_year'] or 0 for row in rows),
+                                     dtype=np.int64, count=len(rows))
+        unit_prices = np.fromiter((float(row['unit_price'] or 0) for row in rows),
+                                  dtype=np.float64, count=len(rows))
+        return building_years, unit_prices
+
+    @classmethod
+    def group(cls, building_years: np.ndarray, unit_prices: np.ndarray,
+              segments: Optional[Sequence[Hashable]] = None,
+              current_year: int = None) -> Dict[Hashable, 'YearlySeries']:
+        """
+        按（分段, 建筑年份）一次排序分组，得到每个分段的年度序列
+
+        Args:
+            building_years (np.ndarray): 建筑年份
+            unit_prices (np.ndarray): 单价
+            segments (Sequence[Hashable]): 每行所属分段，为空时全部归入分段 None
+            current_year (int): 当前年份
+
+        Returns:
+            Dict[Hashable, YearlySeries]: 分段 -> 年度序列（没有有效数据的分段序列为空）
+        """
+        keys, codes = cls.encode_segments(segments, len(building_years))
+        return cls.build(keys, *cls.group_arrays(building_years, unit_prices, codes, current_year))
+
+    @staticmethod
+    def encode_segments(segments: Optional[Sequence[Hashable]], size: int):
+        """
+        字典编码分段（分段值可能为None，不能直接排序）
+
+        Returns:
+            tuple: (分段值列表, 每行的分段编码)
+        """
+        if segments is None:
+            return [None], np.zeros(size, dtype=np.int64)
+        index = {}
+        codes = np.fromiter((index.setdefault(segment, len(index)) for segment in segments),
+                            dtype=np.int64, count=size)
+        return list(index), codes
+
+    @staticmethod
+    def group_arrays(building_years: np.ndarray, unit_prices: np.ndarray, codes: np.ndarray,
+                     current_year: int = None):
+        """
+        按（分段编码, 建筑年份）分组计算 count/sum/min/max
+
+        Returns:
+            tuple: (分组的分段编码, 年份, 数量, 单价合计, 最低价, 最高价)，按分段编码、年份升序
+        """
+        if current_year is None:
+            current_year = datetime.datetime.now().year
+        building_years = np.asarray(building_years, dtype=np.int64)
+        unit_prices = np.asarray(unit_prices, dtype=np.float64)
+
+        # 只保留有效数据，过滤掉未来年份的脏数据
+        valid = (building_years != 0) & (building_years <= current_year) & (unit_prices > 0)
+        codes, building_years, unit_prices = codes[valid], building_years[valid], unit_prices[valid]
+
+        # 按分段、年份、价格排序后，每组的首尾即最低、最高价
+        order = np.lexsort((unit_prices, building_years, codes))
+        codes, building_years, unit_prices = codes[order], building_years[order], unit_prices[order]
+        boundary = np.ones(len(codes), dtype=bool)
+        boundary[1:] = (codes[1:] != codes[:-1]) | (building_years[1:] != building_years[:-1])
+        starts = np.flatnonzero(boundary)
+        counts = np.diff(np.append(starts, len(codes)))
+        sums = np.add.reduceat(unit_prices, starts) if len(starts) else np.zeros(0)
+        return (codes[starts], building_years[starts], counts, sums,
+                unit_prices[starts], unit_prices[starts + counts - 1])
+
+    @classmethod
+    def build(cls, keys: List[Hashable], group_codes: np.ndarray, group_years: np.ndarray, counts: np.ndarray,
+              sums: np.ndarray, mins: np.ndarray, maxs: np.ndarray) -> Dict[Hashable, 'YearlySeries']:
+        """
+        根据分组结果构建每个分段的年度序列，数据量太少的年份排除
+        """
+        counts = np.asarray(counts, dtype=np.int64)
+        enough = counts >= cls.MIN_HOUSE_COUNT
+        avgs = np.asarray(sums, dtype=np.float64) / np.maximum(counts, 1)
+        result = {}
+        for code, key in enumerate(keys):
+            selected = enough & (group_codes == code)
+            result[key] = cls(group_years[selected], counts[selected], avgs[selected],
+                              maxs[selected], mins[selected])
+        return result
+
+    def complete(self, start_year: int) -> 'YearlySeries':
+        """
+        补齐 start_year 到最大年份之间缺失的年份，缺失年份按整体水平推断
+
+        Args:
+            start_year (int): 开始年份
+
+        Returns:
+            YearlySeries: 年份连续的序列
+        """
+        end_year = int(self.years.max()) if len(self) else start_year
+        positive_counts = self.counts[self.counts > 0]
+        positive_avgs = self.avgs[self.avgs != 0]
+        avg_count = positive_counts.mean() if len(positive_counts) else self.DEFAULT_COUNT
+        avg_price = positive_avgs.mean() if len(positive_avgs) else self.DEFAULT_PRICE
+
+        years = np.arange(start_year, end_year + 1, dtype=np.int64)
+        counts = np.full(len(years), int(avg_count * self.MISSING_COUNT_RATIO), dtype=np.int64)
+        avgs = np.full(len(years), float(avg_price))
+        maxs = avgs * 1.5
+        mins = avgs * 0.5
+
+        present = (self.years >= start_year) & (self.years <= end_year) & (self.counts > 0)
+        positions = self.years[present] - start_year
+        counts[positions] = self.counts[present]
+        avgs[positions] = self.avgs[present]
+        maxs[positions] = self.maxs[present]
+        mins[positions] = self.mins[present]
+        return YearlySeries(years, counts, avgs, maxs, mins)
+
+
+class DetailedDataAggregator(ABC):
+    """
+    房源明细分块聚合器接口
+
+    HouseStatisticsService.aggregate_detailed_data 按块读取 columns 指定的列，依次调用 add_chunk，
+    聚合器只保留聚合状态，内存占用与房源数量无关
+    """
+
+    columns: Tuple[str, ...] = ()
+
+    @abstractmethod
+    def add_chunk(self, rows) -> None:
+        """
+        聚合一块明细行
+
+        Args:
+            rows: 按 columns 顺序的列值元组序列
+        """
+
+    @abstractmethod
+    def result(self):
+        """
+        全部数据块聚合后的结果
+        """
+
+
+class YearlyStatisticsAggregator(DetailedDataAggregator):
+    """
+    按（分段, 建筑年份）累计 count/sum/min/max 的聚合器，结果与一次性 YearlySeries.group 相同
+    """
+
+    def __init__(self, segment_field: str = None, current_year: int = None):
+        self.segment_field = segment_field
+        self.current_year = current_year or datetime.datetime.now().year
+        self.columns = ('building_year', 'unit_price') + ((segment_field,) if segment_field else ())
+        self.row_count = 0
+        # 分段 -> 年份 -> [数量, 单价合计, 最低价, 最高价]
+        self._groups: Dict[Hashable, Dict[int, list]] = {}
+
+    def add_chunk(self, rows) -> None:
+        if self.segment_field:
+            rows = [row for row in rows if row[2]]
+        self.row_count += len(rows)
+        if not rows:
+            return
+        building_years = np.fromiter((row[0] or 0 for row in rows), dtype=np.int64, count=len(rows))
+        unit_prices = np.fromiter((float(row[1] or 0) for row in rows), dtype=np.float64, count=len(rows))
+        segments = [row[2] for row in rows] if self.segment_field else None
+        keys, codes = YearlySeries.encode_segments(segments, len(rows))
+        # 分段没有有效年份时也保留，与 YearlySeries.group 一致
+        for key in keys:
+            self._groups.setdefault(key, {})
+        for code, year, count, total, min_price, max_price in zip(
+                *YearlySeries.group_arrays(building_years, unit_prices, codes, self.current_year)):
+            years = self._groups.setdefault(keys[code], {})
+            stats = years.get(int(year))
+            if stats is None:
+                years[int(year)] = [int(count), float(total), float(min_price), float(max_price)]
+                continue
+            stats[0] += int(count)
+            stats[1] += float(total)
+            stats[2] = min(stats[2], float(min_price))
+            stats[3] = max(stats[3], float(max_price))
+
+    def result(self) -> Dict[Hashable, YearlySeries]:
+        """
+        Returns:
+            Dict[Hashable, YearlySeries]: 分段 -> 年度序列，未指定分段字段时只有分段 None
+        """
+        keys = list(self._groups) if self.segment_field else [None]
+        group_codes, group_years, stats = [], [], []
+        for code, key in enumerate(keys):
+            for year, year_stats in sorted(self._groups.get(key, {}).items()):
+                group_codes.append(code)
+                group_years.append(year)
+                stats.append(year_stats)
+        stats = np.asarray(stats, dtype=np.float64).reshape(-1, 4)
+        return YearlySeries.build(keys, np.asarray(group_codes, dtype=np.int64),
+                                  np.asarray(group_years, dtype=np.int64), stats[:, 0].astype(np.int64),
+                                  stats[:, 1], stats[:, 2], stats[:, 3])
+
+
+class PriceForecast:
+    """
+    单个分段的预测结果，各数组长度为预测年数
+    """
+
+    def __init__(self, years: np.ndarray, volumes: np.ndarray, avgs: np.ndarray,
+                 maxs: np.ndarray, mins: np.ndarray, coefficients: Dict[str, float]):
+        self.years = years
+        self.volumes = volumes
+        self.avgs = avgs
+        self.maxs = maxs
+        self.mins = mins
+        self.coefficients = coefficients
+
+    def __len__(self) -> int:
+        return len(self.years)
+
+
+class PriceForecaster:
+    """
+    房源数量与价格预测（加权线性回归 + 周期扰动）
+
+    多个分段的年度序列左对齐填充为 (分段数, 年数) 矩阵，掩码标记有效位置，
+    权重、回归斜率、增长率与各预测年的结果都按矩阵整体计算
+    """
+
+    MIN_VOLUME_THRESHOLD = 10  # 参与数量权重计算的最小房源数
+    MIN_TREND_YEARS = 5  # 计算长期趋势所需的最少年份数
+    MIN_GROWTH_YEARS = 3  # 计算价格增长率所需的最少年份数
+    VOLUME_TREND_RANGE = (-0.08, 0.05)  # 数量年变化率范围
+    VOLUME_CYCLE = (7, 0.05)  # 数量市场周期（周期年数, 幅度）
+    # 价格类指标：(增长率下限, 增长率上限, 默认增长率, 周期年数, 周期幅度)
+    PRICE_PARAMS = {
+        'avg': (-0.005, 0.05, 0.025, 8, 0.02),  # 平均价：跟随通胀，经济周期
+        'max': (0.005, 0.06, 0.035, 10, 0.03),  # 最高价：略高于通胀，高端市场周期
+        'min': (-0.01, 0.04, 0.02, 5, 0.01),  # 最低价：跟随通胀但略低，政策稳定
+    }
+
+    @classmethod
+    def forecast(cls, series: YearlySeries, predict_years: int) -> Optional[PriceForecast]:
+        """
+        预测单个分段
+
+        Args:
+            series (YearlySeries): 年份连续的年度序列
+            predict_years (int): 预测年数
+
+        Returns:
+            Optional[PriceForecast]: 预测结果，没有数据量充足的年份时为None
+        """
+        return cls.forecast_segments({None: series}, predict_years)[None]
+
+    @classmethod
+    def forecast_segments(cls, series_map: Dict[Hashable, YearlySeries],
+                          predict_years: int) -> Dict[Hashable, Optional[PriceForecast]]:
+        """
+        一次预测多个分段
+
+        Args:
+            series_map (Dict[Hashable, YearlySeries]): 分段 -> 年度序列
+            predict_years (int): 预测年数
+
+        Returns:
+            Dict[Hashable, Optional[PriceForecast]]: 分段 -> 预测结果，
+            序列为空或没有数据量充足的年份时为None
+        """
+        keys = [key for key, series in series_map.items() if len(series)]
+        result = {key: None for key in series_map}
+        if not keys:
+            return result
+
+        width = max(len(series_map[key]) for key in keys)
+        mask = np.zeros((len(keys), width), dtype=bool)
+        years = np.zeros((len(keys), width), dtype=np.int64)
+        volumes = np.zeros((len(keys), width), dtype=np.float64)
+        prices = {name: np.zeros((len(keys), width), dtype=np.float64) for name in cls.PRICE_PARAMS}
+        for row, key in enumerate(keys):
+            series = series_map[key]
+            size = len(series)
+            mask[row, :size] = True
+            years[row, :size] = series.years
+            volumes[row, :size] = series.counts
+            prices['avg'][row, :size] = series.avgs
+            prices['max'][row, :size] = series.maxs
+            prices['min'][row, :size] = series.mins
+
+        current_years = np.where(mask, years, np.iinfo(np.int64).min).max(axis=1)
+        steps = np.arange(1, max(predict_years, 0) + 1)
+        future_years = current_years[:, None] + steps[None, :]
+
+        predicted_volumes, base_volumes, trend_rates, valid = cls._forecast_volumes(
+            years, volumes, mask, current_years, steps, future_years)
+        predicted_prices = {}
+        growth_rates = {}
+        for name, params in cls.PRICE_PARAMS.items():
+            predicted_prices[name], growth_rates[name] = cls._forecast_prices(
+                prices[name], volumes, mask, steps, future_years, *params)
+
+        for row, key in enumerate(keys):
+            if not valid[row]:
+                continue
+            result[key] = PriceForecast(
+                years=future_years[row],
+                volumes=predicted_volumes[row],
+                avgs=predicted_prices['avg'][row],
+                maxs=predicted_prices['max'][row],
+                mins=predicted_prices['min'][row],
+                coefficients={
+                    'base_volume': float(base_volumes[row]),
+                    'volume_trend_rate': float(trend_rates[row]),
+                    'avg_growth_rate': float(growth_rates['avg'][row]),
+                    'max_growth_rate': float(growth_rates['max'][row]),
+                    'min_growth_rate': float(growth_rates['min'][row]),
+                }
+            )
+        return result
+
+    @classmethod
+    def _forecast_volumes(cls, years: np.ndarray, volumes: np.ndarray, mask: np.ndarray,
+                          current_years: np.ndarray, steps: np.ndarray, future_years: np.ndarray):
+        """
+        数量预测：按建筑年代、数据量、时间位置加权的基准数量，
+        乘以线性回归得到的年变化率、新房入市成熟度和市场周期
+        """
+        # 数据量太少的年份不参与权重计算
+        valid = mask & (volumes >= cls.MIN_VOLUME_THRESHOLD)
+        has_valid = valid.any(axis=1)
+
+        ages = current_years[:, None] - years
+        max_ages = np.where(valid, ages, np.iinfo(np.int64).min).max(axis=1)
+        min_ages = np.where(valid, ages, np.iinfo(np.int64).max).min(axis=1)
+        age_ranges = np.where(max_ages > min_ages, max_ages - min_ages, 1)
+        # 建筑年代权重：年龄越大权重越高（1.0 到 2.0）
+        age_weights = 1.0 + (ages - min_ages[:, None]) / age_ranges[:, None] * 1.0
+        # 数据量权重：按数据量级别
+        data_weights = np.select(
+            [volumes >= 2000, volumes >= 1000, volumes >= 500, volumes >= 100],
+            [2.0, 1.6, 1.3, 1.1],
+            default=1.0
+        )
+        # 时间位置权重：越近的年份权重略高
+        recency_weights = 1 + 0.2 * (1 - 1 / (1 + (current_years[:, None] - years) * 0.5))
+        weights = np.where(valid, age_weights * data_weights * recency_weights, 0.0)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            base_volumes = (volumes * weights).sum(axis=1) / weights.sum(axis=1)
+
+        # 长期趋势：全部年份的最小二乘斜率（正规方程，整数年份和数量下求和无舍入误差）
+        counts = mask.sum(axis=1)
+        x = np.where(mask, years, 0).astype(np.float64)
+        y = np.where(mask, volumes, 0.0)
+        denominators = counts * (x * x).sum(axis=1) - x.sum(axis=1) ** 2
+        with np.errstate(divide='ignore', invalid='ignore'):
+            slopes = (counts * (x * y).sum(axis=1) - x.sum(axis=1) * y.sum(axis=1)) / denominators
+            trend_rates = np.where(base_volumes > 0, slopes / base_volumes, 0.0)
+        trend_rates = np.clip(trend_rates, *cls.VOLUME_TREND_RANGE)
+        trend_rates = np.where((counts >= cls.MIN_TREND_YEARS) & (denominators != 0), trend_rates, 0.0)
+
+        trend_predictions = base_volumes[:, None] * (1 + trend_rates[:, None]) ** steps[None, :]
+        # 新房进入二手市场的成熟度
+        maturity_factors = np.select(
+            [steps <= 1, steps <= 3, steps <= 8],
+            [0.5, 0.7 + (steps - 1) * 0.15, 0.9 + (steps - 3) * 0.025],
+            default=1.0
+        )
+        period, amplitude = cls.VOLUME_CYCLE
+        cycle_factors = cls._cycle_factors(future_years, period, amplitude)
+        predictions = trend_predictions * maturity_factors[None, :] * cycle_factors
+
+        # 约束在基准的 10%（至少10套）到 3 倍之间
+        min_volumes = np.maximum(10, base_volumes * 0.1)
+        max_volumes = base_volumes * 3.0
+        predictions = np.maximum(min_volumes[:, None], np.minimum(predictions, max_volumes[:, None]))
+        return predictions, base_volumes, trend_rates, has_valid
+
+    @classmethod
+    def _forecast_prices(cls, prices: np.ndarray, volumes: np.ndarray, mask: np.ndarray, steps: np.ndarray,
+                         future_years: np.ndarray, min_growth: float, max_growth: float,
+                         default_growth: float, period: int, amplitude: float):
+        """
+        价格预测：按数量加权的基准价格，乘以历史平均增长率和周期扰动
+        """
+        counts = mask.sum(axis=1)
+        total_volumes = np.where(mask, volumes, 0.0).sum(axis=1)
+        last_prices = prices[np.arange(len(prices)), counts - 1]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            weighted_prices = np.where(
+                total_volumes > 0,
+                np.where(mask, prices * volumes, 0.0).sum(axis=1) / total_volumes,
+                last_prices
+            )
+
+        # 相邻年份的增长率（上一年价格为正时才计算）
+        previous = prices[:, :-1]
+        pairs = mask[:, 1:] & mask[:, :-1] & (previous > 0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            growth = np.where(pairs, (prices[:, 1:] - previous) / previous, 0.0)
+        pair_counts = pairs.sum(axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            growth_rates = np.clip(growth.sum(axis=1) / pair_counts, min_growth, max_growth)
+        growth_rates = np.where((counts >= cls.MIN_GROWTH_YEARS) & (pair_counts > 0), growth_rates, default_growth)
+
+        trend_prices = weighted_prices[:, None] * (1 + growth_rates[:, None]) ** steps[None, :]
+        return trend_prices * cls._cycle_factors(future_years, period, amplitude), growth_rates
+
+    @staticmethod
+    def _cycle_factors(future_years: np.ndarray, period: int, amplitude: float) -> np.ndarray:
+        """
+        周期扰动因子，周期中点最高为 1 + amplitude
+        """
+        return 1 + amplitude * (0.5 - np.abs((future_years % period) / float(period) - 0.5)) * 2
+
+    @classmethod
+    def forecast_partitioned(cls, building_years: np.ndarray, unit_prices: np.ndarray, segments: Sequence[Hashable],
+                             keys: List[Hashable], start_year: int, predict_years: int, max_workers: int = 1,
+                             current_year: int = None) -> Dict[Hashable, Tuple[YearlySeries, Optional[PriceForecast]]]:
+        """
+        按分段并行预测：分段按房源数均衡地分给多个进程，每个进程只分组、预测自己的分段
+
+        max_workers大于1且系统支持fork时在进程池中计算，子进程直接继承父进程的明细数组（写时复制），
+        无需序列化传输，只回传每个分段的年度序列和预测结果
+
+        Args:
+            building_years (np.ndarray): 建筑年份
+            unit_prices (np.ndarray): 单价
+            segments (Sequence[Hashable]): 每行所属分段
+            keys (List[Hashable]): 需要预测的分段，不在其中的行忽略
+            start_year (int): 开始年份
+            predict_years (int): 预测年数
+            max_workers (int): 进程数
+            current_year (int): 当前年份
+
+        Returns:
+            Dict[Hashable, Tuple[YearlySeries, Optional[PriceForecast]]]: 分段 -> (补齐后的年度序列, 预测结果)
+        """
+        current_year = current_year or datetime.datetime.now().year
+        index = {key: code for code, key in enumerate(keys)}
+        codes = np.fromiter((index.get(segment, -1) for segment in segments), dtype=np.int64, count=len(segments))
+
+        # 按房源数从多到少轮流分配，使每个进程的数据量接近
+        sizes = np.bincount(codes[codes >= 0], minlength=len(keys))
+        partitions = [part for part in (np.argsort(-sizes, kind='stable')[offset::max(max_workers, 1)]
+                                        for offset in range(max(max_workers, 1))) if len(part)]
+
+        global _partition_data
+        _partition_data = (np.asarray(building_years, dtype=np.int64), np.asarray(unit_prices, dtype=np.float64),
+                           codes, list(keys))
+        try:
+            if max_workers > 1 and len(partitions) > 1 and 'fork' in multiprocessing.get_all_start_methods():
+                with ProcessPoolExecutor(max_workers=len(partitions),
+                                         mp_context=multiprocessing.get_context('fork')) as pool:
+                    results = list(pool.map(_forecast_partition, partitions, repeat(start_year),
+                                            repeat(predict_years), repeat(current_year)))
+            else:
+                results = [_forecast_partition(part, start_year, predict_years, current_year) for part in partitions]
+        finally:
+            _partition_data = None
+
+        merged = {}
+        for result in results:
+            merged.update(result)
+        return {key: merged[key] for key in keys}
+
+
+# 分段并行预测子进程使用的 (建筑年份, 单价, 分段编码, 分段值)（fork时由父进程继承）
+_partition_data: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray, List[Hashable]]] = None
+
+
+def _forecast_partition(partition: np.ndarray, start_year: int, predict_years: int,
+                        current_year: int) -> Dict[Hashable, Tuple[YearlySeries, Optional[PriceForecast]]]:
+    """
+    分组并预测一部分分段
+
+    Args:
+        partition (np.ndarray): 分段编码
+        start_year (int): 开始年份
+        predict_years (int): 预测年数
+        current_year (int): 当前年份
+
+    Returns:
+        Dict[Hashable, Tuple[YearlySeries, Optional[PriceForecast]]]: 分段 -> (补齐后的年度序列, 预测结果)
+    """
+    building_years, unit_prices, codes, keys = _partition_data
+    # 全局分段编码映射为本分区内的编码
+    local_codes = np.full(len(keys) + 1, -1, dtype=np.int64)
+    local_codes[partition] = np.arange(len(partition))
+    local = local_codes[codes]
+    selected = local >= 0
+    part_keys = [keys[code] for code in partition]
+    series_map = YearlySeries.build(part_keys, *YearlySeries.group_arrays(
+        building_years[selected], unit_prices[selected], local[selected], current_year))
+    series_map = {key: series.complete(start_year) for key, series in series_map.items()}
+    forecasts = PriceForecaster.forecast_segments(series_map, predict_years)
+    return {key: (series_map[key], forecasts[key]) for key in part_keys}
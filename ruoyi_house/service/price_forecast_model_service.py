@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+# @Author  : YY
+# @FileName: price_forecast_model_service.py
+# @Time    : 2026-01-10 17:29:50
+
+import hashlib
+import json
+import time
+from typing import Dict, List, Optional
+
+from ruoyi_admin.ext import redis_cache
+from ruoyi_common.utils.base import DateUtil, LogUtil
+from ruoyi_house.domain.statistics.vo import PriceForecastModelVo, StatisticsVo
+from ruoyi_house.service.house_data_version_service import HouseDataVersionService
+from ruoyi_house.service.price_forecast import PriceForecast, YearlySeries
+
+
+class PriceForecastModelService:
+    """
+    价格预测模型存储
+
+    按过滤条件保存拟合结果（模型系数、年度聚合数据和预测结果）及构建时的房源数据版本，
+    数据版本和预测配置不变时直接返回保存的结果，不再重新读取数据和拟合
+    """
+
+    MODEL_KEY_PREFIX = "statistics:forecast:model:"
+    MODEL_EXPIRE_TIME = 7 * 24 * 60 * 60  # 模型保存时间（秒），长期未访问的过滤条件自动清理
+    SEGMENT_FIELDS = ('town', 'community', 'house_type', 'orientation', 'decoration_type', 'tags')
+    SCAN_COUNT = 500
+
+    @classmethod
+    def segment_of(cls, statistics_entity) -> Dict[str, str]:
+        """
+        查询条件中生效的过滤字段
+        """
+        segment = {}
+        for field in cls.SEGMENT_FIELDS:
+            value = getattr(statistics_entity, field, None)
+            if value:
+                segment[field] = str(value)
+        return segment
+
+    @classmethod
+    def segment_key(cls, segment: Dict[str, str]) -> str:
+        """
+        过滤条件对应的模型编号
+        """
+        content = json.dumps(segment, ensure_ascii=False, sort_keys=True)
+        return hashlib.sha1(content.encode('utf-8')).hexdigest()
+
+    @classmethod
+    def select_result(cls, segment: Dict[str, str], start_year: int, predict_year: int,
+                      data_version: Optional[int]) -> Optional[List[StatisticsVo]]:
+        """
+        获取与当前数据版本、预测配置一致的已保存预测结果
+
+        Returns:
+            Optional[List[StatisticsVo]]: 历史数据 + 预测数据，没有可用模型时返回None
+        """
+        if data_version is None:
+            return None
+        try:
+            value = redis_cache.get(cls.MODEL_KEY_PREFIX + cls.segment_key(segment))
+        except Exception as e:
+            LogUtil.logger.error(f"[价格预测模型] 读取模型失败: {str(e)}")
+            return None
+        if not value:
+            return None
+        model = json.loads(value)
+        if (model.get('dataVersion') != data_version or model.get('startYear') != start_year
+                or model.get('predictYear') != predict_year):
+            return None
+        return [StatisticsVo(**item) for item in model.get('result', [])]
+
+    @classmethod
+    def save(cls, segment: Dict[str, str], start_year: int, predict_year: int, data_version: Optional[int],
+             series: YearlySeries, forecast: PriceForecast, result: List[StatisticsVo], build_start: float) -> None:
+        """
+        保存拟合结果
+
+        Args:
+            segment (Dict[str, str]): 过滤条件
+            start_year (int): 开始年份
+            predict_year (int): 预测年数
+            data_version (int): 读取数据前的房源数据版本
+            series (YearlySeries): 年度聚合数据
+            forecast (PriceForecast): 预测结果
+            result (List[StatisticsVo]): 返回给前端的历史数据 + 预测数据
+            build_start (float): 构建开始时间（time.perf_counter）
+        """
+        if data_version is None:
+            return
+        model = {
+            'segment': segment,
+            'startYear': start_year,
+            'predictYear': predict_year,
+            'dataVersion': data_version,
+            'buildTime': DateUtil.get_datetime_now(DateUtil.YYYY_MM_DD_HH_MM_SS),
+            'buildCost': round((time.perf_counter() - build_start) * 1000, 1),
+            'coefficients': forecast.coefficients,
+            'yearly': [
+                [int(year), int(count), float(avg), float(max_price), float(min_price)]
+                for year, count, avg, max_price, min_price in zip(
+                    series.years, series.counts, series.avgs, series.maxs, series.mins)
+            ],
+            'result': [vo.model_dump() for vo in result],
+        }
+        try:
+            redis_cache.set(cls.MODEL_KEY_PREFIX + cls.segment_key(segment), json.dumps(model, ensure_ascii=False),
+                            ex=cls.MODEL_EXPIRE_TIME)
+        except Exception as e:
+            LogUtil.logger.error(f"[价格预测模型] 保存模型失败: {str(e)}")
+
+    @classmethod
+    def select_models(cls) -> List[PriceForecastModelVo]:
+        """
+        获取已保存的预测模型列表（按构建时间倒序）
+        """
+        data_version = HouseDataVersionService.get_version()
+        models = []
+        for key in redis_cache.scan_iter(match=cls.MODEL_KEY_PREFIX + "*", count=cls.SCAN_COUNT):
+            value = redis_cache.get(key)
+            if not value:
+                continue
+            key = key.decode('utf-8') if isinstance(key, bytes) else str(key)
+            model = json.loads(value)
+            models.append(PriceForecastModelVo(
+                segment_key=key[len(cls.MODEL_KEY_PREFIX):],
+                segment=model.get('segment', {}),
+                start_year=model.get('startYear'),
+                predict_year=model.get('predictYear'),
+                data_version=model.get('dataVersion'),
+                current=model.get('dataVersion') == data_version,
+                build_time=model.get('buildTime'),
+                build_cost=model.get('buildCost'),
+                history_years=len(model.get('yearly', [])),
+                coefficients=model.get('coefficients', {}),
+            ))
+        models.sort(key=lambda model: model.build_time or '', reverse=True)
+        return models
@@ -0,0 +1,365 @@
+# -*- coding: utf-8 -*-
+# @Author  : YY
+# @FileName: recommend_engine.py
+# @Time    : 2026-01-10 17:29:50
+
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from ruoyi_common.utils.base import LogUtil
+from ruoyi_house.mapper.house_mapper import HouseMapper
+
+
+class HouseFeatureMatrix:
+    """
+    房源特征矩阵
+
+    将房源目录编码为稠密矩阵：镇、户型、朝向为one-hot编码，标签为关联矩阵，
+    列依次为 [镇 | 户型 | 朝向 | 标签]
+    """
+
+    DIMENSIONS = ('town', 'house_type', 'orientation', 'tags')
+
+    def __init__(self, house_ids: List[str], vocabularies: Dict[str, Dict[str, int]], matrix: np.ndarray):
+        self.house_ids = np.asarray(house_ids, dtype=object)
+        self.vocabularies = vocabularies
+        self.matrix = matrix
+        # 每个维度在矩阵中的列偏移
+        self.offsets = {}
+        offset = 0
+        for dimension in self.DIMENSIONS:
+            self.offsets[dimension] = offset
+            offset += len(vocabularies[dimension])
+        self.build_time = time.time()
+
+    @property
+    def size(self) -> int:
+        return len(self.house_ids)
+
+    @property
+    def tag_slice(self) -> slice:
+        start = self.offsets['tags']
+        return slice(start, start + len(self.vocabularies['tags']))
+
+    @classmethod
+    def from_rows(cls, rows) -> 'HouseFeatureMatrix':
+        """
+        根据房源特征行构建特征矩阵
+
+        Args:
+            rows: (house_id, town, house_type, orientation, tags) 元组序列
+
+        Returns:
+            HouseFeatureMatrix: 特征矩阵
+        """
+        house_ids = []
+        vocabularies = {dimension: {} for dimension in cls.DIMENSIONS}
+        # 先收集每行的编码，再一次性写入矩阵
+        encoded_rows = []
+        for house_id, town, house_type, orientation, tags in rows:
+            house_ids.append(house_id)
+            codes = []
+            for dimension, value in (('town', town), ('house_type', house_type), ('orientation', orientation)):
+                if value:
+                    codes.append(vocabularies[dimension].setdefault(value, len(vocabularies[dimension])))
+                else:
+                    codes.append(-1)
+            tag_codes = set()
+            if tags:
+                for tag in tags.split(';'):
+                    tag = tag.strip()
+                    if tag:
+                        tag_codes.add(vocabularies['tags'].setdefault(tag, len(vocabularies['tags'])))
+            encoded_rows.append((codes, tag_codes))
+
+        width = sum(len(vocabularies[dimension]) for dimension in cls.DIMENSIONS)
+        matrix = np.zeros((len(house_ids), width), dtype=np.float32)
+        feature_matrix = cls(house_ids, vocabularies, matrix)
+        offsets = [feature_matrix.offsets[dimension] for dimension in cls.DIMENSIONS]
+        for row_index, (codes, tag_codes) in enumerate(encoded_rows):
+            for offset, code in zip(offsets[:3], codes):
+                if code >= 0:
+                    matrix[row_index, offset + code] = 1.0
+            for code in tag_codes:
+                matrix[row_index, offsets[3] + code] = 1.0
+        return feature_matrix
+
+
+class RecommendEngine:
+    """
+    向量化推荐评分引擎
+
+    房源目录按进程缓存为特征矩阵，用户偏好编码为加权向量后，
+    通过一次矩阵乘法对全部房源评分，再用argpartition取Top N
+    """
+
+    CATALOG_TTL = 300  # 特征矩阵缓存时间（秒）
+    MIN_SCORE = 0.1  # 最低得分，与逐个评分保持一致
+
+    _catalog: Optional[HouseFeatureMatrix] = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def get_catalog(cls) -> Optional[HouseFeatureMatrix]:
+        """
+        获取房源特征矩阵（过期或失效后重新构建）
+
+        Returns:
+            HouseFeatureMatrix: 特征矩阵，没有房源时返回None
+        """
+        catalog = cls._catalog
+        if catalog is not None and time.time() - catalog.build_time < cls.CATALOG_TTL:
+            return catalog
+        with cls._lock:
+            catalog = cls._catalog
+            if catalog is not None and time.time() - catalog.build_time < cls.CATALOG_TTL:
+                return catalog
+            start = time.perf_counter()
+            rows = HouseMapper.select_house_feature_rows()
+            if not rows:
+                return None
+            catalog = HouseFeatureMatrix.from_rows(rows)
+            cls._catalog = catalog
+            LogUtil.logger.info(
+                f"[推荐引擎] 构建房源特征矩阵完成: {catalog.matrix.shape}, "
+                f"耗时{(time.perf_counter() - start) * 1000:.1f}ms")
+            return catalog
+
+    @classmethod
+    def invalidate(cls) -> None:
+        """
+        使房源特征矩阵失效，下次评分时重新构建
+        """
+        cls._catalog = None
+
+    @classmethod
+    def build_preference_matrix(cls, catalog: HouseFeatureMatrix, user_preferences: Dict,
+                                weights: Dict) -> np.ndarray:
+        """
+        将用户偏好编码为评分矩阵
+
+        第0列为各维度偏好乘以权重，第1列为标签命中指示，用于计算标签组合奖励
+
+        Args:
+            catalog (HouseFeatureMatrix): 特征矩阵
+            user_preferences (Dict): 用户偏好向量
+            weights (Dict): 维度权重
+
+        Returns:
+            np.ndarray: (特征数, 2) 的评分矩阵
+        """
+        preference_matrix = np.zeros((catalog.matrix.shape[1], 2), dtype=np.float32)
+        for dimension in HouseFeatureMatrix.DIMENSIONS:
+            vocabulary = catalog.vocabularies[dimension]
+            offset = catalog.offsets[dimension]
+            for name, score in (user_preferences.get(dimension) or {}).items():
+                code = vocabulary.get(name)
+                if code is None:
+                    continue
+                preference_matrix[offset + code, 0] = score * weights[dimension]
+                if dimension == 'tags':
+                    preference_matrix[offset + code, 1] = 1.0
+        return preference_matrix
+
+    @classmethod
+    def score(cls, catalog: HouseFeatureMatrix, user_preferences: Dict, weights: Dict,
+              tag_combination_bonus: float, candidates: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        计算房源得分
+
+        Args:
+            catalog (HouseFeatureMatrix): 特征矩阵
+            user_preferences (Dict): 用户偏好向量
+            weights (Dict): 维度权重
+            tag_combination_bonus (float): 标签组合奖励倍数
+            candidates (np.ndarray): 候选房源行号，为空时对全部房源评分
+
+        Returns:
+            np.ndarray: 房源得分
+        """
+        matrix = catalog.matrix if candidates is None else catalog.matrix[candidates]
+        product = matrix @ cls.build_preference_matrix(catalog, user_preferences, weights)
+        scores = product[:, 0]
+        # 匹配的标签数量超过1个时，每个额外标签给予固定奖励分
+        scores += np.maximum(product[:, 1] - 1.0, 0.0) * (tag_combination_bonus * weights['tags'])
+        return np.maximum(scores, cls.MIN_SCORE)
+
+    @classmethod
+    def top_k(cls, scores: np.ndarray, k: int) -> np.ndarray:
+        """
+        取得分最高的k个下标（降序，同分按原顺序）
+
+        Args:
+            scores (np.ndarray): 得分
+            k (int): 数量
+
+        Returns:
+            np.ndarray: 下标数组
+        """
+        return top_k_indices(scores, k)
+
+    @classmethod
+    def rank(cls, user_preferences: Dict, weights: Dict, tag_combination_bonus: float,
+             top_n: int) -> Optional[List[str]]:
+        """
+        对全部房源评分并返回Top N房源ID
+
+        Args:
+            user_preferences (Dict): 用户偏好向量
+            weights (Dict): 维度权重
+            tag_combination_bonus (float): 标签组合奖励倍数
+            top_n (int): 返回数量
+
+        Returns:
+            List[str]: 推荐房源ID列表，特征矩阵不可用时返回None
+        """
+        catalog = cls.get_catalog()
+        if catalog is None:
+            return None
+        start = time.perf_counter()
+        scores = cls.score(catalog, user_preferences, weights, tag_combination_bonus)
+        indices = cls.top_k(scores, top_n)
+        LogUtil.logger.info(
+            f"[推荐引擎] 对{catalog.size}个房源评分完成，耗时{(time.perf_counter() - start) * 1000:.1f}ms")
+        return catalog.house_ids[indices].tolist()
+
+    @classmethod
+    def similarity_scores(cls, catalog: HouseFeatureMatrix, rows: np.ndarray, weights: Dict,
+                          tag_combination_bonus: float) -> np.ndarray:
+        """
+        计算指定房源与全部房源的相似度得分
+
+        以源房源的每个属性作为偏好值1的偏好向量，按推荐权重和标签组合奖励评分，
+        得分是对称的：A对B的得分等于B对A的得分。源房源自身的得分置为-1
+
+        Args:
+            catalog (HouseFeatureMatrix): 特征矩阵
+            rows (np.ndarray): 源房源行号
+            weights (Dict): 维度权重
+            tag_combination_bonus (float): 标签组合奖励倍数
+
+        Returns:
+            np.ndarray: (房源数, 源房源数) 的得分矩阵
+        """
+        column_weights = np.zeros(catalog.matrix.shape[1], dtype=np.float32)
+        for dimension in HouseFeatureMatrix.DIMENSIONS:
+            offset = catalog.offsets[dimension]
+            column_weights[offset:offset + len(catalog.vocabularies[dimension])] = weights[dimension]
+        source = catalog.matrix[rows]
+        tag_slice = catalog.tag_slice
+        scores = catalog.matrix @ (source * column_weights).T
+        matched = catalog.matrix[:, tag_slice] @ source[:, tag_slice].T
+        scores += np.maximum(matched - 1.0, 0.0) * (tag_combination_bonus * weights['tags'])
+        scores[rows, np.arange(len(rows))] = -1.0
+        return scores
+
+    @classmethod
+    def rank_batch(cls, preferences_list: List[Dict], weights: Dict, tag_combination_bonus: float, top_n: int,
+                   chunk_size: int = 64, max_workers: int = 1) -> Optional[List[List[str]]]:
+        """
+        批量对多个用户评分，每个分块的用户偏好拼成一个矩阵，与特征矩阵做一次矩阵乘法
+
+        max_workers大于1且系统支持fork时，分块在进程池中并行计算，
+        子进程直接继承特征矩阵，无需序列化传输
+
+        Args:
+            preferences_list (List[Dict]): 用户偏好向量列表
+            weights (Dict): 维度权重
+            tag_combination_bonus (float): 标签组合奖励倍数
+            top_n (int): 每个用户返回数量
+            chunk_size (int): 每个分块的用户数
+            max_workers (int): 进程数
+
+        Returns:
+            List[List[str]]: 与输入顺序一致的推荐房源ID列表，特征矩阵不可用时返回None
+        """
+        catalog = cls.get_catalog()
+        if catalog is None:
+            return None
+        if not preferences_list:
+            return []
+        start = time.perf_counter()
+        chunk_size = max(chunk_size, 1)
+        tensors = []
+        for offset in range(0, len(preferences_list), chunk_size):
+            chunk = preferences_list[offset:offset + chunk_size]
+            tensors.append(np.concatenate(
+                [cls.build_preference_matrix(catalog, preferences, weights) for preferences in chunk], axis=1))
+        tag_bonus = tag_combination_bonus * weights['tags']
+
+        global _batch_matrix
+        if max_workers > 1 and len(tensors) > 1 and 'fork' in multiprocessing.get_all_start_methods():
+            _batch_matrix = catalog.matrix
+            try:
+                with ProcessPoolExecutor(max_workers=min(max_workers, len(tensors)),
+                                         mp_context=multiprocessing.get_context('fork')) as pool:
+                    results = list(pool.map(_score_batch_in_worker, tensors, repeat(tag_bonus),
+                                            repeat(cls.MIN_SCORE), repeat(top_n)))
+            finally:
+                _batch_matrix = None
+        else:
+            results = [score_batch(catalog.matrix, tensor, tag_bonus, cls.MIN_SCORE, top_n) for tensor in tensors]
+
+        ranked = [catalog.house_ids[indices].tolist() for chunk in results for indices in chunk]
+        LogUtil.logger.info(
+            f"[推荐引擎] 批量对{len(ranked)}个用户、{catalog.size}个房源评分完成，"
+            f"耗时{(time.perf_counter() - start) * 1000:.1f}ms")
+        return ranked
+
+
+# 批量评分子进程使用的特征矩阵（fork时由父进程继承）
+_batch_matrix: Optional[np.ndarray] = None
+
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    取得分最高的k个下标（降序，同分按原顺序）
+
+    Args:
+        scores (np.ndarray): 得分
+        k (int): 数量
+
+    Returns:
+        np.ndarray: 下标数组
+    """
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    if k < len(scores):
+        indices = np.argpartition(-scores, k - 1)[:k]
+    else:
+        indices = np.arange(len(scores))
+    order = np.lexsort((indices, -scores[indices]))
+    return indices[order]
+
+
+def score_batch(matrix: np.ndarray, preference_tensor: np.ndarray, tag_bonus: float, min_score: float,
+                top_n: int) -> List[np.ndarray]:
+    """
+    一次矩阵乘法对一组用户评分并取Top N
+
+    Args:
+        matrix (np.ndarray): 房源特征矩阵
+        preference_tensor (np.ndarray): (特征数, 2*用户数) 的偏好矩阵，每个用户占两列
+        tag_bonus (float): 每个额外匹配标签的奖励分（已乘标签权重）
+        min_score (float): 最低得分
+        top_n (int): 每个用户返回数量
+
+    Returns:
+        List[np.ndarray]: 每个用户的房源下标数组
+    """
+    product = matrix @ preference_tensor
+    scores = product[:, 0::2] + np.maximum(product[:, 1::2] - 1.0, 0.0) * tag_bonus
+    np.maximum(scores, min_score, out=scores)
+    return [top_k_indices(scores[:, column], top_n) for column in range(scores.shape[1])]
+
+
+def _score_batch_in_worker(preference_tensor: np.ndarray, tag_bonus: float, min_score: float,
+                           top_n: int) -> List[np.ndarray]:
+    return score_batch(_batch_matrix, preference_tensor, tag_bonus, min_score, top_n)
@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+# @Author  : YY
+# @FileName: recommend_queue.py
+# @Time    : 2026-01-10 17:29:50
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+
+from flask import Flask, current_app
+
+from ruoyi_common.utils.base import LogUtil
+
+
+class RecommendGenerationQueue:
+    """
+    推荐生成后台队列
+
+    按用户ID去重：同一用户排队或执行中的任务只保留一个，
+    任务结束后进入冷却期，冷却期内不再重复生成。任务在有界线程池中执行。
+    """
+
+    MAX_WORKERS = 4  # 工作线程数
+    MAX_PENDING = 200  # 最多同时排队/执行的任务数
+    COOLDOWN_SECONDS = 60  # 同一用户两次生成的最小间隔（秒）
+    LATENCY_WINDOW = 200  # 统计耗时的最近任务数
+
+    _lock = threading.Lock()
+    _executor: Optional[ThreadPoolExecutor] = None
+    # 用户ID -> 排队或执行中的任务
+    _pending: Dict[int, Future] = {}
+    # 用户ID -> 最近一次任务结束时间（按结束时间先后插入）
+    _finished_at: Dict[int, float] = {}
+    _latencies = deque(maxlen=LATENCY_WINDOW)
+    _counters = {
+        'submitted': 0,
+        'deduplicated': 0,
+        'cooldownSkipped': 0,
+        'rejected': 0,
+        'completed': 0,
+        'failed': 0,
+    }
+
+    @classmethod
+    def submit(cls, user_id: int, runner: Callable, *args) -> Optional[Future]:
+        """
+        提交用户推荐生成任务
+
+        Args:
+            user_id (int): 用户ID
+            runner (Callable): 任务函数，第一个参数为Flask应用
+            *args: 任务函数参数
+
+        Returns:
+            Optional[Future]: 任务Future，冷却期内或队列已满时返回None
+        """
+        app = current_app._get_current_object()
+        with cls._lock:
+            future = cls._pending.get(user_id)
+            if future is not None:
+                cls._counters['deduplicated'] += 1
+                return future
+            finished_at = cls._finished_at.get(user_id)
+            if finished_at is not None and time.time() - finished_at < cls.COOLDOWN_SECONDS:
+                cls._counters['cooldownSkipped'] += 1
+                return None
+            if len(cls._pending) >= cls.MAX_PENDING:
+                cls._counters['rejected'] += 1
+                LogUtil.logger.warning(f"[推荐队列] 队列已满，跳过用户{user_id}的推荐生成")
+                return None
+            if cls._executor is None:
+                cls._executor = ThreadPoolExecutor(max_workers=cls.MAX_WORKERS,
+                                                   thread_name_prefix='recommend-pool')
+            future = cls._executor.submit(cls._run, app, user_id, time.time(), runner, *args)
+            cls._pending[user_id] = future
+            cls._counters['submitted'] += 1
+            return future
+
+    @classmethod
+    def _run(cls, app: Flask, user_id: int, submit_time: float, runner: Callable, *args):
+        """
+        执行任务并记录统计
+        """
+        start = time.time()
+        success = False
+        try:
+            result = runner(app, *args)
+            success = True
+            return result
+        except Exception as e:
+            LogUtil.logger.error(f"[推荐队列] 用户{user_id}推荐生成失败: {str(e)}")
+        finally:
+            end = time.time()
+            with cls._lock:
+                cls._pending.pop(user_id, None)
+                # 先删除再插入，保持字典按结束时间排序
+                cls._finished_at.pop(user_id, None)
+                cls._finished_at[user_id] = end
+                cls._prune_finished(end)
+                cls._counters['completed' if success else 'failed'] += 1
+                cls._latencies.append((start - submit_time, end - start))
+
+    @classmethod
+    def stats(cls) -> Dict:
+        """
+        队列统计信息
+
+        Returns:
+            Dict: 计数、队列深度和耗时统计（毫秒）
+        """
+        with cls._lock:
+            counters = dict(cls._counters)
+            pending = len(cls._pending)
+            latencies = list(cls._latencies)
+            cls._prune_finished(time.time())
+            cooling = len(cls._finished_at)
+        queued = cls._executor._work_queue.qsize() if cls._executor is not None else 0
+        wait_times = sorted(wait for wait, _ in latencies)
+        run_times = sorted(run for _, run in latencies)
+        return {
+            **counters,
+            'pending': pending,
+            'queued': queued,
+            'running': pending - queued if pending > queued else 0,
+            'coolingUsers': cooling,
+            'maxWorkers': cls.MAX_WORKERS,
+            'maxPending': cls.MAX_PENDING,
+            'cooldownSeconds': cls.COOLDOWN_SECONDS,
+            'waitTime': cls._summarize(wait_times),
+            'runTime': cls._summarize(run_times),
+        }
+
+    @classmethod
+    def _prune_finished(cls, now: float) -> None:
+        """
+        清理已过冷却期的结束记录（调用方持有锁），记录按结束时间排序，从最早的开始清理
+        """
+        expired = []
+        for user_id, finished_at in cls._finished_at.items():
+            if now - finished_at < cls.COOLDOWN_SECONDS:
+                break
+            expired.append(user_id)
+        for user_id in expired:
+            del cls._finished_at[user_id]
+
+    @staticmethod
+    def _summarize(values) -> Dict:
+        if not values:
+            return {'count': 0, 'avg': 0.0, 'p95': 0.0, 'max': 0.0}
+        p95 = values[min(len(values) - 1, int(len(values) * 0.95))]
+        return {
+            'count': len(values),
+            'avg': round(sum(values) / len(values) * 1000, 2),
+            'p95': round(p95 * 1000, 2),
+            'max': round(values[-1] * 1000, 2),
+        }
@@ -4,18 +4,28 @@
 # @Time    : 2026-01-10 17:29:50
 
 import json
-from datetime import datetime
+from concurrent.futures import Future
+from datetime import datetime, timedelta
 from typing import List, Optional, Dict, Tuple
 
+from flask import Flask
+
 from ruoyi_common.exception import ServiceException
 from ruoyi_common.utils.base import LogUtil
 from ruoyi_common.utils.security_util import get_username
+from ruoyi_framework.asyncsched.manager import TaskManager
 from ruoyi_framework.descriptor.datascope import DataScope
 from ruoyi_house.domain.entity import Recommend, House, Like, View
-from ruoyi_house.mapper import LikeMapper, ViewMapper
+from ruoyi_house.mapper import HouseCandidateIndex, LikeMapper, ViewMapper
 from ruoyi_house.mapper.house_mapper import HouseMapper
 from ruoyi_house.mapper.recommend_mapper import RecommendMapper
 from ruoyi_house.service import HouseService
+from ruoyi_house.service.behavior_counter_service import BehaviorCounterService
+from ruoyi_house.service.item_cooccurrence_service import ItemCooccurrenceService
+from ruoyi_house.service.recommend_engine import RecommendEngine
+from ruoyi_house.service.recommend_queue import RecommendGenerationQueue
+from ruoyi_house.service.recommend_store import RecommendRedisStore
+from ruoyi_house.service.user_preference_service import UserPreferenceService
 
 class RecommendService:
     """用户推荐服务类"""
@@ -37,11 +47,15 @@ class RecommendService:
     # 推荐配置
     MAX_RECOMMENDATIONS = 1000  # 最大推荐数量
     TAG_COMBINATION_BONUS = 1.5  # 标签组合奖励倍数
+    FIRST_GENERATION_WAIT_SECONDS = 5  # 没有历史推荐时等待后台生成的时间（秒）
+    ITEM_COOCCURRENCE_LIMIT = 100  # 共现模型推荐的最大房源数（排在属性推荐之前）
+    # 推荐存储方式：redis（有序集合分页 + 数据库异步快照）或 table（每次生成新增一条记录）
+    STORAGE_MODE = 'redis'
 
     @classmethod
     def generate_recommendations(cls, user_id: int, top_n: int = 10) -> List[str]:
         """
-        生成用户推荐房源列表（优化版本，避免全表查询）
+        生成用户推荐房源列表（基于特征矩阵对全部房源评分）
 
         Args:
             user_id (int): 用户ID
@@ -51,34 +65,232 @@ class RecommendService:
             List[str]: 推荐房源ID列表
         """
         try:
-            # 1. 获取用户的喜欢和浏览记录
-            user_behaviors = cls._get_user_behaviors(user_id)
-            if not user_behaviors:
+            # 读取用户偏好向量
+            user_preferences = cls._load_user_preferences(user_id)
+            if not any(user_preferences.values()):
                 LogUtil.logger.info(f"用户{user_id}没有行为记录，无法生成推荐")
                 return []
 
-            # 2. 计算用户偏好向量
-            user_preferences = cls._calculate_user_preferences(user_behaviors)
+            recommendations = cls._rank_houses(user_preferences, [], top_n)
+            return cls._blend_item_cooccurrence(user_id, user_preferences, recommendations, top_n)
 
-            # 3. 智能采样房源进行评分（避免全表查询）
-            sampled_houses = cls._sample_houses_for_scoring(user_preferences, top_n * 10)  # 采样更多用于排序
-            LogUtil.logger.info(f"[推荐算法] 对{len(sampled_houses)}个采样房源进行评分计算")
+        except Exception as e:
+            LogUtil.logger.error(f"生成用户{user_id}推荐失败: {str(e)}")
+            raise ServiceException(f"生成推荐失败: {str(e)}")
 
-            house_scores = cls._calculate_house_scores(sampled_houses, user_preferences, user_behaviors)
-            LogUtil.logger.info(f"[推荐算法] 计算出{len(house_scores)}个房源得分")
+    @classmethod
+    def _rank_houses(cls, user_preferences: Dict, user_behaviors: List[Dict], top_n: int) -> List[str]:
+        """
+        根据用户偏好对房源评分排序
 
-            # 4. 直接排序并返回Top N（不过滤已交互房源）
-            recommended_houses = cls._sort_houses_by_score(house_scores, top_n)
-            LogUtil.logger.info(f"[推荐算法] 最终生成{len(recommended_houses)}个推荐房源")
+        Args:
+            user_preferences (Dict): 用户偏好向量
+            user_behaviors (List[Dict]): 用户行为记录
+            top_n (int): 返回推荐房源数量
 
+        Returns:
+            List[str]: 推荐房源ID列表
+        """
+        # 使用特征矩阵对全部房源进行向量化评分
+        recommended_houses = RecommendEngine.rank(user_preferences, cls.WEIGHTS, cls.TAG_COMBINATION_BONUS,
+                                                  top_n)
+        if recommended_houses is not None:
+            LogUtil.logger.info(f"[推荐算法] 最终生成{len(recommended_houses)}个推荐房源")
             return recommended_houses
 
+        # 特征矩阵不可用时，退回智能采样房源进行评分
+        sampled_houses = cls._sample_houses_for_scoring(user_preferences, top_n * 10)  # 采样更多用于排序
+        LogUtil.logger.info(f"[推荐算法] 对{len(sampled_houses)}个采样房源进行评分计算")
+
+        house_scores = cls._calculate_house_scores(sampled_houses, user_preferences, user_behaviors)
+        LogUtil.logger.info(f"[推荐算法] 计算出{len(house_scores)}个房源得分")
+
+        # 直接排序并返回Top N（不过滤已交互房源）
+        recommended_houses = cls._sort_houses_by_score(house_scores, top_n)
+        LogUtil.logger.info(f"[推荐算法] 最终生成{len(recommended_houses)}个推荐房源")
+
+        return recommended_houses
+
+    @classmethod
+    def _blend_item_cooccurrence(cls, user_id: int, user_preferences: Dict, recommendations: List[str],
+                                 top_n: int) -> List[str]:
+        """
+        将共现模型中与用户最近房源相似的房源排在属性推荐之前
+
+        Args:
+            user_id (int): 用户ID
+            user_preferences (Dict): 用户偏好向量（含最近交互房源权重）
+            recommendations (List[str]): 属性匹配推荐的房源ID列表
+            top_n (int): 返回数量
+
+        Returns:
+            List[str]: 合并去重后的推荐房源ID列表
+        """
+        recent_houses = user_preferences.get(UserPreferenceService.HOUSES)
+        if not recent_houses:
+            return recommendations
+        try:
+            similar_houses = ItemCooccurrenceService.recommend(recent_houses, cls.ITEM_COOCCURRENCE_LIMIT)
         except Exception as e:
-            LogUtil.logger.error(f"生成用户{user_id}推荐失败: {str(e)}")
-            raise ServiceException(f"生成推荐失败: {str(e)}")
+            LogUtil.logger.error(f"[推荐算法] 用户{user_id}共现推荐失败: {str(e)}")
+            return recommendations
+        if not similar_houses:
+            return recommendations
+        LogUtil.logger.info(f"[推荐算法] 用户{user_id}共现模型推荐{len(similar_houses)}个房源")
+        return list(dict.fromkeys(similar_houses + recommendations))[:top_n]
+
+    @classmethod
+    def regenerate_user_recommendations(cls, user_id: int, user_name: Optional[str] = None) -> int:
+        """
+        重新生成并保存用户推荐（偏好向量只读取一次）
+
+        Args:
+            user_id (int): 用户ID
+            user_name (str): 用户名，后台执行时由提交方传入
+
+        Returns:
+            int: 推荐房源数量
+        """
+        user_preferences = cls._load_user_preferences(user_id)
+        if not any(user_preferences.values()):
+            LogUtil.logger.info(f"用户{user_id}没有行为记录，无法生成推荐")
+            return 0
+        recommendations = cls._rank_houses(user_preferences, [], cls.MAX_RECOMMENDATIONS)
+        recommendations = cls._blend_item_cooccurrence(user_id, user_preferences, recommendations,
+                                                       cls.MAX_RECOMMENDATIONS)
+        if not recommendations:
+            LogUtil.logger.warning(f"[推荐服务] 用户{user_id}没有生成到推荐内容")
+            return 0
+        model_info = cls._build_model_info(user_id, recommendations, user_preferences)
+        cls.save_user_recommendations(user_id, recommendations, model_info, user_name)
+        return len(recommendations)
+
+    @classmethod
+    def batch_generate_recommendations(cls, active_days: int = 1, chunk_size: int = 64,
+                                       max_workers: int = 1) -> int:
+        """
+        为最近有浏览或点赞行为的用户批量生成推荐
+        按批处理用户：每批加载偏好、评分、融合共现后立即保存，内存只保留一批用户的数据
+
+        Args:
+            active_days (int): 统计活跃用户的天数
+            chunk_size (int): 每次矩阵乘法的用户数
+            max_workers (int): 评分进程数
+
+        Returns:
+            int: 生成推荐的用户数
+        """
+        after_time = datetime.now() - timedelta(days=active_days)
+        active_users = {}
+        for user_id, user_name in ViewMapper.select_active_users_after_time(after_time) + \
+                LikeMapper.select_active_users_after_time(after_time):
+            active_users.setdefault(user_id, user_name)
+        LogUtil.logger.info(f"[批量推荐] 最近{active_days}天活跃用户数: {len(active_users)}")
+
+        # 每批的分块数与评分进程数一致，进程池在批内并行
+        batch_size = max(chunk_size, 1) * max(max_workers, 1)
+        active_users = list(active_users.items())
+        total = 0
+        for offset in range(0, len(active_users), batch_size):
+            saved = cls._generate_batch(active_users[offset:offset + batch_size], chunk_size, max_workers)
+            if saved is None:
+                break
+            total += saved
+        return total
+
+    @classmethod
+    def _generate_batch(cls, active_users: List[Tuple[int, str]], chunk_size: int,
+                        max_workers: int) -> Optional[int]:
+        """
+        为一批用户生成并保存推荐
+
+        Returns:
+            Optional[int]: 保存推荐的用户数，特征矩阵不可用时返回None
+        """
+        users = []
+        preferences_list = []
+        for user_id, user_name in active_users:
+            user_preferences = cls._load_user_preferences(user_id)
+            if any(user_preferences.values()):
+                users.append((user_id, user_name))
+                preferences_list.append(user_preferences)
+        if not users:
+            return 0
+
+        ranked_list = RecommendEngine.rank_batch(preferences_list, cls.WEIGHTS, cls.TAG_COMBINATION_BONUS,
+                                                 cls.MAX_RECOMMENDATIONS, chunk_size, max_workers)
+        if ranked_list is None:
+            return None
+
+        ranked_list = [
+            cls._blend_item_cooccurrence(user_id, user_preferences, recommendations, cls.MAX_RECOMMENDATIONS)
+            for (user_id, _), user_preferences, recommendations in zip(users, preferences_list, ranked_list)
+        ]
+
+        create_time = datetime.now().replace(microsecond=0)
+        recommends = []
+        for (user_id, user_name), user_preferences, recommendations in zip(users, preferences_list, ranked_list):
+            if not recommendations:
+                continue
+            recommend = Recommend()
+            recommend.user_id = user_id
+            recommend.user_name = user_name
+            recommend.model_info = json.dumps(cls._build_model_info(user_id, recommendations, user_preferences),
+                                              ensure_ascii=False)
+            recommend.content = json.dumps(recommendations, ensure_ascii=False)
+            recommend.create_time = create_time
+            recommends.append(recommend)
+        return cls._save_batch_recommendations(recommends, ranked_list, users)
+
+    @classmethod
+    def _save_batch_recommendations(cls, recommends: List[Recommend], ranked_list: List[List[str]],
+                                    users: List[Tuple[int, str]]) -> int:
+        """
+        保存一批用户的推荐结果：Redis一次管道写入，数据库一次提交
+        Redis写入失败时不更新该批的数据库快照也不重置行为计数，下次任务重新生成
+        """
+        if not recommends:
+            return 0
+        if cls.STORAGE_MODE == 'redis':
+            if not RecommendRedisStore.save_many([
+                (user_id, recommendations, recommends[0].create_time)
+                for (user_id, _), recommendations in zip(users, ranked_list) if recommendations
+            ]):
+                LogUtil.logger.warning(f"[批量推荐] {len(recommends)}个用户推荐写入Redis失败，本次不保存")
+                return 0
+            result = RecommendMapper.upsert_latest_recommends(recommends)
+        else:
+            result = RecommendMapper.insert_recommends(recommends)
+        BehaviorCounterService.reset_many([recommend.user_id for recommend in recommends])
+        LogUtil.logger.info(f"[批量推荐] 保存{len(recommends)}个用户推荐，数据库写入{result}条")
+        return len(recommends)
+
+    @classmethod
+    def submit_generation(cls, user_id: int) -> Optional[Future]:
+        """
+        提交后台推荐生成任务（同一用户的并发请求合并为一个任务）
+
+        Args:
+            user_id (int): 用户ID
+
+        Returns:
+            Optional[Future]: 任务Future，冷却期内或队列已满时返回None
+        """
+        return RecommendGenerationQueue.submit(user_id, _regenerate_in_app, user_id, get_username())
+
+    @classmethod
+    def get_generation_queue_stats(cls) -> Dict:
+        """
+        获取后台推荐生成队列统计信息
+
+        Returns:
+            Dict: 队列统计信息
+        """
+        return RecommendGenerationQueue.stats()
 
     @classmethod
-    def save_user_recommendations(cls, user_id: int, recommendations: List[str], model_info: Dict) -> int:
+    def save_user_recommendations(cls, user_id: int, recommendations: List[str], model_info: Dict,
+                                  user_name: Optional[str] = None) -> int:
         """
         保存用户推荐结果
 
@@ -86,6 +298,7 @@ class RecommendService:
             user_id (int): 用户ID
             recommendations (List[str]): 推荐房源ID列表
             model_info (Dict): 推荐模型信息
+            user_name (str): 用户名，为空时取当前登录用户
 
         Returns:
             int: 保存的记录数
@@ -95,26 +308,26 @@ class RecommendService:
             if not recommendations:
                 raise ValueError("推荐内容不能为空")
 
-            # 序列化并验证JSON格式
+            # 序列化JSON
             model_info_json = json.dumps(model_info, ensure_ascii=False)
             content_json = json.dumps(recommendations, ensure_ascii=False)
 
-            # 验证JSON可以正确反序列化
-            try:
-                json.loads(model_info_json)
-                json.loads(content_json)
-            except json.JSONDecodeError as e:
-                LogUtil.logger.error(f"JSON序列化验证失败: {str(e)}")
-                raise ValueError(f"JSON格式错误: {str(e)}")
-
             recommend = Recommend()
             recommend.user_id = user_id
-            recommend.user_name = get_username()
+            recommend.user_name = user_name if user_name is not None else get_username()
             recommend.model_info = model_info_json
             recommend.content = content_json
-            recommend.create_time = datetime.now()
+            recommend.create_time = datetime.now().replace(microsecond=0)
 
-            result = RecommendMapper.insert_recommend(recommend)
+            if cls.STORAGE_MODE == 'redis' and RecommendRedisStore.save(user_id, recommendations,
+                                                                        recommend.create_time):
+                # 推荐列表以Redis为准，数据库只异步覆盖保存最新快照
+                TaskManager.execute(_snapshot_recommend, recommend)
+                result = 1
+            else:
+                result = RecommendMapper.insert_recommend(recommend)
+            if result > 0:
+                BehaviorCounterService.reset(user_id)
             LogUtil.logger.info(
                 f"成功保存用户{user_id}推荐，模型信息长度: {len(model_info_json)}, 内容长度: {len(content_json)}")
             return result
@@ -134,16 +347,18 @@ class RecommendService:
             bool: 是否需要生成推荐
         """
         try:
-            # 查询用户的推荐记录
-            recommend = RecommendMapper.select_latest_recommend_by_user_id(user_id)
+            # 查询用户最新推荐的创建时间
+            recommend_create_time = RecommendRedisStore.select_create_time(user_id) \
+                if cls.STORAGE_MODE == 'redis' else None
+            if recommend_create_time is None:
+                recommend = RecommendMapper.select_latest_recommend_by_user_id(user_id)
 
-            # 如果没有推荐记录，需要生成
-            if not recommend:
-                LogUtil.logger.info(f"[判断推荐] 用户{user_id}没有推荐记录，需要生成")
-                return True
+                # 如果没有推荐记录，需要生成
+                if not recommend:
+                    LogUtil.logger.info(f"[判断推荐] 用户{user_id}没有推荐记录，需要生成")
+                    return True
 
-            # 获取最新的推荐记录
-            recommend_create_time = recommend.create_time
+                recommend_create_time = recommend.create_time
 
             if not recommend_create_time:
                 LogUtil.logger.info(f"[判断推荐] 用户{user_id}推荐记录没有创建时间，需要重新生成")
@@ -151,17 +366,9 @@ class RecommendService:
 
             LogUtil.logger.info(f"[判断推荐] 用户{user_id}最新推荐创建时间: {recommend_create_time}")
 
-            # 检查从推荐创建时间之后的新行为
-
-            # 检查浏览记录：5条浏览
-            new_views = ViewMapper.select_views_after_time(user_id, recommend_create_time)
-            view_count = len(new_views) if new_views else 0
-            LogUtil.logger.info(f"[判断推荐] 用户{user_id}推荐创建后新增浏览数: {view_count}")
-
-            # 检查点赞记录：1条点赞
-            new_likes = LikeMapper.select_likes_after_time(user_id, recommend_create_time)
-            like_count = len(new_likes) if new_likes else 0
-            LogUtil.logger.info(f"[判断推荐] 用户{user_id}推荐创建后新增点赞数: {like_count}")
+            # 检查从推荐创建时间之后的新行为（浏览5条或点赞1条）
+            view_count, like_count = BehaviorCounterService.get_counts(user_id, recommend_create_time)
+            LogUtil.logger.info(f"[判断推荐] 用户{user_id}推荐创建后新增浏览数: {view_count}, 新增点赞数: {like_count}")
 
             # 如果同时满足浏览了n条且点赞了n条，才需要重新生成推荐
             should_generate = view_count >= cls.VIEW_NEW_RECORDS_COUNT or like_count >= cls.LIKE_NEW_RECORDS_COUNT
@@ -200,41 +407,36 @@ class RecommendService:
         if not should_generate:
             return cls._get_user_recommendations(user_id, page_num, page_size)
 
-        # 生成推荐
-        try:
-            LogUtil.logger.info(f"[推荐服务] 用户{user_id}开始生成推荐")
-            recommendations = cls.generate_recommendations(user_id, top_n=cls.MAX_RECOMMENDATIONS)
-            LogUtil.logger.info(f"[推荐服务] 用户{user_id}生成了{len(recommendations)}个推荐")
-
-            if not recommendations:
-                LogUtil.logger.warning(f"[推荐服务] 用户{user_id}没有生成到推荐内容")
-                return cls._get_user_recommendations(user_id, page_num, page_size)
-
-            # 构建并保存推荐模型
-            model_info = cls._build_model_info(user_id, recommendations)
-            result = cls.save_user_recommendations(user_id, recommendations, model_info)
-            LogUtil.logger.info(f"[推荐服务] 用户{user_id}推荐保存结果: {result}")
+        # 提交后台生成任务，先返回已保存的推荐
+        future = cls.submit_generation(user_id)
+        houses, total = cls._get_user_recommendations(user_id, page_num, page_size)
+        if total > 0 or future is None:
+            return houses, total
 
+        # 首次生成没有可返回的推荐，短暂等待后台任务完成
+        try:
+            future.result(timeout=cls.FIRST_GENERATION_WAIT_SECONDS)
         except Exception as e:
-            LogUtil.logger.error(f"[推荐服务] 用户{user_id}自动生成推荐失败: {str(e)}")
-
+            LogUtil.logger.info(f"[推荐服务] 用户{user_id}等待首次推荐生成未完成: {str(e)}")
+            return houses, total
         return cls._get_user_recommendations(user_id, page_num, page_size)
 
     @classmethod
-    def _build_model_info(cls, user_id: int, recommendations: List[str]) -> Dict:
+    def _build_model_info(cls, user_id: int, recommendations: List[str], user_preferences: Dict = None) -> Dict:
         """
         构建推荐模型信息
 
         Args:
             user_id (int): 用户ID
             recommendations (List[str]): 推荐房源ID列表
+            user_preferences (Dict): 已计算的用户偏好，为空时重新计算
 
         Returns:
             Dict: 模型信息
         """
         # 获取用户偏好数据
-        user_behaviors = cls._get_user_behaviors(user_id)
-        user_preferences = cls._calculate_user_preferences(user_behaviors)
+        if user_preferences is None:
+            user_preferences = cls._load_user_preferences(user_id)
 
         # 构建分类的维度评分模型
         town_model = []
@@ -255,6 +457,7 @@ class RecommendService:
 
         return {
             'algorithm': 'multiDimensionCollaborativeFiltering',
+            'itemCooccurrenceLimit': cls.ITEM_COOCCURRENCE_LIMIT,
             'weights': {
                 'town': float(cls.WEIGHTS['town']),
                 'houseType': float(cls.WEIGHTS['house_type']),
@@ -293,7 +496,17 @@ class RecommendService:
             Tuple[List[House], int]: (房源列表, 总数)
         """
 
-        # 直接查询用户的最新推荐记录
+        # Redis存储模式下按排名区间读取当前页
+        if cls.STORAGE_MODE == 'redis':
+            page = RecommendRedisStore.select_page(user_id, page_num, page_size)
+            if page is not None:
+                page_house_ids, total = page
+                houses, missing_ids = HouseService.select_houses_by_ids(page_house_ids)
+                if missing_ids:
+                    LogUtil.logger.warning(f"[推荐服务] 用户{user_id}房源{missing_ids}查询结果为空")
+                return houses, total
+
+        # 查询用户的最新推荐记录
         latest_recommend = RecommendMapper.select_latest_recommend_by_user_id(user_id)
 
         if not latest_recommend:
@@ -331,6 +544,11 @@ class RecommendService:
             LogUtil.logger.info(f"[推荐服务] 用户{user_id}推荐房源列表为空")
             return [], 0
 
+        if cls.STORAGE_MODE == 'redis':
+            # Redis中没有推荐列表（过期或被清理），根据快照重新写入
+            RecommendRedisStore.save(user_id, [str(house_id) for house_id in recommended_house_ids],
+                                     latest_recommend.create_time or datetime.now())
+
         # 分页处理推荐房源ID
         start_idx = (page_num - 1) * page_size
         end_idx = start_idx + page_size
@@ -339,30 +557,38 @@ class RecommendService:
         LogUtil.logger.info(
             f"[推荐服务] 用户{user_id}分页参数: page_num={page_num}, page_size={page_size}, 返回房源数: {len(page_house_ids)}")
 
-        # 查询对应的房源信息
-        houses = []
-        success_count = 0
-        fail_count = 0
-
-        for house_id in page_house_ids:
-            try:
-                house = HouseService.select_house_by_id(str(house_id))
-                if house:
-                    houses.append(house)
-                    success_count += 1
-                else:
-                    fail_count += 1
-                    LogUtil.logger.warning(f"[推荐服务] 用户{user_id}房源{house_id}查询结果为空")
-            except Exception as e:
-                fail_count += 1
-                LogUtil.logger.error(f"[推荐服务] 用户{user_id}房源{house_id}查询失败: {str(e)}")
-                continue
+        # 一次IN查询取回当前页房源，保持推荐顺序
+        houses, missing_ids = HouseService.select_houses_by_ids([str(house_id) for house_id in page_house_ids])
+        if missing_ids:
+            LogUtil.logger.warning(f"[推荐服务] 用户{user_id}房源{missing_ids}查询结果为空")
 
         LogUtil.logger.info(
-            f"[推荐服务] 用户{user_id}房源查询完成: 成功{success_count}个, 失败{fail_count}个, 总共返回{len(houses)}个房源")
+            f"[推荐服务] 用户{user_id}房源查询完成: 成功{len(houses)}个, 失败{len(missing_ids)}个, 总共返回{len(houses)}个房源")
 
         return houses, len(recommended_house_ids)
 
+    @classmethod
+    def _load_user_preferences(cls, user_id: int) -> Dict:
+        """
+        读取用户偏好向量，Redis中不存在时根据最新行为记录计算并保存
+
+        Args:
+            user_id (int): 用户ID
+
+        Returns:
+            Dict: 用户偏好向量
+        """
+        user_preferences = UserPreferenceService.get_preferences(user_id)
+        if user_preferences is not None:
+            return user_preferences
+
+        user_behaviors = cls._get_user_behaviors(user_id)
+        user_preferences = cls._calculate_user_preferences(user_behaviors)
+        if user_behaviors:
+            latest_time = max(behavior['create_time'] for behavior in user_behaviors)
+            UserPreferenceService.save_preferences(user_id, user_preferences, latest_time)
+        return user_preferences
+
     @classmethod
     def _get_user_behaviors(cls, user_id: int) -> List[Dict]:
         """
@@ -456,21 +682,23 @@ class RecommendService:
             behaviors (List[Dict]): 用户行为记录
 
         Returns:
-            Dict: 用户偏好向量
+            Dict: 用户偏好向量（含最近交互房源权重）
         """
         if not behaviors:
             return {
                 'town': {},
                 'house_type': {},
                 'orientation': {},
-                'tags': {}
+                'tags': {},
+                'houses': {}
             }
 
         preferences = {
             'town': {},
             'house_type': {},
             'orientation': {},
-            'tags': {}
+            'tags': {},
+            'houses': {}
         }
 
         # 找到最新行为记录的时间作为基准时间
@@ -480,6 +708,11 @@ class RecommendService:
             time_weight = cls._calculate_time_weight(behavior['create_time'], latest_time)
             score = behavior['score'] * time_weight
 
+            # 最近交互房源（共现模型推荐）
+            if behavior.get('house_id'):
+                house_id = str(behavior['house_id'])
+                preferences['houses'][house_id] = preferences['houses'].get(house_id, 0) + score
+
             # 处理镇偏好
             if behavior['town']:
                 preferences['town'][behavior['town']] = preferences['town'].get(behavior['town'], 0) + score
@@ -767,6 +1000,10 @@ class RecommendService:
             List[House]: 房源列表
         """
         try:
+            # 优先使用候选索引，无需访问数据库
+            if HouseCandidateIndex.ensure_fresh():
+                return cls._query_houses_by_index(conditions, limit)
+
             # 根据条件调用对应的Mapper方法
             if 'town' in conditions and conditions['town']:
                 houses = HouseMapper.select_houses_by_town(conditions['town'], limit)
@@ -797,6 +1034,47 @@ class RecommendService:
             LogUtil.logger.error(f"[条件查询] 查询条件{conditions}失败: {str(e)}")
             return []
 
+    @classmethod
+    def _query_houses_by_index(cls, conditions: Dict, limit: int = 50) -> List[House]:
+        """
+        根据条件从候选索引中取房源（按房源ID倒序）
+
+        Args:
+            conditions (Dict): 查询条件
+            limit (int): 限制数量
+
+        Returns:
+            List[House]: 仅包含推荐特征字段的房源列表
+        """
+        for dimension in ('town', 'house_type', 'orientation'):
+            if conditions.get(dimension):
+                features = HouseCandidateIndex.select_features_by_value(dimension, conditions[dimension], limit)
+                break
+        else:
+            if not conditions.get('tags'):
+                LogUtil.logger.warning(f"[条件查询] 无效查询条件: {conditions}")
+                return []
+            # 标签模糊匹配：包含关键词的所有标签的并集
+            features = HouseCandidateIndex.select_features_by_tag(conditions['tags'], limit)
+        return cls._build_houses_from_features(features)
+
+    @classmethod
+    def _build_houses_from_features(cls, features: List[Tuple]) -> List[House]:
+        """
+        根据索引特征构建房源对象
+
+        Args:
+            features (List[Tuple]): (房源ID, 镇, 户型, 朝向, 标签) 列表
+
+        Returns:
+            List[House]: 房源列表
+        """
+        return [
+            House(house_id=house_id, town=town, house_type=house_type, orientation=orientation,
+                  tags=';'.join(tags) if tags else None)
+            for house_id, town, house_type, orientation, tags in features
+        ]
+
     @classmethod
     def _query_recent_houses(cls, limit: int = 50) -> List[House]:
         """
@@ -809,6 +1087,8 @@ class RecommendService:
             List[House]: 房源列表
         """
         try:
+            if HouseCandidateIndex.ensure_fresh():
+                return cls._build_houses_from_features(HouseCandidateIndex.select_recent_features(limit))
             houses = HouseMapper.select_recent_houses(limit)
             LogUtil.logger.info(f"[查询房源] 查询到{len(houses)}个最近房源")
             return houses
@@ -885,16 +1165,9 @@ class RecommendService:
         """
         try:
             # 直接生成推荐，不需要判断是否应该更新
-            recommendations = cls.generate_recommendations(user_id, top_n=cls.MAX_RECOMMENDATIONS)
-
-            if recommendations:
-                # 构建模型信息
-                model_info = cls._build_model_info(user_id, recommendations)
-
-                # 保存推荐结果
-                cls.save_user_recommendations(user_id, recommendations, model_info)
-
-                LogUtil.logger.info(f"自动更新用户{user_id}推荐成功，共{len(recommendations)}条")
+            count = cls.regenerate_user_recommendations(user_id)
+            if count:
+                LogUtil.logger.info(f"自动更新用户{user_id}推荐成功，共{count}条")
 
         except Exception as e:
             LogUtil.logger.error(f"自动更新用户{user_id}推荐失败: {str(e)}")
@@ -1042,3 +1315,34 @@ class RecommendService:
             raise ServiceException(fail_msg)
         success_msg = f"恭喜您，数据已全部导入成功！共 {success_count} 条，数据如下：" + success_msg
         return success_msg
+
+
+def _regenerate_in_app(app: Flask, user_id: int, user_name: Optional[str]) -> int:
+    """
+    在应用上下文中重新生成用户推荐（后台队列任务）
+
+    Args:
+        app (Flask): flask应用
+        user_id (int): 用户ID
+        user_name (str): 用户名
+
+    Returns:
+        int: 推荐房源数量
+    """
+    with app.app_context():
+        return RecommendService.regenerate_user_recommendations(user_id, user_name)
+
+
+def _snapshot_recommend(app: Flask, recommend: Recommend) -> int:
+    """
+    异步覆盖保存用户最新推荐快照
+
+    Args:
+        app (Flask): flask应用
+        recommend (Recommend): 用户推荐对象
+
+    Returns:
+        int: 影响的记录数
+    """
+    with app.app_context():
+        return RecommendMapper.upsert_latest_recommend(recommend)
@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+# @Author  : YY
+# @FileName: recommend_store.py
+# @Time    : 2026-01-10 17:29:50
+
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from ruoyi_admin.ext import redis_cache
+from ruoyi_common.utils.base import LogUtil
+
+
+class RecommendRedisStore:
+    """
+    基于Redis有序集合的用户推荐存储
+
+    成员为房源ID，分值为推荐排名，分页通过ZRANGE按排名区间读取，
+    无需解析完整的推荐列表
+    """
+
+    LIST_KEY_PREFIX = "house:recommend:list:"
+    META_KEY_PREFIX = "house:recommend:meta:"
+    EXPIRE_SECONDS = 7 * 24 * 60 * 60  # 推荐列表过期时间（7天）
+    TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+    @classmethod
+    def get_list_key(cls, user_id: int) -> str:
+        return f"{cls.LIST_KEY_PREFIX}{user_id}"
+
+    @classmethod
+    def get_meta_key(cls, user_id: int) -> str:
+        return f"{cls.META_KEY_PREFIX}{user_id}"
+
+    @classmethod
+    def save(cls, user_id: int, house_ids: List[str], create_time: datetime) -> bool:
+        """
+        保存用户推荐列表（先写临时key再RENAME，读取方不会看到半成品）
+
+        Args:
+            user_id (int): 用户ID
+            house_ids (List[str]): 按排名排序的房源ID列表
+            create_time (datetime): 推荐生成时间
+
+        Returns:
+            bool: 是否保存成功
+        """
+        return cls.save_many([(user_id, house_ids, create_time)])
+
+    @classmethod
+    def save_many(cls, entries: List[Tuple[int, List[str], datetime]]) -> bool:
+        """
+        批量保存多个用户的推荐列表（一次非事务管道提交，每个用户仍通过RENAME整体替换）
+
+        Args:
+            entries (List[Tuple[int, List[str], datetime]]): (用户ID, 房源ID列表, 推荐生成时间) 列表
+
+        Returns:
+            bool: 是否保存成功
+        """
+        entries = [entry for entry in entries if entry[1]]
+        if not entries:
+            return False
+        try:
+            pipe = redis_cache.pipeline(transaction=False)
+            for user_id, house_ids, create_time in entries:
+                list_key = cls.get_list_key(user_id)
+                tmp_key = f"{list_key}:tmp"
+                meta_key = cls.get_meta_key(user_id)
+                mapping = {}
+                for rank, house_id in enumerate(house_ids):
+                    mapping.setdefault(str(house_id), rank)
+                pipe.delete(tmp_key)
+                pipe.zadd(tmp_key, mapping)
+                pipe.rename(tmp_key, list_key)
+                pipe.expire(list_key, cls.EXPIRE_SECONDS)
+                pipe.hset(meta_key, mapping={
+                    'createTime': create_time.strftime(cls.TIME_FORMAT),
+                    'total': len(mapping),
+                })
+                pipe.expire(meta_key, cls.EXPIRE_SECONDS)
+            pipe.execute()
+            return True
+        except Exception as e:
+            LogUtil.logger.error(f"[推荐存储] 保存{len(entries)}个用户推荐到Redis失败: {str(e)}")
+            return False
+
+    @classmethod
+    def select_page(cls, user_id: int, page_num: int, page_size: int) -> Optional[Tuple[List[str], int]]:
+        """
+        按排名区间读取一页推荐房源ID
+
+        Args:
+            user_id (int): 用户ID
+            page_num (int): 页码
+            page_size (int): 每页大小
+
+        Returns:
+            Optional[Tuple[List[str], int]]: (房源ID列表, 总数)，Redis中没有推荐时返回None
+        """
+        list_key = cls.get_list_key(user_id)
+        start = (page_num - 1) * page_size
+        try:
+            pipe = redis_cache.pipeline(transaction=False)
+            pipe.zrange(list_key, start, start + page_size - 1)
+            pipe.zcard(list_key)
+            members, total = pipe.execute()
+        except Exception as e:
+            LogUtil.logger.error(f"[推荐存储] 读取用户{user_id}推荐失败: {str(e)}")
+            return None
+        if not total:
+            return None
+        return [member.decode('utf-8') if isinstance(member, bytes) else member for member in members], total
+
+    @classmethod
+    def select_create_time(cls, user_id: int) -> Optional[datetime]:
+        """
+        读取推荐生成时间
+
+        Args:
+            user_id (int): 用户ID
+
+        Returns:
+            Optional[datetime]: 推荐生成时间，不存在时返回None
+        """
+        try:
+            value = redis_cache.hget(cls.get_meta_key(user_id), 'createTime')
+        except Exception as e:
+            LogUtil.logger.error(f"[推荐存储] 读取用户{user_id}推荐时间失败: {str(e)}")
+            return None
+        if not value:
+            return None
+        if isinstance(value, bytes):
+            value = value.decode('utf-8')
+        return datetime.strptime(value, cls.TIME_FORMAT)
+
+    @classmethod
+    def evict(cls, user_id: int) -> None:
+        """
+        删除用户推荐列表
+
+        Args:
+            user_id (int): 用户ID
+        """
+        try:
+            redis_cache.delete(cls.get_list_key(user_id), cls.get_meta_key(user_id))
+        except Exception as e:
+            LogUtil.logger.error(f"[推荐存储] 删除用户{user_id}推荐失败: {str(e)}")
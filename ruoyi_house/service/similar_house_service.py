@@ -0,0 +1,280 @@
+# -*- coding: utf-8 -*-
+# @Author  : YY
+# @FileName: similar_house_service.py
+# @Time    : 2026-01-10 17:29:50
+
+import time
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from ruoyi_admin.ext import redis_cache
+from ruoyi_common.utils.base import LogUtil
+from ruoyi_house.service.recommend_engine import HouseFeatureMatrix, RecommendEngine, top_k_indices
+
+
+class SimilarHouseService:
+    """
+    相似房源预计算服务
+
+    离线按推荐权重计算每个房源最相似的K个房源，存入Redis哈希（房源ID -> "ID:得分,..."），
+    详情页只需一次HGET。房源新增、修改、删除时记入待更新集合，增量任务只重算受影响的房源
+    """
+
+    CACHE_KEY = "house:similar"
+    DIRTY_KEY = "house:similar:dirty"
+    PROCESSING_KEY = "house:similar:dirty:processing"
+    TOP_K = 20  # 每个房源保留的相似房源数量
+    CHUNK_SIZE = 256  # 每次矩阵乘法计算的房源数
+    WRITE_BATCH_SIZE = 1000  # 每次管道写入的房源数
+
+    @classmethod
+    def select_similar_house_ids(cls, house_id: str) -> List[str]:
+        """
+        获取房源的相似房源ID列表
+
+        Args:
+            house_id (str): 房源ID
+
+        Returns:
+            List[str]: 按相似度降序的房源ID列表
+        """
+        try:
+            value = redis_cache.hget(cls.CACHE_KEY, house_id)
+        except Exception as e:
+            LogUtil.logger.error(f"[相似房源] 读取房源{house_id}相似房源失败: {str(e)}")
+            return []
+        return [similar_id for similar_id, _ in cls._decode(value)]
+
+    @classmethod
+    def mark_dirty(cls, house_ids: Iterable[str]) -> None:
+        """
+        记录需要重新计算相似房源的房源
+
+        Args:
+            house_ids (Iterable[str]): 房源ID列表
+        """
+        house_ids = [str(house_id) for house_id in house_ids if house_id]
+        if not house_ids:
+            return
+        try:
+            redis_cache.sadd(cls.DIRTY_KEY, *house_ids)
+        except Exception as e:
+            LogUtil.logger.error(f"[相似房源] 记录待更新房源失败: {str(e)}")
+
+    @classmethod
+    def build(cls, weights: Dict, tag_combination_bonus: float) -> int:
+        """
+        全量计算所有房源的相似房源
+
+        Args:
+            weights (Dict): 维度权重
+            tag_combination_bonus (float): 标签组合奖励倍数
+
+        Returns:
+            int: 计算的房源数
+        """
+        start = time.perf_counter()
+        # 待更新记录在计算前取出，计算期间的新变更留给下一次增量任务
+        cls._take_dirty()
+        RecommendEngine.invalidate()
+        catalog = RecommendEngine.get_catalog()
+        if catalog is None:
+            redis_cache.delete(cls.CACHE_KEY, cls.PROCESSING_KEY)
+            return 0
+
+        lists = {}
+        for chunk_start in range(0, catalog.size, cls.CHUNK_SIZE):
+            rows = np.arange(chunk_start, min(chunk_start + cls.CHUNK_SIZE, catalog.size))
+            lists.update(cls._compute_lists(catalog, rows, weights, tag_combination_bonus))
+
+        stale_ids = cls._select_cached_ids() - set(lists)
+        cls._write(lists, stale_ids)
+        redis_cache.delete(cls.PROCESSING_KEY)
+        LogUtil.logger.info(
+            f"[相似房源] 全量计算完成: 房源数{catalog.size}, 耗时{(time.perf_counter() - start) * 1000:.1f}ms")
+        return catalog.size
+
+    @classmethod
+    def refresh(cls, weights: Dict, tag_combination_bonus: float) -> int:
+        """
+        增量更新上次计算后变更过的房源
+
+        变更房源整体重算；其他房源把变更房源的新得分合并进自己的列表，
+        列表中的变更房源得分下降或已删除时，该房源整体重算
+
+        Args:
+            weights (Dict): 维度权重
+            tag_combination_bonus (float): 标签组合奖励倍数
+
+        Returns:
+            int: 重新计算的房源数
+        """
+        if not redis_cache.exists(cls.CACHE_KEY):
+            return cls.build(weights, tag_combination_bonus)
+        dirty_ids = cls._take_dirty()
+        if not dirty_ids:
+            return 0
+
+        start = time.perf_counter()
+        RecommendEngine.invalidate()
+        catalog = RecommendEngine.get_catalog()
+        if catalog is None:
+            redis_cache.delete(cls.CACHE_KEY, cls.PROCESSING_KEY)
+            return 0
+
+        row_of = {house_id: row for row, house_id in enumerate(catalog.house_ids)}
+        dirty_rows = np.array(sorted(row_of[house_id] for house_id in dirty_ids if house_id in row_of),
+                              dtype=np.int64)
+        deleted_ids = {house_id for house_id in dirty_ids if house_id not in row_of}
+
+        lists = {}
+        # 其他房源对变更房源的得分（相似度对称，列即变更房源）
+        dirty_scores = {}
+        for chunk_start in range(0, len(dirty_rows), cls.CHUNK_SIZE):
+            rows = dirty_rows[chunk_start:chunk_start + cls.CHUNK_SIZE]
+            scores = RecommendEngine.similarity_scores(catalog, rows, weights, tag_combination_bonus)
+            lists.update(cls._top_lists(catalog, rows, scores))
+            for column, row in enumerate(rows):
+                dirty_scores[catalog.house_ids[row]] = scores[:, column]
+
+        recompute_rows = []
+        cached = cls._select_cached_lists()
+        for house_id, similar in cached.items():
+            if house_id in lists or house_id in deleted_ids or house_id not in row_of:
+                continue
+            row = row_of[house_id]
+            merged = cls._merge(row, similar, dirty_scores, deleted_ids, catalog.house_ids)
+            if merged is None:
+                recompute_rows.append(row)
+            elif merged != similar:
+                lists[house_id] = merged
+        # 缓存中缺失的房源（如计算期间新增）一并重算
+        recompute_rows.extend(row for house_id, row in row_of.items()
+                              if house_id not in cached and house_id not in lists)
+
+        recompute_rows = np.array(sorted(set(recompute_rows)), dtype=np.int64)
+        for chunk_start in range(0, len(recompute_rows), cls.CHUNK_SIZE):
+            rows = recompute_rows[chunk_start:chunk_start + cls.CHUNK_SIZE]
+            lists.update(cls._compute_lists(catalog, rows, weights, tag_combination_bonus))
+
+        stale_ids = deleted_ids | (set(cached) - set(row_of))
+        cls._write(lists, stale_ids)
+        redis_cache.delete(cls.PROCESSING_KEY)
+        LogUtil.logger.info(
+            f"[相似房源] 增量更新完成: 变更房源{len(dirty_ids)}, 重算{len(dirty_rows) + len(recompute_rows)}, "
+            f"更新列表{len(lists)}, 耗时{(time.perf_counter() - start) * 1000:.1f}ms")
+        return len(dirty_rows) + len(recompute_rows)
+
+    @classmethod
+    def _compute_lists(cls, catalog: HouseFeatureMatrix, rows: np.ndarray, weights: Dict,
+                       tag_combination_bonus: float) -> Dict[str, List[Tuple[str, float]]]:
+        scores = RecommendEngine.similarity_scores(catalog, rows, weights, tag_combination_bonus)
+        return cls._top_lists(catalog, rows, scores)
+
+    @classmethod
+    def _top_lists(cls, catalog: HouseFeatureMatrix, rows: np.ndarray,
+                   scores: np.ndarray) -> Dict[str, List[Tuple[str, float]]]:
+        lists = {}
+        for column, row in enumerate(rows):
+            column_scores = scores[:, column]
+            indices = top_k_indices(column_scores, cls.TOP_K)
+            lists[catalog.house_ids[row]] = [
+                (catalog.house_ids[index], cls._round(column_scores[index]))
+                for index in indices if column_scores[index] > 0
+            ]
+        return lists
+
+    @classmethod
+    def _merge(cls, row: int, similar: List[Tuple[str, float]], dirty_scores: Dict[str, np.ndarray],
+               deleted_ids: Set[str], house_ids: np.ndarray) -> Optional[List[Tuple[str, float]]]:
+        """
+        把变更房源的新得分合并进已有列表
+
+        Returns:
+            Optional[List[Tuple[str, float]]]: 合并后的列表，无法仅靠合并得到正确结果时返回None
+        """
+        full = len(similar) >= cls.TOP_K
+        merged = {}
+        for similar_id, score in similar:
+            if similar_id in deleted_ids:
+                if full:
+                    return None
+                continue
+            if similar_id in dirty_scores:
+                new_score = cls._round(dirty_scores[similar_id][row])
+                # 列表已满时得分下降，列表外可能有更相似的房源
+                if full and new_score < score:
+                    return None
+                if new_score > 0:
+                    merged[similar_id] = new_score
+                continue
+            merged[similar_id] = score
+        for similar_id, scores in dirty_scores.items():
+            if similar_id not in merged and similar_id != house_ids[row]:
+                score = cls._round(scores[row])
+                if score > 0:
+                    merged[similar_id] = score
+        ordered = sorted(merged.items(), key=lambda item: -item[1])
+        return ordered[:cls.TOP_K]
+
+    @classmethod
+    def _take_dirty(cls) -> Set[str]:
+        """
+        取出待更新房源（RENAME到处理中key，期间的新变更写入新的集合）
+        """
+        try:
+            if redis_cache.exists(cls.DIRTY_KEY):
+                redis_cache.rename(cls.DIRTY_KEY, cls.PROCESSING_KEY)
+            # 上次任务中断时处理中key仍然保留，这里一并处理
+            members = redis_cache.smembers(cls.PROCESSING_KEY)
+        except Exception as e:
+            LogUtil.logger.error(f"[相似房源] 读取待更新房源失败: {str(e)}")
+            return set()
+        return {cls._to_str(member) for member in members}
+
+    @classmethod
+    def _select_cached_ids(cls) -> Set[str]:
+        return {cls._to_str(house_id) for house_id in redis_cache.hkeys(cls.CACHE_KEY)}
+
+    @classmethod
+    def _select_cached_lists(cls) -> Dict[str, List[Tuple[str, float]]]:
+        lists = {}
+        for house_id, value in redis_cache.hscan_iter(cls.CACHE_KEY, count=cls.WRITE_BATCH_SIZE):
+            lists[cls._to_str(house_id)] = cls._decode(value)
+        return lists
+
+    @classmethod
+    def _write(cls, lists: Dict[str, List[Tuple[str, float]]], stale_ids: Set[str]) -> None:
+        items = list(lists.items())
+        for batch_start in range(0, len(items), cls.WRITE_BATCH_SIZE):
+            batch = items[batch_start:batch_start + cls.WRITE_BATCH_SIZE]
+            redis_cache.hset(cls.CACHE_KEY, mapping={
+                house_id: cls._encode(similar) for house_id, similar in batch
+            })
+        stale_ids = list(stale_ids)
+        for batch_start in range(0, len(stale_ids), cls.WRITE_BATCH_SIZE):
+            redis_cache.hdel(cls.CACHE_KEY, *stale_ids[batch_start:batch_start + cls.WRITE_BATCH_SIZE])
+
+    @classmethod
+    def _encode(cls, similar: List[Tuple[str, float]]) -> str:
+        return ",".join(f"{house_id}:{score:g}" for house_id, score in similar)
+
+    @classmethod
+    def _decode(cls, value) -> List[Tuple[str, float]]:
+        if not value:
+            return []
+        similar = []
+        for item in cls._to_str(value).split(","):
+            house_id, _, score = item.rpartition(":")
+            if house_id:
+                similar.append((house_id, float(score)))
+        return similar
+
+    @staticmethod
+    def _round(score) -> float:
+        return round(float(score), 4)
+
+    @staticmethod
+    def _to_str(value) -> str:
+        return value.decode('utf-8') if isinstance(value, bytes) else str(value)
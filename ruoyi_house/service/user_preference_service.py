@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+# @Author  : YY
+# @FileName: user_preference_service.py
+# @Time    : 2026-01-10 17:29:50
+
+import json
+from datetime import datetime
+from typing import Dict, Optional
+
+from redis.exceptions import WatchError
+
+from ruoyi_admin.ext import redis_cache
+from ruoyi_common.utils.base import LogUtil
+
+
+class UserPreferenceService:
+    """
+    用户偏好向量服务
+
+    每个用户的偏好向量（镇、户型、朝向、标签权重）以JSON保存在Redis中，
+    同时记录最近一次更新时间。记录行为时先按距上次更新的天数整体衰减，
+    再累加本次行为得分，读取时直接返回，无需重新聚合行为记录。
+    最近交互房源的权重（houses）按同样方式衰减累加，供共现模型推荐使用。
+    """
+
+    CACHE_KEY_PREFIX = "house:user_preference:"
+    EXPIRE_SECONDS = 30 * 24 * 60 * 60  # 偏好向量过期时间（30天）
+    TIME_DECAY_FACTOR = 0.95  # 每天衰减系数，与推荐算法保持一致
+    MIN_WEIGHT = 0.01  # 低于该权重的属性值直接移除
+    MAX_VALUES_PER_DIMENSION = 100  # 每个维度最多保留的属性值数量
+    MAX_RETRIES = 5  # 并发更新冲突时的重试次数
+    DIMENSIONS = ('town', 'house_type', 'orientation', 'tags')
+    HOUSES = 'houses'  # 最近交互房源：房源ID -> 行为权重
+    MAX_RECENT_HOUSES = 35  # 最多保留的最近交互房源数量（与推荐读取的浏览、点赞记录数一致）
+
+    @classmethod
+    def get_cache_key(cls, user_id: int) -> str:
+        """
+        获取缓存key
+
+        Args:
+            user_id (int): 用户ID
+
+        Returns:
+            str: 缓存key
+        """
+        return f"{cls.CACHE_KEY_PREFIX}{user_id}"
+
+    @classmethod
+    def get_preferences(cls, user_id: int) -> Optional[Dict]:
+        """
+        读取用户偏好向量
+
+        Args:
+            user_id (int): 用户ID
+
+        Returns:
+            Optional[Dict]: 偏好向量（含最近交互房源权重），不存在或为旧格式时返回None
+        """
+        try:
+            value = redis_cache.get(cls.get_cache_key(user_id))
+        except Exception as e:
+            LogUtil.logger.error(f"[用户偏好] 读取用户{user_id}偏好失败: {str(e)}")
+            return None
+        if not value:
+            return None
+        data = json.loads(value)
+        if cls.HOUSES not in data:
+            # 没有最近交互房源的旧记录，按行为记录重新初始化
+            return None
+        preferences = {dimension: data.get(dimension) or {} for dimension in cls.DIMENSIONS}
+        preferences[cls.HOUSES] = data.get(cls.HOUSES) or {}
+        return preferences
+
+    @classmethod
+    def save_preferences(cls, user_id: int, preferences: Dict, base_time: Optional[datetime] = None) -> None:
+        """
+        保存用户偏好向量（用于根据行为记录初始化）
+
+        Args:
+            user_id (int): 用户ID
+            preferences (Dict): 偏好向量
+            base_time (datetime): 偏好向量对应的基准时间
+        """
+        data = cls._to_data(preferences, base_time or datetime.now())
+        try:
+            redis_cache.set(cls.get_cache_key(user_id), json.dumps(data, ensure_ascii=False),
+                            ex=cls.EXPIRE_SECONDS)
+        except Exception as e:
+            LogUtil.logger.error(f"[用户偏好] 保存用户{user_id}偏好失败: {str(e)}")
+
+    @classmethod
+    def record_behavior(cls, user_id: int, town: Optional[str], house_type: Optional[str],
+                        orientation: Optional[str], tags: Optional[str], score: float,
+                        behavior_time: Optional[datetime] = None, house_id: Optional[str] = None) -> None:
+        """
+        记录行为并增量更新偏好向量，score为负数时表示撤销行为
+
+        偏好向量不存在时不做处理，下次读取时会根据行为记录重新初始化
+
+        Args:
+            user_id (int): 用户ID
+            town (str): 镇
+            house_type (str): 户型
+            orientation (str): 朝向
+            tags (str): 标签，以;分隔
+            score (float): 行为得分
+            behavior_time (datetime): 行为时间
+            house_id (str): 房源ID
+        """
+        behavior_time = behavior_time or datetime.now()
+        key = cls.get_cache_key(user_id)
+        features = {
+            'town': [town] if town else [],
+            'house_type': [house_type] if house_type else [],
+            'orientation': [orientation] if orientation else [],
+            'tags': [tag.strip() for tag in set(tags.split(';')) if tag.strip()] if tags else [],
+            cls.HOUSES: [str(house_id)] if house_id else [],
+        }
+        try:
+            with redis_cache.pipeline() as pipe:
+                for _ in range(cls.MAX_RETRIES):
+                    try:
+                        pipe.watch(key)
+                        value = pipe.get(key)
+                        if not value:
+                            pipe.unwatch()
+                            return
+                        data = json.loads(value)
+                        cls._apply_behavior(data, features, score, behavior_time)
+                        pipe.multi()
+                        pipe.set(key, json.dumps(data, ensure_ascii=False), ex=cls.EXPIRE_SECONDS)
+                        pipe.execute()
+                        return
+                    except WatchError:
+                        continue
+            # 多次冲突后删除，下次读取时重新初始化
+            redis_cache.delete(key)
+        except Exception as e:
+            LogUtil.logger.error(f"[用户偏好] 更新用户{user_id}偏好失败: {str(e)}")
+
+    @classmethod
+    def evict(cls, user_id: int) -> None:
+        """
+        删除用户偏好向量
+
+        Args:
+            user_id (int): 用户ID
+        """
+        try:
+            redis_cache.delete(cls.get_cache_key(user_id))
+        except Exception as e:
+            LogUtil.logger.error(f"[用户偏好] 删除用户{user_id}偏好失败: {str(e)}")
+
+    @classmethod
+    def _apply_behavior(cls, data: Dict, features: Dict, score: float, behavior_time: datetime) -> None:
+        """
+        将偏好向量衰减到较新的时间点后累加行为得分
+        """
+        base_time = datetime.fromtimestamp(data.get('ts') or behavior_time.timestamp())
+        days = (behavior_time - base_time).total_seconds() / 86400
+        if days > 0:
+            # 偏好向量整体衰减到本次行为时间
+            decay = cls.TIME_DECAY_FACTOR ** days
+            for dimension in cls.DIMENSIONS + (cls.HOUSES,):
+                values = data.get(dimension) or {}
+                data[dimension] = {name: weight * decay for name, weight in values.items()}
+            data['ts'] = behavior_time.timestamp()
+        else:
+            # 较早的行为（如撤销历史点赞）按其时间折算到当前基准
+            score *= cls.TIME_DECAY_FACTOR ** (-days)
+        for dimension in cls.DIMENSIONS + (cls.HOUSES,):
+            values = data.setdefault(dimension, {})
+            for name in features[dimension]:
+                values[name] = max(values.get(name, 0) + score, 0)
+            data[dimension] = cls._prune(values, cls._max_values(dimension))
+
+    @classmethod
+    def _max_values(cls, dimension: str) -> int:
+        return cls.MAX_RECENT_HOUSES if dimension == cls.HOUSES else cls.MAX_VALUES_PER_DIMENSION
+
+    @classmethod
+    def _prune(cls, values: Dict[str, float], max_values: int) -> Dict[str, float]:
+        values = {name: weight for name, weight in values.items() if weight >= cls.MIN_WEIGHT}
+        if len(values) > max_values:
+            values = dict(sorted(values.items(), key=lambda x: x[1], reverse=True)[:max_values])
+        return values
+
+    @classmethod
+    def _to_data(cls, preferences: Dict, base_time: datetime) -> Dict:
+        data = {'ts': base_time.timestamp()}
+        for dimension in cls.DIMENSIONS + (cls.HOUSES,):
+            data[dimension] = cls._prune(dict(preferences.get(dimension) or {}), cls._max_values(dimension))
+        return data
@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 # @Author  : YY
 
+import time
 from types import NoneType
 from typing import List
 from flask import Flask
@@ -12,6 +13,7 @@ from ruoyi_common.exception import ServiceException
 from ruoyi_system.mapper import SysConfigMapper
 from ruoyi_system.domain.entity import SysConfig
 from ruoyi_admin.ext import redis_cache
+from ruoyi_framework.descriptor import cache_metrics
 from .. import reg
 
 
@@ -53,11 +55,17 @@ class SysConfigService:
         config = SysConfig(config_key=key)
         value:bytes = redis_cache.get(cls.get_cache_key(key))
         if value:
+            cache_metrics.record_hit(redis_cache, Constants.SYS_CONFIG_KEY)
             return value.decode("utf-8")
+        cache_metrics.record_miss(redis_cache, Constants.SYS_CONFIG_KEY)
+        start = time.perf_counter()
         eo = SysConfigMapper.select_config(config)
         if eo is None:
+            cache_metrics.record_load(redis_cache, Constants.SYS_CONFIG_KEY, time.perf_counter() - start)
             return None
-        redis_cache.set(cls.get_cache_key(key), eo.config_value.encode("utf-8"))
+        payload = eo.config_value.encode("utf-8")
+        redis_cache.set(cls.get_cache_key(key), payload)
+        cache_metrics.record_load(redis_cache, Constants.SYS_CONFIG_KEY, time.perf_counter() - start, len(payload))
         return eo.config_value
 
     @classmethod
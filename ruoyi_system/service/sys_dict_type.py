@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 # @Author  : YY
 
+import time
 from itertools import groupby
 from types import NoneType
 from typing import List, Optional
@@ -14,6 +15,7 @@ from ruoyi_common.sqlalchemy.transaction import Transactional
 from ruoyi_common.exception import ServiceException
 from ruoyi_system.mapper import SysDictDataMapper,SysDictTypeMapper
 from ruoyi_admin.ext import redis_cache,db
+from ruoyi_framework.descriptor import cache_metrics
 from .. import reg
 
 
@@ -314,11 +316,14 @@ class DictCacheUtil:
                     dict_data_list = [SysDictData.model_validate(item) for item in json_data]
                 else:
                     dict_data_list = [SysDictData.model_validate(json_data)] if json_data else []
+                cache_metrics.record_hit(redis_cache, Constants.SYS_DICT_KEY)
                 return dict_data_list
             # 如果缓存中没有，从数据库查询
+            cache_metrics.record_miss(redis_cache, Constants.SYS_DICT_KEY)
+            start = time.perf_counter()
             dict_data_list = SysDictDataMapper.select_dict_data_by_type(dict_type)
-            if dict_data_list:
-                cls.set_dict_cache(dict_type, dict_data_list)
+            size = cls.set_dict_cache(dict_type, dict_data_list) if dict_data_list else 0
+            cache_metrics.record_load(redis_cache, Constants.SYS_DICT_KEY, time.perf_counter() - start, size)
             return dict_data_list
         except Exception:
             # 如果缓存读取失败，从数据库查询
@@ -329,8 +334,10 @@ class DictCacheUtil:
                 return []
     
     @classmethod
-    def set_dict_cache(cls, key, dict_data_list:List[SysDictData]):
-        redis_cache.set(cls.get_cache_key(key), to_json(dict_data_list))
+    def set_dict_cache(cls, key, dict_data_list:List[SysDictData]) -> int:
+        payload = to_json(dict_data_list)
+        redis_cache.set(cls.get_cache_key(key), payload)
+        return len(payload)
 
 
 @app_completed.connect_via(reg.app)